@@ -0,0 +1,177 @@
+"""Add a content hash of the validated CorpusType taxonomy
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:02:17.734410
+
+"""
+
+import hashlib
+import json
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+public_clear_valid_metadata_hash = PGFunction(
+    schema="public",
+    signature="clear_valid_metadata_hash()",
+    definition="""
+    RETURNS TRIGGER AS $$
+    BEGIN
+        if NEW.valid_metadata IS DISTINCT FROM OLD.valid_metadata
+            AND NEW.valid_metadata_hash IS NOT DISTINCT FROM OLD.valid_metadata_hash
+        then
+            NEW.valid_metadata_hash = NULL;
+        end if;
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql'""",
+)
+
+public_corpus_type_clear_valid_metadata_hash = PGTrigger(
+    schema="public",
+    signature="clear_valid_metadata_hash",
+    on_entity="public.corpus_type",
+    is_constraint=False,
+    definition="""
+    BEFORE UPDATE ON public.corpus_type
+    FOR EACH ROW
+    EXECUTE PROCEDURE public.clear_valid_metadata_hash()""",
+)
+
+
+# A frozen copy of the normalisation and hashing of corpus_type_helpers and
+# taxonomy_cache as they were at this revision, so later changes to them do
+# not change what this migration does. Entries are checked strictly rather
+# than with pydantic's coercion, so anything doubtful is left without a hash.
+ENTITY_KEYS = ("_document", "_event", "_collection")
+ENTRY_FIELDS = ("allow_any", "allow_blanks", "allowed_values")
+
+
+def _normalise_entry(taxonomy, key, values) -> dict:
+    if not isinstance(values, dict):
+        raise TypeError(f"Taxonomy entry for '{key}' is not a dictionary")
+    if set(values) - set(ENTRY_FIELDS) or "allow_blanks" not in values:
+        raise ValueError(f"Bad fields for taxonomy '{key}'")
+
+    entry = {
+        "allow_any": values.get("allow_any", False),
+        "allow_blanks": values["allow_blanks"],
+        "allowed_values": values.get("allowed_values"),
+    }
+    if not isinstance(entry["allow_any"], bool) or not isinstance(
+        entry["allow_blanks"], bool
+    ):
+        raise ValueError(f"Bad flags for taxonomy '{key}'")
+    if not isinstance(entry["allowed_values"], list) or not all(
+        isinstance(value, str) for value in entry["allowed_values"]
+    ):
+        raise ValueError(f"Bad allowed_values for taxonomy '{key}'")
+
+    if key == "datetime_event_name":
+        if len(entry["allowed_values"]) != 1:
+            raise ValueError(f"Too many values for taxonomy '{key}'")
+        event_type = taxonomy.get("event_type")
+        if not isinstance(event_type, dict):
+            raise ValueError(f"Missing event_type for taxonomy '{key}'")
+        if entry["allowed_values"][0] not in event_type.get("allowed_values", []):
+            raise ValueError(f"Invalid value for taxonomy '{key}'")
+    return entry
+
+
+def normalise_taxonomy(taxonomy) -> dict:
+    """Validates a taxonomy and returns it in its normalised form.
+
+    :raises TypeError: If the structure of the taxonomy is invalid.
+    :raises ValueError: If the values of the taxonomy are invalid.
+    """
+    if not isinstance(taxonomy, dict):
+        raise TypeError("Taxonomy is not a dictionary")
+
+    normalised = {}
+    for entity_key in (None,) + ENTITY_KEYS:
+        if entity_key is None:
+            section = {k: v for k, v in taxonomy.items() if k not in ENTITY_KEYS}
+        elif entity_key in taxonomy:
+            section = taxonomy[entity_key]
+            if not isinstance(section, dict):
+                raise TypeError("Taxonomy is not a dictionary")
+        else:
+            continue
+
+        entries = {
+            key: _normalise_entry(section, key, values)
+            for key, values in section.items()
+        }
+        if entity_key is None:
+            normalised.update(entries)
+        else:
+            normalised[entity_key] = entries
+    return normalised
+
+
+def taxonomy_digest(taxonomy) -> str:
+    """Calculates a stable content hash for a taxonomy."""
+    serialised = json.dumps(taxonomy, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+
+def backfill_valid_metadata_hash():
+    """Normalises and hashes the existing taxonomies that are valid.
+
+    Invalid taxonomies are left without a hash, so they are still fully
+    checked when they are read.
+    """
+    bind = op.get_bind()
+    corpus_types = bind.execute(
+        text("SELECT name, valid_metadata FROM corpus_type")
+    ).fetchall()
+    for name, taxonomy in corpus_types:
+        try:
+            normalised = normalise_taxonomy(taxonomy)
+        except (TypeError, ValueError):
+            continue
+        bind.execute(
+            sa.update(
+                sa.table(
+                    "corpus_type",
+                    sa.column("name"),
+                    sa.column("valid_metadata", postgresql.JSONB),
+                    sa.column("valid_metadata_hash"),
+                )
+            )
+            .where(sa.column("name") == name)
+            .values(
+                valid_metadata=normalised,
+                valid_metadata_hash=taxonomy_digest(normalised),
+            )
+        )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column(
+        "corpus_type", sa.Column("valid_metadata_hash", sa.Text(), nullable=True)
+    )
+    op.create_entity(public_clear_valid_metadata_hash)  # type: ignore
+    op.create_entity(public_corpus_type_clear_valid_metadata_hash)  # type: ignore
+    # ### end Alembic commands ###
+    backfill_valid_metadata_hash()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_entity(public_corpus_type_clear_valid_metadata_hash)  # type: ignore
+    op.drop_entity(public_clear_valid_metadata_hash)  # type: ignore
+    op.drop_column("corpus_type", "valid_metadata_hash")
+    # ### end Alembic commands ###
@@ -0,0 +1,140 @@
+"""Touch the collection once per statement on collection_family
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 21:34:08.125390
+
+"""
+
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Transition tables can only be given for triggers of a single event, so
+# there is a trigger per event sharing the function. A DELETE followed by an
+# INSERT therefore touches the collection twice, once per statement.
+#
+# The row trigger this replaces ran BEFORE DELETE and returned NEW, which is
+# NULL for a DELETE, so Postgres skipped the row and deleting links silently
+# did nothing. Running AFTER the statement, deletes now remove the links.
+public_update_2_collection_last_modified = PGFunction(
+    schema="public",
+    signature="update_2_collection_last_modified()",
+    definition="""
+    RETURNS TRIGGER AS $$
+    BEGIN
+        if tg_op = 'INSERT' then
+            UPDATE collection
+            SET last_modified = NOW()
+            WHERE import_id IN (SELECT collection_import_id FROM new_rows);
+        elsif tg_op = 'DELETE' then
+            UPDATE collection
+            SET last_modified = NOW()
+            WHERE import_id IN (SELECT collection_import_id FROM old_rows);
+        else
+            UPDATE collection
+            SET last_modified = NOW()
+            WHERE import_id IN (
+                SELECT collection_import_id FROM new_rows
+                UNION
+                SELECT collection_import_id FROM old_rows
+            );
+        end if;
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql'""",
+)
+
+public_collection_family_insert_collection_last_modified = PGTrigger(
+    schema="public",
+    signature="insert_collection_last_modified",
+    on_entity="public.collection_family",
+    is_constraint=False,
+    definition="""
+    AFTER INSERT ON public.collection_family
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE public.update_2_collection_last_modified()""",
+)
+
+public_collection_family_update_collection_last_modified = PGTrigger(
+    schema="public",
+    signature="update_collection_last_modified",
+    on_entity="public.collection_family",
+    is_constraint=False,
+    definition="""
+    AFTER UPDATE ON public.collection_family
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE public.update_2_collection_last_modified()""",
+)
+
+public_collection_family_delete_collection_last_modified = PGTrigger(
+    schema="public",
+    signature="delete_collection_last_modified",
+    on_entity="public.collection_family",
+    is_constraint=False,
+    definition="""
+    AFTER DELETE ON public.collection_family
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE public.update_2_collection_last_modified()""",
+)
+
+# The per row trigger and function this replaces, from 0001.
+previous_update_2_collection_last_modified = PGFunction(
+    schema="public",
+    signature="update_2_collection_last_modified()",
+    definition="""
+    RETURNS TRIGGER AS $$
+    BEGIN
+        if tg_op = 'DELETE' then
+            UPDATE collection
+            SET last_modified = NOW()
+            WHERE import_id = OLD.collection_import_id;
+        else
+            UPDATE collection
+            SET last_modified = NOW()
+            WHERE import_id = NEW.collection_import_id;
+        end if;
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql'""",
+)
+
+previous_collection_family_update_collection_last_modified = PGTrigger(
+    schema="public",
+    signature="update_collection_last_modified",
+    on_entity="public.collection_family",
+    is_constraint=False,
+    definition="""
+    BEFORE INSERT OR UPDATE OR DELETE ON public.collection_family
+    FOR EACH ROW
+    EXECUTE PROCEDURE public.update_2_collection_last_modified()""",
+)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_entity(previous_collection_family_update_collection_last_modified)  # type: ignore
+    op.replace_entity(public_update_2_collection_last_modified)  # type: ignore
+    op.create_entity(public_collection_family_insert_collection_last_modified)  # type: ignore
+    op.create_entity(public_collection_family_update_collection_last_modified)  # type: ignore
+    op.create_entity(public_collection_family_delete_collection_last_modified)  # type: ignore
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_entity(public_collection_family_delete_collection_last_modified)  # type: ignore
+    op.drop_entity(public_collection_family_update_collection_last_modified)  # type: ignore
+    op.drop_entity(public_collection_family_insert_collection_last_modified)  # type: ignore
+    op.replace_entity(previous_update_2_collection_last_modified)  # type: ignore
+    op.create_entity(previous_collection_family_update_collection_last_modified)  # type: ignore
+    # ### end Alembic commands ###
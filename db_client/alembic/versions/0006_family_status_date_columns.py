@@ -0,0 +1,230 @@
+"""Persist the status and dates of families, maintained by triggers
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 23:12:41.508217
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+family_status = postgresql.ENUM(
+    "CREATED", "PUBLISHED", "DELETED", name="familystatus", create_type=False
+)
+
+# Recomputes the columns of the given families, or of all of them if NULL,
+# as the Family properties do. Only the rows that change are written, and
+# the number of them returned.
+public_refresh_family_status_dates = PGFunction(
+    schema="public",
+    signature="refresh_family_status_dates(family_ids text[])",
+    definition="""
+    RETURNS integer AS $$
+        WITH computed AS (
+            SELECT
+                f.import_id,
+                (
+                    SELECT CASE
+                        WHEN bool_or(d.document_status = 'PUBLISHED') THEN 'PUBLISHED'
+                        WHEN bool_and(d.document_status = 'DELETED') THEN 'DELETED'
+                        ELSE 'CREATED'
+                    END
+                    FROM family_document d
+                    WHERE d.family_import_id = f.import_id
+                )::familystatus AS family_status,
+                (
+                    SELECT CASE WHEN e.is_malformed THEN NULL ELSE e.date END
+                    FROM (
+                        SELECT
+                            date,
+                            coalesce(
+                                jsonb_typeof(valid_metadata -> 'datetime_event_name')
+                                    <> 'array',
+                                true
+                            ) AS is_malformed,
+                            coalesce(
+                                event_type_name
+                                    = valid_metadata -> 'datetime_event_name' ->> 0,
+                                false
+                            ) AS is_match
+                        FROM family_event
+                        WHERE family_import_id = f.import_id
+                    ) e
+                    ORDER BY (e.is_malformed OR e.is_match) DESC, e.date
+                    LIMIT 1
+                ) AS published_date,
+                (
+                    SELECT max(date)
+                    FROM family_event
+                    WHERE family_import_id = f.import_id AND date <= NOW()
+                ) AS last_updated_date
+            FROM family f
+            WHERE family_ids IS NULL OR f.import_id = ANY(family_ids)
+        ), updated AS (
+            UPDATE family
+            SET family_status = computed.family_status,
+                published_date = computed.published_date,
+                last_updated_date = computed.last_updated_date
+            FROM computed
+            WHERE family.import_id = computed.import_id
+                AND (family.family_status, family.published_date, family.last_updated_date)
+                    IS DISTINCT FROM
+                    (computed.family_status, computed.published_date, computed.last_updated_date)
+            RETURNING 1
+        )
+        SELECT count(*)::integer FROM updated
+    $$ language 'sql'""",
+)
+
+public_update_3_family_status_dates = PGFunction(
+    schema="public",
+    signature="update_3_family_status_dates()",
+    definition="""
+    RETURNS TRIGGER AS $$
+    BEGIN
+        if tg_op = 'INSERT' then
+            PERFORM refresh_family_status_dates(
+                ARRAY(SELECT DISTINCT family_import_id FROM new_rows)
+            );
+        elsif tg_op = 'DELETE' then
+            PERFORM refresh_family_status_dates(
+                ARRAY(SELECT DISTINCT family_import_id FROM old_rows)
+            );
+        else
+            PERFORM refresh_family_status_dates(
+                ARRAY(
+                    SELECT family_import_id FROM new_rows
+                    UNION
+                    SELECT family_import_id FROM old_rows
+                )
+            );
+        end if;
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql'""",
+)
+
+
+def _status_dates_triggers(table: str):
+    # Transition tables can only be given for triggers of a single event, so
+    # there is a trigger per event sharing the function.
+    return [
+        PGTrigger(
+            schema="public",
+            signature=f"{event.lower()}_family_status_dates",
+            on_entity=f"public.{table}",
+            is_constraint=False,
+            definition=f"""
+    AFTER {event} ON public.{table}
+    REFERENCING {transition_tables}
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE public.update_3_family_status_dates()""",
+        )
+        for event, transition_tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ]
+
+
+status_dates_triggers = _status_dates_triggers(
+    "family_document"
+) + _status_dates_triggers("family_event")
+
+# Writing only the maintained columns is not a modification of the family,
+# so refreshing them does not move last_modified.
+public_family_update_last_modified = PGTrigger(
+    schema="public",
+    signature="update_last_modified",
+    on_entity="public.family",
+    is_constraint=False,
+    definition="""
+    BEFORE UPDATE ON public.family
+    FOR EACH ROW
+    WHEN (
+        to_jsonb(OLD) - 'family_status' - 'published_date' - 'last_updated_date'
+        IS DISTINCT FROM
+        to_jsonb(NEW) - 'family_status' - 'published_date' - 'last_updated_date'
+    )
+    EXECUTE PROCEDURE public.update_1_last_modified()""",
+)
+
+previous_family_update_last_modified = PGTrigger(
+    schema="public",
+    signature="update_last_modified",
+    on_entity="public.family",
+    is_constraint=False,
+    definition="""
+    BEFORE UPDATE ON public.family
+    FOR EACH ROW
+    EXECUTE PROCEDURE public.update_1_last_modified()""",
+)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    family_status.create(op.get_bind())
+    op.add_column(
+        "family",
+        sa.Column(
+            "family_status",
+            family_status,
+            server_default="CREATED",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "family",
+        sa.Column("published_date", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "family",
+        sa.Column("last_updated_date", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_family_family_status_published_date",
+        "family",
+        ["family_status", "published_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_family_family_status_last_updated_date",
+        "family",
+        ["family_status", "last_updated_date"],
+        unique=False,
+    )
+    op.create_entity(public_refresh_family_status_dates)  # type: ignore
+    op.create_entity(public_update_3_family_status_dates)  # type: ignore
+    for trigger in status_dates_triggers:
+        op.create_entity(trigger)  # type: ignore
+    op.replace_entity(public_family_update_last_modified)  # type: ignore
+    # ### end Alembic commands ###
+    op.get_bind().execute(text("SELECT refresh_family_status_dates(NULL)"))
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.replace_entity(previous_family_update_last_modified)  # type: ignore
+    for trigger in reversed(status_dates_triggers):
+        op.drop_entity(trigger)  # type: ignore
+    op.drop_entity(public_update_3_family_status_dates)  # type: ignore
+    op.drop_entity(public_refresh_family_status_dates)  # type: ignore
+    op.drop_index("ix_family_family_status_last_updated_date", table_name="family")
+    op.drop_index("ix_family_family_status_published_date", table_name="family")
+    op.drop_column("family", "last_updated_date")
+    op.drop_column("family", "published_date")
+    op.drop_column("family", "family_status")
+    family_status.drop(op.get_bind())
+    # ### end Alembic commands ###
@@ -0,0 +1,212 @@
+"""Store the next future event date of families
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 09:41:27.316042
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# As in 0006, but also storing the date of the earliest event still in the
+# future, after which the stored last_updated_date is stale.
+public_refresh_family_status_dates = PGFunction(
+    schema="public",
+    signature="refresh_family_status_dates(family_ids text[])",
+    definition="""
+    RETURNS integer AS $$
+        WITH computed AS (
+            SELECT
+                f.import_id,
+                (
+                    SELECT CASE
+                        WHEN bool_or(d.document_status = 'PUBLISHED') THEN 'PUBLISHED'
+                        WHEN bool_and(d.document_status = 'DELETED') THEN 'DELETED'
+                        ELSE 'CREATED'
+                    END
+                    FROM family_document d
+                    WHERE d.family_import_id = f.import_id
+                )::familystatus AS family_status,
+                (
+                    SELECT CASE WHEN e.is_malformed THEN NULL ELSE e.date END
+                    FROM (
+                        SELECT
+                            date,
+                            coalesce(
+                                jsonb_typeof(valid_metadata -> 'datetime_event_name')
+                                    <> 'array',
+                                true
+                            ) AS is_malformed,
+                            coalesce(
+                                event_type_name
+                                    = valid_metadata -> 'datetime_event_name' ->> 0,
+                                false
+                            ) AS is_match
+                        FROM family_event
+                        WHERE family_import_id = f.import_id
+                    ) e
+                    ORDER BY (e.is_malformed OR e.is_match) DESC, e.date
+                    LIMIT 1
+                ) AS published_date,
+                (
+                    SELECT max(date)
+                    FROM family_event
+                    WHERE family_import_id = f.import_id AND date <= NOW()
+                ) AS last_updated_date,
+                (
+                    SELECT min(date)
+                    FROM family_event
+                    WHERE family_import_id = f.import_id AND date > NOW()
+                ) AS next_event_date
+            FROM family f
+            WHERE family_ids IS NULL OR f.import_id = ANY(family_ids)
+        ), updated AS (
+            UPDATE family
+            SET family_status = computed.family_status,
+                published_date = computed.published_date,
+                last_updated_date = computed.last_updated_date,
+                next_event_date = computed.next_event_date
+            FROM computed
+            WHERE family.import_id = computed.import_id
+                AND (
+                    family.family_status,
+                    family.published_date,
+                    family.last_updated_date,
+                    family.next_event_date
+                ) IS DISTINCT FROM (
+                    computed.family_status,
+                    computed.published_date,
+                    computed.last_updated_date,
+                    computed.next_event_date
+                )
+            RETURNING 1
+        )
+        SELECT count(*)::integer FROM updated
+    $$ language 'sql'""",
+)
+
+public_family_update_last_modified = PGTrigger(
+    schema="public",
+    signature="update_last_modified",
+    on_entity="public.family",
+    is_constraint=False,
+    definition="""
+    BEFORE UPDATE ON public.family
+    FOR EACH ROW
+    WHEN (
+        to_jsonb(OLD) - 'family_status' - 'published_date' - 'last_updated_date'
+            - 'next_event_date'
+        IS DISTINCT FROM
+        to_jsonb(NEW) - 'family_status' - 'published_date' - 'last_updated_date'
+            - 'next_event_date'
+    )
+    EXECUTE PROCEDURE public.update_1_last_modified()""",
+)
+
+# The function and trigger this replaces, from 0006.
+previous_refresh_family_status_dates = PGFunction(
+    schema="public",
+    signature="refresh_family_status_dates(family_ids text[])",
+    definition="""
+    RETURNS integer AS $$
+        WITH computed AS (
+            SELECT
+                f.import_id,
+                (
+                    SELECT CASE
+                        WHEN bool_or(d.document_status = 'PUBLISHED') THEN 'PUBLISHED'
+                        WHEN bool_and(d.document_status = 'DELETED') THEN 'DELETED'
+                        ELSE 'CREATED'
+                    END
+                    FROM family_document d
+                    WHERE d.family_import_id = f.import_id
+                )::familystatus AS family_status,
+                (
+                    SELECT CASE WHEN e.is_malformed THEN NULL ELSE e.date END
+                    FROM (
+                        SELECT
+                            date,
+                            coalesce(
+                                jsonb_typeof(valid_metadata -> 'datetime_event_name')
+                                    <> 'array',
+                                true
+                            ) AS is_malformed,
+                            coalesce(
+                                event_type_name
+                                    = valid_metadata -> 'datetime_event_name' ->> 0,
+                                false
+                            ) AS is_match
+                        FROM family_event
+                        WHERE family_import_id = f.import_id
+                    ) e
+                    ORDER BY (e.is_malformed OR e.is_match) DESC, e.date
+                    LIMIT 1
+                ) AS published_date,
+                (
+                    SELECT max(date)
+                    FROM family_event
+                    WHERE family_import_id = f.import_id AND date <= NOW()
+                ) AS last_updated_date
+            FROM family f
+            WHERE family_ids IS NULL OR f.import_id = ANY(family_ids)
+        ), updated AS (
+            UPDATE family
+            SET family_status = computed.family_status,
+                published_date = computed.published_date,
+                last_updated_date = computed.last_updated_date
+            FROM computed
+            WHERE family.import_id = computed.import_id
+                AND (family.family_status, family.published_date, family.last_updated_date)
+                    IS DISTINCT FROM
+                    (computed.family_status, computed.published_date, computed.last_updated_date)
+            RETURNING 1
+        )
+        SELECT count(*)::integer FROM updated
+    $$ language 'sql'""",
+)
+
+previous_family_update_last_modified = PGTrigger(
+    schema="public",
+    signature="update_last_modified",
+    on_entity="public.family",
+    is_constraint=False,
+    definition="""
+    BEFORE UPDATE ON public.family
+    FOR EACH ROW
+    WHEN (
+        to_jsonb(OLD) - 'family_status' - 'published_date' - 'last_updated_date'
+        IS DISTINCT FROM
+        to_jsonb(NEW) - 'family_status' - 'published_date' - 'last_updated_date'
+    )
+    EXECUTE PROCEDURE public.update_1_last_modified()""",
+)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column(
+        "family",
+        sa.Column("next_event_date", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.replace_entity(public_refresh_family_status_dates)  # type: ignore
+    op.replace_entity(public_family_update_last_modified)  # type: ignore
+    # ### end Alembic commands ###
+    op.get_bind().execute(text("SELECT refresh_family_status_dates(NULL)"))
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.replace_entity(previous_family_update_last_modified)  # type: ignore
+    op.replace_entity(previous_refresh_family_status_dates)  # type: ignore
+    op.drop_column("family", "next_event_date")
+    # ### end Alembic commands ###
@@ -1,15 +1,51 @@
+from db_client.functions.copy_import import import_families_ndjson
+from db_client.functions.corpus_type_helpers import (
+    create_corpus_type,
+    update_corpus_type_taxonomy,
+)
 from db_client.functions.dfce_helpers import (
     add_collections,
     add_document,
     add_event,
     add_families,
+    add_families_bulk,
+)
+from db_client.functions.family_load_profiles import (
+    FamilyLoadProfile,
+    family_load_options,
+)
+from db_client.functions.family_status_dates import refresh_family_status_dates
+from db_client.functions.import_validation import validate_import
+from db_client.functions.metadata import (
+    invalidate_taxonomy_cache,
+    validate_metadata,
+    validate_metadata_async,
+    validate_metadata_many,
 )
-from db_client.functions.metadata import validate_metadata
+from db_client.functions.parallel_ingest import ingest_families_parallel
+from db_client.functions.slug_helpers import generate_slugs
+from db_client.functions.streaming_ingest import stream_families
+from db_client.functions.taxonomy_export import get_taxonomy_export
 
 __all__ = (
     "validate_metadata",
+    "validate_metadata_async",
+    "validate_metadata_many",
+    "invalidate_taxonomy_cache",
+    "create_corpus_type",
+    "update_corpus_type_taxonomy",
+    "get_taxonomy_export",
+    "validate_import",
+    "generate_slugs",
+    "FamilyLoadProfile",
+    "family_load_options",
+    "refresh_family_status_dates",
     "add_collections",
     "add_families",
+    "add_families_bulk",
+    "import_families_ndjson",
+    "stream_families",
+    "ingest_families_parallel",
     "add_event",
     "add_document",
 )
@@ -0,0 +1,279 @@
+"""
+Streaming import of families from NDJSON with COPY.
+
+Each line of the input is a family in the shape taken by add_families, with
+its documents and their events nested inside it. The records are flattened
+into temporary staging tables with COPY, in chunks so the input is never
+held in memory, and then merged into the DFCE tables with one
+INSERT ... SELECT per table.
+
+NOTE: Only NDJSON is supported, the nested documents and events of a
+family cannot be represented in CSV.
+"""
+
+import json
+from io import StringIO
+from typing import IO, Any, Dict, Iterable, Optional, Type, Union
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from db_client.functions.language_registry import LanguageRegistry
+from db_client.models.dfce.family import (
+    DocumentStatus,
+    EventStatus,
+    FamilyCategory,
+)
+from db_client.models.organisation.enum import BaseModelEnum
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# The staging tables, in the order their rows are written for a family.
+_STAGING_TABLES = {
+    "staging_family": (
+        "import_id text, title text, description text, family_category text, "
+        "slug text, metadata jsonb, corpus_import_id text"
+    ),
+    "staging_family_geography": "family_import_id text, geography_id integer",
+    "staging_document": (
+        "family_import_id text, import_id text, title text, md5_sum text, "
+        "source_url text, content_type text, variant_name text, "
+        "document_status text, metadata jsonb, slug text, "
+        "physical_document_id integer"
+    ),
+    "staging_document_language": "document_import_id text, language_id integer",
+    "staging_event": (
+        "family_import_id text, document_import_id text, import_id text, "
+        "title text, date timestamptz, event_type_name text, status text, "
+        "valid_metadata jsonb"
+    ),
+}
+
+# The merges of the staging tables into the DFCE tables, in FK order.
+_MERGES = {
+    "family": """
+        INSERT INTO family (import_id, title, description, family_category)
+        SELECT import_id, title, description, family_category::familycategory
+        FROM staging_family
+    """,
+    "family_metadata": """
+        INSERT INTO family_metadata (family_import_id, value)
+        SELECT import_id, metadata FROM staging_family
+    """,
+    "family_corpus": """
+        INSERT INTO family_corpus (family_import_id, corpus_import_id)
+        SELECT import_id, corpus_import_id FROM staging_family
+        WHERE corpus_import_id IS NOT NULL
+    """,
+    "family_geography": """
+        INSERT INTO family_geography (family_import_id, geography_id)
+        SELECT family_import_id, geography_id FROM staging_family_geography
+    """,
+    "physical_document": """
+        INSERT INTO physical_document
+            (id, title, md5_sum, cdn_object, source_url, content_type)
+        SELECT physical_document_id, title, md5_sum, NULL, source_url, content_type
+        FROM staging_document
+    """,
+    "family_document": """
+        INSERT INTO family_document (
+            family_import_id, physical_document_id, import_id, variant_name,
+            document_status, valid_metadata
+        )
+        SELECT family_import_id, physical_document_id, import_id, variant_name,
+            document_status::documentstatus, metadata
+        FROM staging_document
+    """,
+    "physical_document_language": """
+        INSERT INTO physical_document_language
+            (language_id, document_id, source, visible)
+        SELECT l.language_id, d.physical_document_id, 'USER', true
+        FROM staging_document_language l
+        JOIN staging_document d ON d.import_id = l.document_import_id
+    """,
+    "slug": """
+        INSERT INTO slug (family_import_id, family_document_import_id, name)
+        SELECT import_id, NULL, slug FROM staging_family
+        UNION ALL
+        SELECT NULL, import_id, slug FROM staging_document
+    """,
+    "family_event": """
+        INSERT INTO family_event (
+            family_import_id, family_document_import_id, import_id, title, date,
+            event_type_name, status, valid_metadata
+        )
+        SELECT family_import_id, document_import_id, import_id, title, date,
+            event_type_name, status::eventstatus, valid_metadata
+        FROM staging_event
+    """,
+}
+
+
+def _enum_name(enum_type: Type[BaseModelEnum], value: str) -> str:
+    """The database label of an enum value, as the ORM would store it."""
+    return enum_type(value).name
+
+
+def _escape(value: Any) -> str:
+    """Escapes a value for the COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _StagingWriter:
+    """Buffers the flattened records and copies them to the staging tables."""
+
+    def __init__(self, db: Session, language_registry: Optional[LanguageRegistry]):
+        self._db = db
+        self._language_registry = language_registry
+        self._buffers = {table: StringIO() for table in _STAGING_TABLES}
+
+    def _write(self, table: str, *values: Any):
+        self._buffers[table].write("\t".join(_escape(value) for value in values))
+        self._buffers[table].write("\n")
+
+    def _language_id(self, language: str) -> int:
+        if self._language_registry is None:
+            self._language_registry = LanguageRegistry.load(self._db)
+        return self._language_registry.language_id(language)
+
+    def add_family(self, f: Dict[str, Any]):
+        self._write(
+            "staging_family",
+            f["import_id"],
+            f["title"],
+            f["description"],
+            _enum_name(FamilyCategory, f["category"]),
+            f["slug"],
+            f.get("metadata", {}),
+            f.get("corpus_import_id"),
+        )
+        geo_ids = (
+            f["geography_id"]
+            if isinstance(f["geography_id"], list)
+            else [f["geography_id"]]
+        )
+        for geo_id in geo_ids:
+            self._write("staging_family_geography", f["import_id"], geo_id)
+
+        for d in f["documents"]:
+            self._write(
+                "staging_document",
+                f["import_id"],
+                d["import_id"],
+                d["title"],
+                d["md5_sum"],
+                d["url"],
+                d["content_type"],
+                d["language_variant"],
+                _enum_name(DocumentStatus, d["status"]),
+                d["metadata"],
+                d["slug"],
+                None,
+            )
+            for lang in d["languages"]:
+                self._write(
+                    "staging_document_language",
+                    d["import_id"],
+                    self._language_id(lang),
+                )
+            for e in d["events"]:
+                self._write(
+                    "staging_event",
+                    f["import_id"],
+                    d["import_id"],
+                    e["import_id"],
+                    e["title"],
+                    e["date"],
+                    e["type"],
+                    _enum_name(EventStatus, e["status"]),
+                    {
+                        "event_type": [e["type"]],
+                        "datetime_event_name": [
+                            e["valid_metadata"]["datetime_event_name"]
+                        ],
+                    },
+                )
+
+    def flush(self):
+        """Copies the buffered rows to the staging tables."""
+        cursor = self._db.connection().connection.cursor()
+        try:
+            for table, buffer in self._buffers.items():
+                if buffer.tell() == 0:
+                    continue
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} FROM STDIN", buffer)
+                self._buffers[table] = StringIO()
+        finally:
+            cursor.close()
+
+
+def _read_records(source: Union[IO[str], Iterable[str]]) -> Iterable[Dict]:
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def import_families_ndjson(
+    db: Session,
+    source: Union[IO[str], Iterable[str]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    language_registry: Optional[LanguageRegistry] = None,
+) -> Dict[str, int]:
+    """Imports families from NDJSON using COPY and set-based merges.
+
+    All of the import is a single transaction, committed once merged.
+
+    :param Session db: The DB session to connect to, which must use the
+        psycopg2 driver.
+    :param Union[IO[str], Iterable[str]] source: The NDJSON lines, one
+        family per line in the shape taken by add_families.
+    :param int chunk_size: The number of families to buffer before they
+        are copied to the staging tables.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded when first needed if not given.
+    :raises ValueError: If a line is not valid JSON, or a language or
+        enum value is unknown.
+    :return Dict[str, int]: The number of rows inserted per table.
+    """
+    for table, columns in _STAGING_TABLES.items():
+        db.execute(
+            sa.text(f"CREATE TEMPORARY TABLE {table} ({columns}) ON COMMIT DROP")
+        )
+
+    writer = _StagingWriter(db, language_registry)
+    buffered = 0
+    for record in _read_records(source):
+        writer.add_family(record)
+        buffered += 1
+        if buffered >= chunk_size:
+            writer.flush()
+            buffered = 0
+    writer.flush()
+
+    db.execute(
+        sa.text(
+            "UPDATE staging_document SET physical_document_id = "
+            "nextval(pg_get_serial_sequence('physical_document', 'id'))"
+        )
+    )
+
+    counts: Dict[str, int] = {}
+    for table, statement in _MERGES.items():
+        counts[table] = db.execute(sa.text(statement)).rowcount
+    db.commit()
+    return counts
@@ -1,6 +1,8 @@
 import logging
-from typing import Mapping, Optional, Sequence, Union
+from typing import Collection, Mapping, Optional, Sequence, Tuple, Union
 
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from db_client.models.organisation import Corpus, CorpusType
@@ -13,6 +15,27 @@ TaxonomyData = Mapping[
 ]
 
 
+# The statements are built once, the values are bound when executed.
+_TAXONOMY_FROM_CORPUS = (
+    sa.select(CorpusType.valid_metadata)
+    .join(Corpus, Corpus.corpus_type_name == CorpusType.name)
+    .where(Corpus.import_id == sa.bindparam("corpus_id"))
+)
+_TAXONOMY_AND_HASH_FROM_CORPUS = (
+    sa.select(CorpusType.valid_metadata, CorpusType.valid_metadata_hash)
+    .join(Corpus, Corpus.corpus_type_name == CorpusType.name)
+    .where(Corpus.import_id == sa.bindparam("corpus_id"))
+)
+_TAXONOMY_HASH_FROM_CORPUS = (
+    sa.select(CorpusType.valid_metadata_hash)
+    .join(Corpus, Corpus.corpus_type_name == CorpusType.name)
+    .where(Corpus.import_id == sa.bindparam("corpus_id"))
+)
+_TAXONOMY_BY_CORPUS_TYPE_NAME = sa.select(CorpusType.valid_metadata).where(
+    CorpusType.name == sa.bindparam("corpus_type_name")
+)
+
+
 def get_taxonomy_from_corpus(db: Session, corpus_id: str) -> Optional[TaxonomyData]:
     """Get the taxonomy of a corpus.
 
@@ -22,12 +45,108 @@ def get_taxonomy_from_corpus(db: Session, corpus_id: str) -> Optional[TaxonomyDa
     :return Optional[TaxonomyData]: The taxonomy of the given corpus or
         None.
     """
-    return (
-        db.query(CorpusType.valid_metadata)
+    return db.execute(_TAXONOMY_FROM_CORPUS, {"corpus_id": corpus_id}).scalar()
+
+
+async def get_taxonomy_from_corpus_async(
+    db: AsyncSession, corpus_id: str
+) -> Optional[TaxonomyData]:
+    """Get the taxonomy of a corpus, without blocking the event loop.
+
+    :param AsyncSession db: The async DB session to connect to.
+    :param str corpus_id: The corpus import ID we want to get the
+        taxonomy for.
+    :return Optional[TaxonomyData]: The taxonomy of the given corpus or
+        None.
+    """
+    result = await db.execute(_TAXONOMY_FROM_CORPUS, {"corpus_id": corpus_id})
+    return result.scalar()
+
+
+def get_taxonomy_and_hash_from_corpus(
+    db: Session, corpus_id: str
+) -> Tuple[Optional[TaxonomyData], Optional[str]]:
+    """Get the taxonomy of a corpus and its content hash.
+
+    :param Session db: The DB session to connect to.
+    :param str corpus_id: The corpus import ID we want to get the
+        taxonomy for.
+    :return Tuple[Optional[TaxonomyData], Optional[str]]: The taxonomy
+        of the given corpus and its CorpusType.valid_metadata_hash, which
+        is None if the taxonomy has not been validated when saved. Both
+        are None if the corpus cannot be found.
+    """
+    row = db.execute(_TAXONOMY_AND_HASH_FROM_CORPUS, {"corpus_id": corpus_id}).first()
+    return (row[0], row[1]) if row is not None else (None, None)
+
+
+async def get_taxonomy_and_hash_from_corpus_async(
+    db: AsyncSession, corpus_id: str
+) -> Tuple[Optional[TaxonomyData], Optional[str]]:
+    """Get the taxonomy of a corpus and its hash, without blocking.
+
+    :param AsyncSession db: The async DB session to connect to.
+    :param str corpus_id: The corpus import ID we want to get the
+        taxonomy for.
+    :return Tuple[Optional[TaxonomyData], Optional[str]]: The taxonomy
+        of the given corpus and its CorpusType.valid_metadata_hash, both
+        None if the corpus cannot be found.
+    """
+    result = await db.execute(_TAXONOMY_AND_HASH_FROM_CORPUS, {"corpus_id": corpus_id})
+    row = result.first()
+    return (row[0], row[1]) if row is not None else (None, None)
+
+
+def get_taxonomy_hash_from_corpus(db: Session, corpus_id: str) -> Optional[str]:
+    """Get the content hash of the taxonomy of a corpus, without the taxonomy.
+
+    :param Session db: The DB session to connect to.
+    :param str corpus_id: The corpus import ID we want to get the
+        taxonomy hash for.
+    :return Optional[str]: The CorpusType.valid_metadata_hash of the
+        given corpus, None if the taxonomy has not been validated when
+        saved or the corpus cannot be found.
+    """
+    return db.execute(_TAXONOMY_HASH_FROM_CORPUS, {"corpus_id": corpus_id}).scalar()
+
+
+async def get_taxonomy_hash_from_corpus_async(
+    db: AsyncSession, corpus_id: str
+) -> Optional[str]:
+    """Get the content hash of the taxonomy of a corpus, without blocking.
+
+    :param AsyncSession db: The async DB session to connect to.
+    :param str corpus_id: The corpus import ID we want to get the
+        taxonomy hash for.
+    :return Optional[str]: The CorpusType.valid_metadata_hash of the
+        given corpus, None if the taxonomy has not been validated when
+        saved or the corpus cannot be found.
+    """
+    result = await db.execute(_TAXONOMY_HASH_FROM_CORPUS, {"corpus_id": corpus_id})
+    return result.scalar()
+
+
+def get_taxonomies_from_corpora(
+    db: Session, corpus_ids: Collection[str]
+) -> Mapping[str, TaxonomyData]:
+    """Get the taxonomies of many corpora with a single query.
+
+    :param Session db: The DB session to connect to.
+    :param Collection[str] corpus_ids: The corpus import IDs we want to
+        get the taxonomies for.
+    :return Mapping[str, TaxonomyData]: The taxonomies keyed by corpus
+        import ID, corpora that cannot be found are omitted.
+    """
+    if not corpus_ids:
+        return {}
+
+    rows = (
+        db.query(Corpus.import_id, CorpusType.valid_metadata)
         .join(Corpus, Corpus.corpus_type_name == CorpusType.name)
-        .filter(Corpus.import_id == corpus_id)
-        .scalar()
+        .filter(Corpus.import_id.in_(set(corpus_ids)))
+        .all()
     )
+    return {corpus_id: taxonomy for corpus_id, taxonomy in rows}
 
 
 def get_taxonomy_by_corpus_type_name(db: Session, corpus_type_name: str):
@@ -38,11 +157,26 @@ def get_taxonomy_by_corpus_type_name(db: Session, corpus_type_name: str):
     :return Optional[TaxonomyData]: The taxonomy of the given corpus or
         None.
     """
-    return (
-        db.query(CorpusType.valid_metadata)
-        .filter(CorpusType.name == corpus_type_name)
-        .scalar()
+    return db.execute(
+        _TAXONOMY_BY_CORPUS_TYPE_NAME, {"corpus_type_name": corpus_type_name}
+    ).scalar()
+
+
+async def get_taxonomy_by_corpus_type_name_async(
+    db: AsyncSession, corpus_type_name: str
+) -> Optional[TaxonomyData]:
+    """Get the taxonomy of a corpus by type name, without blocking.
+
+    :param AsyncSession db: The async DB session to connect to.
+    :param str corpus_type_name: The name of the corpus type we want to
+        get the taxonomy for.
+    :return Optional[TaxonomyData]: The taxonomy of the given corpus or
+        None.
+    """
+    result = await db.execute(
+        _TAXONOMY_BY_CORPUS_TYPE_NAME, {"corpus_type_name": corpus_type_name}
     )
+    return result.scalar()
 
 
 def get_entity_specific_taxonomy(
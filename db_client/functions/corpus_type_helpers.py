@@ -0,0 +1,123 @@
+"""
+The write path for CorpusType taxonomies.
+
+A taxonomy is validated and normalised once when it is saved, and its content
+hash stored in CorpusType.valid_metadata_hash. Reading metadata validation
+then uses the hash as the cache key and skips the structural checks of the
+taxonomy. A trigger clears the hash if valid_metadata is changed any other
+way, so those taxonomies are still fully checked when read.
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from db_client.functions.corpus_helpers import TaxonomyData
+from db_client.functions.metadata import (
+    _filter_taxonomy_for_entity,
+    build_valid_taxonomy,
+)
+from db_client.functions.taxonomy_cache import taxonomy_digest
+from db_client.models.dfce.taxonomy_entry import EntitySpecificTaxonomyKeys
+from db_client.models.organisation import CorpusType
+
+
+def normalise_taxonomy(taxonomy: Any) -> Dict[str, Any]:
+    """Validates a taxonomy and returns it in its normalised form.
+
+    Every entry of the family and entity specific sections is validated
+    as it would be when read and written out in full, including the
+    allow_any default.
+
+    :param Any taxonomy: The taxonomy to save as CorpusType.valid_metadata.
+    :raises TypeError: If the structure of the taxonomy is invalid.
+    :raises ValueError: If the values of the taxonomy are invalid.
+    :return Dict[str, Any]: The normalised taxonomy.
+    """
+    if not isinstance(taxonomy, dict):
+        raise TypeError("Taxonomy is not a dictionary")
+
+    sections = [None] + [
+        entity_key.value
+        for entity_key in EntitySpecificTaxonomyKeys
+        if entity_key.value in taxonomy
+    ]
+
+    normalised: Dict[str, Any] = {}
+    for entity_key in sections:
+        section = _filter_taxonomy_for_entity(taxonomy, entity_key)
+        try:
+            taxonomy_entries = build_valid_taxonomy(section)
+        except (KeyError, IndexError) as e:
+            # The datetime_event_name check assumes an event_type entry
+            # and a datetime_event_name value.
+            raise ValueError(f"Incomplete taxonomy, missing {e}") from e
+
+        entries = {
+            key: {
+                "allow_any": entry.allow_any,
+                "allow_blanks": entry.allow_blanks,
+                "allowed_values": list(entry.allowed_values),
+            }
+            for key, entry in taxonomy_entries.items()
+        }
+        if entity_key is None:
+            normalised.update(entries)
+        else:
+            normalised[entity_key] = entries
+    return normalised
+
+
+def create_corpus_type(
+    db: Session, name: str, description: str, taxonomy: TaxonomyData
+) -> CorpusType:
+    """Creates a CorpusType with a validated taxonomy.
+
+    NOTE: The session is flushed but not committed.
+
+    :param Session db: The DB session to connect to.
+    :param str name: The name of the CorpusType.
+    :param str description: The description of the CorpusType.
+    :param TaxonomyData taxonomy: The taxonomy of the CorpusType.
+    :raises TypeError: If the structure of the taxonomy is invalid.
+    :raises ValueError: If the values of the taxonomy are invalid.
+    :return CorpusType: The new CorpusType.
+    """
+    normalised = normalise_taxonomy(taxonomy)
+    corpus_type = CorpusType(
+        name=name,
+        description=description,
+        valid_metadata=normalised,
+        valid_metadata_hash=taxonomy_digest(normalised),
+    )
+    db.add(corpus_type)
+    db.flush()
+    return corpus_type
+
+
+def update_corpus_type_taxonomy(
+    db: Session, name: str, taxonomy: TaxonomyData
+) -> CorpusType:
+    """Replaces the taxonomy of a CorpusType with a validated one.
+
+    NOTE: The session is flushed but not committed, so the metadata
+    invalidated by the edit can be checked first, see
+    find_invalidated_metadata.
+
+    :param Session db: The DB session to connect to.
+    :param str name: The name of the CorpusType.
+    :param TaxonomyData taxonomy: The new taxonomy of the CorpusType.
+    :raises TypeError: If the structure of the taxonomy is invalid.
+    :raises ValueError: If the values of the taxonomy are invalid.
+    :raises ValueError: If the CorpusType does not exist.
+    :return CorpusType: The updated CorpusType.
+    """
+    normalised = normalise_taxonomy(taxonomy)
+    corpus_type = db.query(CorpusType).filter(CorpusType.name == name).one_or_none()
+    if corpus_type is None:
+        raise ValueError(f"CorpusType '{name}' not found")
+
+    corpus_type.valid_metadata = normalised
+    corpus_type.valid_metadata_hash = taxonomy_digest(normalised)
+    db.flush()
+    return corpus_type
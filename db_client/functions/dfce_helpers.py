@@ -1,7 +1,22 @@
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
+from db_client.functions.language_registry import LanguageRegistry
 from db_client.models.dfce import (
     Collection,
     CollectionFamily,
@@ -15,7 +30,6 @@ from db_client.models.dfce import (
 )
 from db_client.models.dfce.family import FamilyCorpus
 from db_client.models.document.physical_document import (
-    Language,
     PhysicalDocument,
     PhysicalDocumentLanguage,
 )
@@ -36,7 +50,192 @@ def add_organisation(
     return org
 
 
-def add_collections(db: Session, collections, org_id=1):
+@dataclass
+class UpsertCounts:
+    """The outcome of upserting the rows of a table."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+@dataclass
+class UpsertReport:
+    """The outcome of an upsert, per table and in total."""
+
+    tables: Dict[str, UpsertCounts] = field(default_factory=dict)
+
+    def add(self, table_name: str, inserted: int, updated: int, unchanged: int):
+        counts = self.tables.setdefault(table_name, UpsertCounts())
+        counts.inserted += inserted
+        counts.updated += updated
+        counts.unchanged += unchanged
+
+    @property
+    def inserted(self) -> int:
+        return sum(counts.inserted for counts in self.tables.values())
+
+    @property
+    def updated(self) -> int:
+        return sum(counts.updated for counts in self.tables.values())
+
+    @property
+    def unchanged(self) -> int:
+        return sum(counts.unchanged for counts in self.tables.values())
+
+
+def _upsert_rows(
+    db: Session,
+    table: sa.Table,
+    rows: Sequence[Mapping[str, Any]],
+    report: UpsertReport,
+):
+    """Inserts rows, updating those that exist only if they differ.
+
+    A row that exists and is the same is not written at all, so none of
+    its triggers fire, e.g. last_modified is kept. Such rows are dropped
+    before the insert as the BEFORE INSERT triggers, e.g. of
+    family_document, fire even for rows that then conflict.
+    """
+    if not rows:
+        report.add(table.name, 0, 0, 0)
+        return
+    if table is Slug.__table__:
+        _upsert_slugs(db, rows, report)
+        return
+
+    columns = list(rows[0])
+    primary_key = [column.name for column in table.primary_key.columns]
+    update_columns = [name for name in columns if name not in primary_key]
+
+    values = sa.values(
+        *(sa.column(name, table.c[name].type) for name in columns),
+        name="upsert_values",
+    ).data([tuple(row[name] for name in columns) for row in rows])
+    source = sa.select(
+        *(sa.cast(values.c[name], table.c[name].type).label(name) for name in columns)
+    ).subquery("upsert_source")
+    unchanged = (
+        sa.select(sa.literal(1))
+        .select_from(table)
+        .where(*(table.c[name] == source.c[name] for name in primary_key))
+    )
+    if update_columns:
+        unchanged = unchanged.where(
+            sa.tuple_(*(table.c[name] for name in update_columns)).is_not_distinct_from(
+                sa.tuple_(*(source.c[name] for name in update_columns))
+            )
+        )
+
+    stmt = postgresql.insert(table).from_select(
+        columns, sa.select(source).where(~unchanged.exists())
+    )
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=primary_key,
+            set_={name: stmt.excluded[name] for name in update_columns},
+            where=sa.tuple_(
+                *(table.c[name] for name in update_columns)
+            ).is_distinct_from(
+                sa.tuple_(*(stmt.excluded[name] for name in update_columns))
+            ),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=primary_key)
+
+    # xmax is only zero for a row version written by an insert.
+    written = db.execute(stmt.returning(sa.literal_column("xmax = 0"))).scalars()
+    inserted = updated = 0
+    for is_insert in written:
+        if is_insert:
+            inserted += 1
+        else:
+            updated += 1
+    report.add(table.name, inserted, updated, len(rows) - inserted - updated)
+
+
+def _upsert_slugs(db: Session, rows: Sequence[Mapping[str, Any]], report: UpsertReport):
+    """Inserts slugs, never moving one that exists to another owner.
+
+    A slug that exists is left as it is if it belongs to the same family
+    or document, it is an error if it belongs to anything else.
+
+    :raises ValueError: If a slug belongs to another family, document or
+        collection.
+    """
+    table = Slug.__table__
+    stmt = (
+        postgresql.insert(table)
+        .values(list(rows))
+        .on_conflict_do_nothing(index_elements=[table.c.name])
+    )
+    inserted = set(db.execute(stmt.returning(table.c.name)).scalars())
+
+    existing = [row for row in rows if row["name"] not in inserted]
+    if existing:
+        owners = {
+            name: (family_import_id, family_document_import_id, collection_import_id)
+            for (
+                name,
+                family_import_id,
+                family_document_import_id,
+                collection_import_id,
+            ) in db.execute(
+                sa.select(
+                    table.c.name,
+                    table.c.family_import_id,
+                    table.c.family_document_import_id,
+                    table.c.collection_import_id,
+                ).where(table.c.name.in_([row["name"] for row in existing]))
+            )
+        }
+        for row in existing:
+            owner = (row["family_import_id"], row["family_document_import_id"], None)
+            if owners[row["name"]] != owner:
+                other = ", ".join(filter(None, owners[row["name"]]))
+                raise ValueError(f"Slug '{row['name']}' already belongs to {other}")
+    report.add(table.name, len(inserted), 0, len(existing))
+
+
+def add_collections(db: Session, collections, org_id=1, upsert=False):
+    """Adds collections to an organisation.
+
+    :param Session db: The DB session to connect to.
+    :param collections: The collections to add.
+    :param int org_id: The id of the organisation of the collections.
+    :param bool upsert: Whether to update the collections that already
+        exist, rather than failing.
+    :return Optional[UpsertReport]: The rows inserted, updated and
+        unchanged if upserting.
+    """
+    if upsert:
+        report = UpsertReport()
+        _upsert_rows(
+            db,
+            Collection.__table__,
+            [
+                {
+                    "import_id": c["import_id"],
+                    "title": c["title"],
+                    "description": c["description"],
+                    "valid_metadata": c["metadata"],
+                }
+                for c in collections
+            ],
+            report,
+        )
+        _upsert_rows(
+            db,
+            CollectionOrganisation.__table__,
+            [
+                {"collection_import_id": c["import_id"], "organisation_id": org_id}
+                for c in collections
+            ],
+            report,
+        )
+        db.commit()
+        return report
+
     for c in collections:
         db.add(
             Collection(
@@ -56,7 +255,47 @@ def add_collections(db: Session, collections, org_id=1):
     db.commit()
 
 
-def add_families(db: Session, families, org_id=1):
+def add_families(
+    db: Session,
+    families,
+    org_id=1,
+    language_registry: Optional[LanguageRegistry] = None,
+    upsert=False,
+):
+    """Adds families with their documents and events.
+
+    In upsert mode existing rows are updated where they differ and left
+    untouched where they do not, so an import can be re-run. Rows are
+    only ever added or updated, e.g. a geography or language dropped
+    from a family or document is not removed.
+
+    :param Session db: The DB session to connect to.
+    :param families: The families to add.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded when first needed if not given.
+    :param bool upsert: Whether to update the rows that already exist,
+        rather than failing.
+    :raises ValueError: If a document language code is unknown, or when
+        upserting, if a slug belongs to something else.
+    :return Optional[UpsertReport]: The rows inserted, updated and
+        unchanged if upserting.
+    """
+    if upsert:
+        families = list(families)
+        language_registry = _ensure_language_registry(
+            db, language_registry, [d for f in families for d in f["documents"]]
+        )
+        documents = _check_documents(families, language_registry)
+        document_ids = _physical_document_ids(db, documents)
+
+        report = UpsertReport()
+        for table, rows in _family_rows(families) + _document_rows(
+            documents, document_ids, language_registry
+        ):
+            _upsert_rows(db, table, rows, report)
+        db.commit()
+        return report
+
     for f in families:
         db.add(
             Family(
@@ -88,8 +327,11 @@ def add_families(db: Session, families, org_id=1):
                 )
             )
 
+        language_registry = _ensure_language_registry(
+            db, language_registry, f["documents"]
+        )
         for d in f["documents"]:
-            add_document(db, f["import_id"], d)
+            add_document(db, f["import_id"], d, language_registry)
 
         metadata_value = {}
         if "metadata" in f:
@@ -112,6 +354,268 @@ def add_families(db: Session, families, org_id=1):
     db.commit()
 
 
+def add_families_bulk(
+    db: Session,
+    families: Iterable,
+    org_id=1,
+    batch_size=1000,
+    language_registry: Optional[LanguageRegistry] = None,
+):
+    """Adds families with a handful of multi-row inserts per batch.
+
+    Takes the same input as add_families. Rather than flushing every
+    family and document, the physical document ids of a batch are
+    allocated from their sequence with one query and each table gets a
+    single executemany insert.
+
+    :param Session db: The DB session to connect to.
+    :param Iterable families: The families to add, as for add_families.
+    :param int batch_size: The number of families to insert at a time.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded when first needed if not given.
+    :raises ValueError: If a document language code is unknown.
+    """
+    families = iter(families)
+    while True:
+        batch = list(islice(families, batch_size))
+        if not batch:
+            break
+        language_registry = _ensure_language_registry(
+            db, language_registry, [d for f in batch for d in f["documents"]]
+        )
+        _insert_families_batch(db, batch, language_registry)
+    db.commit()
+
+
+def _ensure_language_registry(
+    db: Session, language_registry: Optional[LanguageRegistry], documents: List
+) -> Optional[LanguageRegistry]:
+    """Loads the language registry once any document has languages."""
+    if language_registry is None and any(d["languages"] for d in documents):
+        return LanguageRegistry.load(db)
+    return language_registry
+
+
+def _allocate_physical_document_ids(db: Session, count: int) -> List[int]:
+    """Takes a block of ids from the physical_document id sequence."""
+    if count == 0:
+        return []
+    return list(
+        db.execute(
+            sa.text(
+                "SELECT nextval(pg_get_serial_sequence('physical_document', 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"count": count},
+        ).scalars()
+    )
+
+
+def _physical_document_ids(db: Session, documents: List[Tuple[str, Any]]) -> List[int]:
+    """The physical document id of each document, allocating new ones."""
+    existing = dict(
+        db.query(FamilyDocument.import_id, FamilyDocument.physical_document_id).filter(
+            FamilyDocument.import_id.in_([d["import_id"] for _, d in documents])
+        )
+    )
+    new_ids = iter(
+        _allocate_physical_document_ids(
+            db, sum(1 for _, d in documents if d["import_id"] not in existing)
+        )
+    )
+    return [
+        existing[d["import_id"]] if d["import_id"] in existing else next(new_ids)
+        for _, d in documents
+    ]
+
+
+def _insert_rows(db: Session, table: sa.Table, rows: Sequence[Mapping[str, Any]]):
+    if rows:
+        db.execute(table.insert(), rows)
+
+
+def _insert_families_batch(
+    db: Session, families: List, language_registry: Optional[LanguageRegistry]
+):
+    documents = _check_documents(families, language_registry)
+    document_ids = _allocate_physical_document_ids(db, len(documents))
+    for table, rows in _family_rows(families) + _document_rows(
+        documents, document_ids, language_registry
+    ):
+        _insert_rows(db, table, rows)
+
+
+def _check_documents(
+    families: List, language_registry: Optional[LanguageRegistry]
+) -> List[Tuple[str, Any]]:
+    """Lists the documents of the families, checking their languages."""
+    documents = [(f["import_id"], d) for f in families for d in f["documents"]]
+    languages = {lang for _, d in documents for lang in d["languages"]}
+    if language_registry is not None:
+        unknown = {lang for lang in languages if lang not in language_registry}
+        if unknown:
+            raise ValueError(f"Unknown language codes: {sorted(unknown)}")
+    return documents
+
+
+def _family_rows(families: List) -> List[Tuple[sa.Table, List[Mapping[str, Any]]]]:
+    """Builds the rows of each table for the families, in FK order.
+
+    The rows of their documents are built by _document_rows.
+    """
+    return [
+        (
+            Family.__table__,
+            [
+                {
+                    "import_id": f["import_id"],
+                    "title": f["title"],
+                    "description": f["description"],
+                    "family_category": f["category"],
+                }
+                for f in families
+            ],
+        ),
+        (
+            FamilyGeography.__table__,
+            [
+                {"family_import_id": f["import_id"], "geography_id": geo_id}
+                for f in families
+                for geo_id in (
+                    f["geography_id"]
+                    if isinstance(f["geography_id"], list)
+                    else [f["geography_id"]]
+                )
+            ],
+        ),
+        (
+            FamilyMetadata.__table__,
+            [
+                {"family_import_id": f["import_id"], "value": f.get("metadata", {})}
+                for f in families
+            ],
+        ),
+        (
+            FamilyCorpus.__table__,
+            [
+                {
+                    "family_import_id": f["import_id"],
+                    "corpus_import_id": f["corpus_import_id"],
+                }
+                for f in families
+                if "corpus_import_id" in f
+            ],
+        ),
+        (
+            Slug.__table__,
+            [
+                {
+                    "family_import_id": f["import_id"],
+                    "family_document_import_id": None,
+                    "name": f["slug"],
+                }
+                for f in families
+            ],
+        ),
+    ]
+
+
+def _document_rows(
+    documents: List[Tuple[str, Any]],
+    document_ids: List[int],
+    language_registry: Optional[LanguageRegistry],
+) -> List[Tuple[sa.Table, List[Mapping[str, Any]]]]:
+    """Builds the rows of each table for the documents, in FK order.
+
+    :param List[Tuple[str, Any]] documents: The family import_id and
+        document of each document.
+    :param List[int] document_ids: The physical document id of each
+        document.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, required if any document has languages.
+    :return List[Tuple[sa.Table, List[Mapping[str, Any]]]]: The rows of
+        each table.
+    """
+    return [
+        (
+            PhysicalDocument.__table__,
+            [
+                {
+                    "id": document_id,
+                    "title": d["title"],
+                    "md5_sum": d["md5_sum"],
+                    "cdn_object": None,
+                    "source_url": d["url"],
+                    "content_type": d["content_type"],
+                }
+                for document_id, (_, d) in zip(document_ids, documents, strict=True)
+            ],
+        ),
+        (
+            FamilyDocument.__table__,
+            [
+                {
+                    "family_import_id": family_import_id,
+                    "physical_document_id": document_id,
+                    "import_id": d["import_id"],
+                    "variant_name": d["language_variant"],
+                    "document_status": d["status"],
+                    "valid_metadata": d["metadata"],
+                }
+                for document_id, (family_import_id, d) in zip(
+                    document_ids, documents, strict=True
+                )
+            ],
+        ),
+        (
+            PhysicalDocumentLanguage.__table__,
+            [
+                {
+                    "language_id": language_registry.language_id(lang),  # type: ignore
+                    "document_id": document_id,
+                    "source": "User",
+                    "visible": True,
+                }
+                for document_id, (_, d) in zip(document_ids, documents, strict=True)
+                for lang in d["languages"]
+            ],
+        ),
+        (
+            Slug.__table__,
+            [
+                {
+                    "family_import_id": None,
+                    "family_document_import_id": d["import_id"],
+                    "name": d["slug"],
+                }
+                for _, d in documents
+            ],
+        ),
+        (
+            FamilyEvent.__table__,
+            [
+                {
+                    "family_import_id": family_import_id,
+                    "family_document_import_id": d["import_id"],
+                    "import_id": e["import_id"],
+                    "title": e["title"],
+                    "date": e["date"],
+                    "event_type_name": e["type"],
+                    "status": e["status"],
+                    "valid_metadata": {
+                        "event_type": [e["type"]],
+                        "datetime_event_name": [
+                            e["valid_metadata"]["datetime_event_name"]
+                        ],
+                    },
+                }
+                for family_import_id, d in documents
+                for e in d["events"]
+            ],
+        ),
+    ]
+
+
 def add_event(db: Session, family_import_id, family_document_import_id, e):
     """Adds an Event"""
 
@@ -135,7 +639,41 @@ def add_event(db: Session, family_import_id, family_document_import_id, e):
     )
 
 
-def add_document(db: Session, family_import_id, d):
+def add_document(
+    db: Session,
+    family_import_id,
+    d,
+    language_registry: Optional[LanguageRegistry] = None,
+    upsert=False,
+):
+    """Adds a document with its events to a family.
+
+    NOTE: The session is not committed.
+
+    :param Session db: The DB session to connect to.
+    :param family_import_id: The import_id of the family.
+    :param d: The document to add.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded when first needed if not given.
+    :param bool upsert: Whether to update the rows that already exist,
+        rather than failing, see add_families.
+    :raises ValueError: If a document language code is unknown, or when
+        upserting, if a slug belongs to something else.
+    :return Optional[UpsertReport]: The rows inserted, updated and
+        unchanged if upserting.
+    """
+    if upsert:
+        language_registry = _ensure_language_registry(db, language_registry, [d])
+        documents = _check_documents(
+            [{"import_id": family_import_id, "documents": [d]}], language_registry
+        )
+        report = UpsertReport()
+        for table, rows in _document_rows(
+            documents, _physical_document_ids(db, documents), language_registry
+        ):
+            _upsert_rows(db, table, rows, report)
+        return report
+
     pd = PhysicalDocument(
         title=d["title"],
         md5_sum=d["md5_sum"],
@@ -159,11 +697,14 @@ def add_document(db: Session, family_import_id, d):
     )
     db.flush()
 
+    language_registry = _ensure_language_registry(db, language_registry, [d])
     for lang in d["languages"]:
-        db_lang = db.query(Language).filter(Language.language_code == lang).one()
         db.add(
             PhysicalDocumentLanguage(
-                language_id=db_lang.id, document_id=pd.id, source="User", visible=True
+                language_id=language_registry.language_id(lang),  # type: ignore
+                document_id=pd.id,
+                source="User",
+                visible=True,
             )
         )
 
@@ -187,3 +728,60 @@ def link_collection_family(db: Session, links: List[Tuple[str, str]]):
             )
         )
     db.flush()
+
+
+class CollectionSync(NamedTuple):
+    """The links added and removed by sync_collection_families."""
+
+    added: int
+    removed: int
+
+
+def sync_collection_families(
+    db: Session, collection_import_id: str, family_import_ids: Iterable[str]
+) -> CollectionSync:
+    """Makes the families of a collection exactly those given.
+
+    The difference with the existing links is worked out in the database
+    and applied with one DELETE and one INSERT. The collection's
+    last_modified is updated by the trigger of each statement that changes
+    links, so at most twice per sync rather than once per link, and not at
+    all if the links are unchanged.
+
+    NOTE: The session is not committed.
+
+    :param Session db: The DB session to connect to.
+    :param str collection_import_id: The import_id of the collection.
+    :param Iterable[str] family_import_ids: The import_ids of all the
+        families of the collection.
+    :return CollectionSync: The number of links added and removed.
+    """
+    table = CollectionFamily.__table__
+    params = {
+        "collection_import_id": collection_import_id,
+        "family_import_ids": sorted(set(family_import_ids)),
+    }
+    family_import_ids_param = sa.bindparam(
+        "family_import_ids", type_=postgresql.ARRAY(sa.Text)
+    )
+
+    removed = db.execute(
+        table.delete().where(
+            table.c.collection_import_id == sa.bindparam("collection_import_id"),
+            table.c.family_import_id != sa.all_(family_import_ids_param),
+        ),
+        params,
+    ).rowcount
+    added = db.execute(
+        postgresql.insert(table)
+        .from_select(
+            ["collection_import_id", "family_import_id"],
+            sa.select(
+                sa.bindparam("collection_import_id", type_=sa.Text),
+                sa.func.unnest(family_import_ids_param),
+            ),
+        )
+        .on_conflict_do_nothing(),
+        params,
+    ).rowcount
+    return CollectionSync(added, removed)
@@ -0,0 +1,77 @@
+"""
+Named loader profiles for querying families.
+
+The relationships of Family and its documents default to joined loading, so
+a plain query of families joins every document, slug, event and language
+and returns their product as rows. A profile replaces that with the
+loading a use case needs: collections are fetched with one extra query each
+(selectinload) and relationships the use case must not touch raise rather
+than lazily issuing a query per family.
+
+    db.query(Family).options(*family_load_options(FamilyLoadProfile.SUMMARY))
+
+The relationship defaults are left unchanged, so queries without a profile
+behave as before.
+"""
+
+from enum import Enum
+from typing import Tuple
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from db_client.models.dfce import Family, FamilyDocument
+from db_client.models.document.physical_document import (
+    PhysicalDocument,
+    PhysicalDocumentLanguage,
+)
+
+
+class FamilyLoadProfile(str, Enum):
+    """The ways families are loaded."""
+
+    # Listings: the family with its slugs, geographies and the status of
+    # its documents. Events, physical documents and languages raise, so
+    # published_date and last_updated_date must come from SQL instead.
+    SUMMARY = "summary"
+    # A single family page: everything, with anything else lazy loaded.
+    DETAIL = "detail"
+    # Bulk export: everything, and anything else raises so that
+    # serialising many families cannot issue a query per family.
+    EXPORT = "export"
+
+
+def _documents_in_full() -> LoaderOption:
+    return selectinload(Family.family_documents).options(
+        selectinload(FamilyDocument.slugs),
+        joinedload(FamilyDocument.physical_document)
+        .selectinload(PhysicalDocument.language_wrappers)
+        .joinedload(PhysicalDocumentLanguage.language),
+    )
+
+
+def family_load_options(profile: FamilyLoadProfile) -> Tuple[LoaderOption, ...]:
+    """Get the loader options of a profile for a query of Family.
+
+    :param FamilyLoadProfile profile: The profile to load families with.
+    :raises ValueError: If the profile is unknown.
+    :return Tuple[LoaderOption, ...]: The options to apply to the query.
+    """
+    profile = FamilyLoadProfile(profile)
+    if profile == FamilyLoadProfile.SUMMARY:
+        return (
+            selectinload(Family.slugs),
+            selectinload(Family.geographies),
+            selectinload(Family.family_documents).raiseload("*"),
+            raiseload(Family.events),
+        )
+
+    options: Tuple[LoaderOption, ...] = (
+        selectinload(Family.slugs),
+        selectinload(Family.geographies),
+        selectinload(Family.events),
+        _documents_in_full(),
+    )
+    if profile == FamilyLoadProfile.EXPORT:
+        options += (raiseload("*"),)
+    return options
@@ -0,0 +1,84 @@
+"""
+Refreshing the status and dates stored on families.
+
+The family_status, published_date and last_updated_date of a family are
+stored on it and recomputed by triggers whenever its documents or events
+change, so queries of them read a column rather than aggregating over the
+documents and events of every family.
+
+Only last_updated_date depends on the time, as events dated in the future
+are left out, so it goes stale as those dates pass. The date of the next
+event is stored too, and once it has passed the SQL expression of
+last_updated_date computes the date rather than reading the stale column.
+Refreshing the stale families on a schedule keeps queries on the column:
+
+    make refresh_family_status_dates
+"""
+
+import argparse
+import os
+from typing import Iterable, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from db_client.models.dfce import Family
+
+
+def _stale_family_ids():
+    """The families with an event that is now past but not yet counted."""
+    return sa.select(Family.import_id).where(Family.next_event_date <= sa.func.now())
+
+
+def refresh_family_status_dates(
+    db: Session,
+    family_import_ids: Optional[Iterable[str]] = None,
+    stale_only: bool = False,
+) -> int:
+    """Recomputes the status and dates stored on families.
+
+    NOTE: This does not commit the session.
+
+    :param Session db: The DB session to connect to.
+    :param Optional[Iterable[str]] family_import_ids: The families to
+        refresh, all of them if not given.
+    :param bool stale_only: Whether to refresh only the families whose
+        last_updated_date is stale, of those given.
+    :return int: The number of families whose values changed.
+    """
+    family_ids = None
+    if family_import_ids is not None:
+        family_ids = sa.bindparam(
+            "family_ids", list(family_import_ids), type_=sa.ARRAY(sa.Text)
+        )
+    if stale_only:
+        stale = _stale_family_ids()
+        if family_ids is not None:
+            stale = stale.where(Family.import_id == sa.any_(family_ids))
+        family_ids = sa.func.array(stale.scalar_subquery())
+
+    return db.execute(
+        sa.select(
+            sa.func.refresh_family_status_dates(sa.cast(family_ids, sa.ARRAY(sa.Text)))
+        )
+    ).scalar_one()
+
+
+def main():
+    """Refreshes the families of the database at DATABASE_URL."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--stale-only",
+        action="store_true",
+        help="only refresh the families whose last_updated_date is stale",
+    )
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL")
+    if db_url is None:
+        raise ValueError("Environment variable DATABASE_URL not set")
+
+    with Session(sa.create_engine(db_url)) as db:
+        refreshed = refresh_family_status_dates(db, stale_only=args.stale_only)
+        db.commit()
+    print(f"Refreshed {refreshed} families")
@@ -0,0 +1,162 @@
+"""
+An in-process allocator of import ids for long-running services.
+
+Counter values are reserved from EntityCounter in blocks per organisation
+prefix and handed out from memory, so most import ids are created without a
+database round-trip. When fewer than the low-water mark remain the next
+block is reserved in the background.
+
+Values reserved but not handed out when the process stops are never used,
+so the counters have gaps, much as a sequence with a cache does.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db_client.models.organisation.counters import CountedEntity, EntityCounter
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 100
+DEFAULT_LOW_WATER_MARK = 20
+
+
+class _Pool:
+    """The reserved counter values of a prefix."""
+
+    def __init__(self):
+        self.values: Deque[int] = deque()
+        self.counter: Optional[EntityCounter] = None
+        self.refill: Optional[Future] = None
+
+
+class ImportIdAllocator:
+    """Hands out import ids from blocks of counter values reserved ahead.
+
+    It is safe to use from many threads and asyncio tasks at once, the
+    values are taken under a lock that is never held during a query.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        low_water_mark: int = DEFAULT_LOW_WATER_MARK,
+    ):
+        if block_size < 1:
+            raise ValueError(f"Cannot reserve blocks of {block_size} values")
+        self._engine = engine
+        self._block_size = block_size
+        self._low_water_mark = low_water_mark
+        self._lock = threading.Lock()
+        self._pools: Dict[str, _Pool] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="import-id-refill"
+        )
+
+    def _refill(self, prefix: str, pool: _Pool, n: int):
+        try:
+            with Session(self._engine) as db:
+                counter = (
+                    db.query(EntityCounter)
+                    .filter(EntityCounter.prefix == prefix)
+                    .one_or_none()
+                )
+                if counter is None:
+                    raise ValueError(f"No counter for prefix '{prefix}'")
+                block = counter.reserve_block(n)
+            with self._lock:
+                pool.counter = counter
+                pool.values.extend(block)
+        finally:
+            with self._lock:
+                pool.refill = None
+
+    def _start_refill(self, prefix: str, pool: _Pool, n: int) -> Future:
+        # Called with the lock held.
+        if pool.refill is None:
+            pool.refill = self._executor.submit(
+                self._refill, prefix, pool, max(n, self._block_size)
+            )
+            pool.refill.add_done_callback(_log_refill_error)
+        return pool.refill
+
+    def _take(
+        self, prefix: str, n: int
+    ) -> Tuple[Optional[List[int]], Optional[Future]]:
+        """Takes n values if they are reserved, else the refill to wait on."""
+        with self._lock:
+            pool = self._pools.setdefault(prefix, _Pool())
+            if len(pool.values) < n:
+                return None, self._start_refill(prefix, pool, n - len(pool.values))
+            values = [pool.values.popleft() for _ in range(n)]
+            if len(pool.values) < self._low_water_mark:
+                self._start_refill(prefix, pool, self._block_size)
+            return values, None
+
+    def _formatter(self, prefix: str) -> EntityCounter:
+        with self._lock:
+            return self._pools[prefix].counter  # type: ignore
+
+    def acquire_many(self, prefix: str, entity: CountedEntity, n: int) -> List[str]:
+        """Creates n unique import ids.
+
+        :param str prefix: The organisation prefix of the counter.
+        :param CountedEntity entity: The entity you want counted.
+        :param int n: The number of import ids.
+        :raises ValueError: If there is no counter for the prefix.
+        :return List[str]: The fully formatted import_ids.
+        """
+        values, refill = self._take(prefix, n)
+        while values is None:
+            # Raises the error of the refill, if any.
+            refill.result()  # type: ignore
+            values, refill = self._take(prefix, n)
+        counter = self._formatter(prefix)
+        return [counter.format_import_id(entity, value) for value in values]
+
+    def acquire(self, prefix: str, entity: CountedEntity) -> str:
+        """Creates a unique import id.
+
+        :param str prefix: The organisation prefix of the counter.
+        :param CountedEntity entity: The entity you want counted.
+        :raises ValueError: If there is no counter for the prefix.
+        :return str: The fully formatted import_id.
+        """
+        return self.acquire_many(prefix, entity, 1)[0]
+
+    async def acquire_async(self, prefix: str, entity: CountedEntity) -> str:
+        """Creates a unique import id, waiting for a refill off the loop.
+
+        :param str prefix: The organisation prefix of the counter.
+        :param CountedEntity entity: The entity you want counted.
+        :raises ValueError: If there is no counter for the prefix.
+        :return str: The fully formatted import_id.
+        """
+        values, _ = self._take(prefix, 1)
+        if values is None:
+            return await asyncio.to_thread(self.acquire, prefix, entity)
+        return self._formatter(prefix).format_import_id(entity, values[0])
+
+    def close(self):
+        """Waits for any refill and stops the refill thread."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ImportIdAllocator":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _log_refill_error(refill: Future):
+    error = refill.exception()
+    if error is not None:
+        _LOGGER.error(f"When reserving import ids: {error!r}")
@@ -0,0 +1,377 @@
+"""
+Dry-run validation of imports, before anything is written.
+
+Every family, document and event of an import is checked in memory against
+the reference data it depends on: the taxonomies of its corpora, the
+languages, geographies and document variants, and the slugs and import ids
+already in use. The reference data is fetched with a handful of set
+queries, one taxonomy per corpus, however large the import.
+
+All the errors are collected in one report, so an import can be fixed in
+one pass rather than failing part way through the writes.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Type
+
+from sqlalchemy.orm import Session
+
+from db_client.functions.corpus_helpers import get_taxonomies_from_corpora
+from db_client.functions.language_registry import LanguageRegistry
+from db_client.functions.metadata import _validate_metadata, get_compiled_taxonomy
+from db_client.models.dfce import Family, FamilyDocument, FamilyEvent, Slug
+from db_client.models.dfce.family import (
+    DocumentStatus,
+    EventStatus,
+    FamilyCategory,
+    Variant,
+)
+from db_client.models.dfce.geography import Geography
+from db_client.models.dfce.taxonomy_entry import EntitySpecificTaxonomyKeys
+from db_client.models.organisation.enum import BaseModelEnum
+
+ENTITY_FAMILY = "family"
+ENTITY_DOCUMENT = "document"
+ENTITY_EVENT = "event"
+
+_FAMILY_FIELDS = (
+    "import_id",
+    "title",
+    "description",
+    "slug",
+    "category",
+    "geography_id",
+    "documents",
+)
+_DOCUMENT_FIELDS = (
+    "import_id",
+    "title",
+    "slug",
+    "url",
+    "md5_sum",
+    "content_type",
+    "language_variant",
+    "status",
+    "metadata",
+    "languages",
+    "events",
+)
+_EVENT_FIELDS = ("import_id", "title", "date", "type", "status", "valid_metadata")
+
+
+class ImportValidationError(NamedTuple):
+    """A single problem with an import."""
+
+    entity: str
+    import_id: Optional[str]
+    field: str
+    message: str
+
+    def __str__(self) -> str:
+        """Renders the error message."""
+        return f"{self.entity} '{self.import_id}' {self.field}: {self.message}"
+
+
+class ImportValidationReport(NamedTuple):
+    """All the problems found with an import."""
+
+    errors: List[ImportValidationError]
+    families: int
+    documents: int
+    events: int
+
+    @property
+    def valid(self) -> bool:
+        """Whether the import can be written."""
+        return not self.errors
+
+
+class _ReferenceData(NamedTuple):
+    taxonomies: Dict[str, Any]
+    geography_ids: Set[int]
+    variant_names: Set[str]
+    languages: LanguageRegistry
+    # The import_id of the family or document each slug belongs to.
+    used_slugs: Dict[str, Optional[str]]
+    used_import_ids: Dict[str, Set[str]]
+
+
+def _geography_ids(f: Dict[str, Any]) -> List[Any]:
+    geo_ids = f.get("geography_id", [])
+    return geo_ids if isinstance(geo_ids, list) else [geo_ids]
+
+
+def _load_reference_data(
+    db: Session, families: List[Dict[str, Any]], languages: LanguageRegistry
+) -> _ReferenceData:
+    documents = [d for f in families for d in f.get("documents", [])]
+    events = [e for d in documents for e in d.get("events", [])]
+    slugs = {f.get("slug") for f in families} | {d.get("slug") for d in documents}
+
+    def existing(model, import_ids) -> Set[str]:
+        import_ids = {import_id for import_id in import_ids if import_id}
+        if not import_ids:
+            return set()
+        return {
+            import_id
+            for (import_id,) in db.query(model.import_id).filter(
+                model.import_id.in_(import_ids)
+            )
+        }
+
+    return _ReferenceData(
+        taxonomies=dict(
+            get_taxonomies_from_corpora(
+                db,
+                {f["corpus_import_id"] for f in families if f.get("corpus_import_id")},
+            )
+        ),
+        geography_ids={
+            geo_id
+            for (geo_id,) in db.query(Geography.id).filter(
+                Geography.id.in_(
+                    {
+                        geo_id
+                        for f in families
+                        for geo_id in _geography_ids(f)
+                        if isinstance(geo_id, int)
+                    }
+                )
+            )
+        },
+        variant_names={name for (name,) in db.query(Variant.variant_name)},
+        languages=languages,
+        used_slugs={
+            name: family_import_id or family_document_import_id
+            for name, family_import_id, family_document_import_id in db.query(
+                Slug.name, Slug.family_import_id, Slug.family_document_import_id
+            ).filter(Slug.name.in_({slug for slug in slugs if slug}))
+        },
+        used_import_ids={
+            ENTITY_FAMILY: existing(Family, (f.get("import_id") for f in families)),
+            ENTITY_DOCUMENT: existing(
+                FamilyDocument, (d.get("import_id") for d in documents)
+            ),
+            ENTITY_EVENT: existing(FamilyEvent, (e.get("import_id") for e in events)),
+        },
+    )
+
+
+class _Validator:
+    def __init__(self, reference: _ReferenceData, upsert: bool):
+        self._reference = reference
+        self._upsert = upsert
+        self.errors: List[ImportValidationError] = []
+        self._slug_uses: Counter = Counter()
+        self._import_id_uses: Dict[str, Counter] = {
+            entity: Counter()
+            for entity in (ENTITY_FAMILY, ENTITY_DOCUMENT, ENTITY_EVENT)
+        }
+
+    def _error(self, entity: str, import_id: Optional[str], field: str, message: str):
+        self.errors.append(ImportValidationError(entity, import_id, field, message))
+
+    def _has_fields(self, entity: str, payload: Dict[str, Any], fields) -> bool:
+        missing = [name for name in fields if name not in payload]
+        for name in missing:
+            self._error(entity, payload.get("import_id"), name, "missing")
+        return not missing
+
+    def _enum(
+        self,
+        entity: str,
+        import_id: str,
+        field: str,
+        enum_type: Type[BaseModelEnum],
+        value: Any,
+    ):
+        try:
+            enum_type(value)
+        except ValueError:
+            self._error(entity, import_id, field, f"unknown value '{value}'")
+
+    def _metadata(
+        self,
+        entity: str,
+        import_id: str,
+        field: str,
+        corpus_id: Optional[str],
+        metadata: Any,
+        entity_key: Optional[str],
+    ):
+        if corpus_id is None or corpus_id not in self._reference.taxonomies:
+            # The corpus is reported once, with the family.
+            return
+        try:
+            taxonomy_entries = get_compiled_taxonomy(
+                corpus_id, self._reference.taxonomies[corpus_id], entity_key
+            )
+        except (TypeError, ValueError) as e:
+            # The taxonomy itself is invalid, e.g. its datetime_event_name.
+            self._error(entity, import_id, field, f"bad taxonomy: {e}")
+            return
+        except (KeyError, IndexError) as e:
+            # The datetime_event_name check assumes an event_type entry
+            # and a datetime_event_name value.
+            self._error(
+                entity, import_id, field, f"bad taxonomy: Incomplete, missing {e}"
+            )
+            return
+        if not isinstance(metadata, dict):
+            self._error(entity, import_id, field, "expected a dictionary")
+            return
+        try:
+            messages = _validate_metadata(
+                taxonomy_entries, metadata, entity_key is None
+            )
+        except (AttributeError, TypeError, ValueError) as e:
+            messages = [f"cannot be validated: {e}"]
+        for message in messages:
+            self._error(entity, import_id, field, message)
+
+    def _identity(self, entity: str, import_id: str, slug: Optional[str]):
+        self._import_id_uses[entity][import_id] += 1
+        if not self._upsert and import_id in self._reference.used_import_ids[entity]:
+            self._error(entity, import_id, "import_id", "already exists")
+        if slug is not None:
+            self._slug_uses[slug] += 1
+            used_slugs = self._reference.used_slugs
+            # An upsert may rewrite the slug of the same entity.
+            if slug in used_slugs and not (
+                self._upsert and used_slugs[slug] == import_id
+            ):
+                self._error(entity, import_id, "slug", f"'{slug}' already exists")
+
+    def family(self, f: Dict[str, Any]):
+        if not self._has_fields(ENTITY_FAMILY, f, _FAMILY_FIELDS):
+            return
+        import_id = f["import_id"]
+        self._identity(ENTITY_FAMILY, import_id, f["slug"])
+        self._enum(ENTITY_FAMILY, import_id, "category", FamilyCategory, f["category"])
+
+        for geo_id in _geography_ids(f):
+            if geo_id not in self._reference.geography_ids:
+                self._error(
+                    ENTITY_FAMILY, import_id, "geography_id", f"unknown '{geo_id}'"
+                )
+
+        corpus_id = f.get("corpus_import_id")
+        if corpus_id is not None and corpus_id not in self._reference.taxonomies:
+            self._error(
+                ENTITY_FAMILY, import_id, "corpus_import_id", f"unknown '{corpus_id}'"
+            )
+        self._metadata(
+            ENTITY_FAMILY, import_id, "metadata", corpus_id, f.get("metadata", {}), None
+        )
+
+        for d in f["documents"]:
+            self.document(corpus_id, d)
+
+    def document(self, corpus_id: Optional[str], d: Dict[str, Any]):
+        if not self._has_fields(ENTITY_DOCUMENT, d, _DOCUMENT_FIELDS):
+            return
+        import_id = d["import_id"]
+        self._identity(ENTITY_DOCUMENT, import_id, d["slug"])
+        self._enum(ENTITY_DOCUMENT, import_id, "status", DocumentStatus, d["status"])
+
+        variant = d["language_variant"]
+        if variant is not None and variant not in self._reference.variant_names:
+            self._error(
+                ENTITY_DOCUMENT, import_id, "language_variant", f"unknown '{variant}'"
+            )
+        for lang in d["languages"]:
+            if lang not in self._reference.languages:
+                self._error(
+                    ENTITY_DOCUMENT, import_id, "languages", f"unknown '{lang}'"
+                )
+
+        self._metadata(
+            ENTITY_DOCUMENT,
+            import_id,
+            "metadata",
+            corpus_id,
+            d["metadata"],
+            EntitySpecificTaxonomyKeys.DOCUMENT.value,
+        )
+
+        for e in d["events"]:
+            self.event(corpus_id, e)
+
+    def event(self, corpus_id: Optional[str], e: Dict[str, Any]):
+        if not self._has_fields(ENTITY_EVENT, e, _EVENT_FIELDS):
+            return
+        import_id = e["import_id"]
+        self._identity(ENTITY_EVENT, import_id, None)
+        self._enum(ENTITY_EVENT, import_id, "status", EventStatus, e["status"])
+
+        valid_metadata = e["valid_metadata"] or {}
+        if not isinstance(valid_metadata, dict):
+            self._error(
+                ENTITY_EVENT, import_id, "valid_metadata", "expected a dictionary"
+            )
+            return
+        datetime_event_name = valid_metadata.get("datetime_event_name")
+        if datetime_event_name is None:
+            self._error(ENTITY_EVENT, import_id, "valid_metadata", "missing name")
+            return
+        # As written by add_event.
+        metadata = {
+            "event_type": [e["type"]],
+            "datetime_event_name": [datetime_event_name],
+        }
+        self._metadata(
+            ENTITY_EVENT,
+            import_id,
+            "valid_metadata",
+            corpus_id,
+            metadata,
+            EntitySpecificTaxonomyKeys.EVENT.value,
+        )
+
+    def duplicates(self):
+        """Reports the slugs and import ids used more than once."""
+        for entity, uses in self._import_id_uses.items():
+            for import_id, count in uses.items():
+                if count > 1:
+                    self._error(entity, import_id, "import_id", f"used {count} times")
+        for slug, count in self._slug_uses.items():
+            if count > 1:
+                self._error("slug", slug, "slug", f"used {count} times")
+
+
+def validate_import(
+    db: Session,
+    families: Iterable,
+    language_registry: Optional[LanguageRegistry] = None,
+    upsert=False,
+) -> ImportValidationReport:
+    """Validates an import without writing anything.
+
+    :param Session db: The DB session to connect to.
+    :param Iterable families: The families to validate, as for
+        add_families.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded if not given.
+    :param bool upsert: Whether the import will be written with upsert,
+        in which case existing import ids and slugs are allowed.
+    :return ImportValidationReport: All the errors found, empty if the
+        import is valid.
+    """
+    families = list(families)
+    if language_registry is None:
+        language_registry = LanguageRegistry.load(db)
+    validator = _Validator(
+        _load_reference_data(db, families, language_registry), upsert
+    )
+
+    for f in families:
+        validator.family(f)
+    validator.duplicates()
+
+    documents = [d for f in families for d in f.get("documents", [])]
+    return ImportValidationReport(
+        validator.errors,
+        len(families),
+        len(documents),
+        sum(len(d.get("events", [])) for d in documents),
+    )
@@ -0,0 +1,118 @@
+"""
+An in-process index of the language table.
+
+The language table is seeded once and rarely changes, so rather than
+querying it for every language of every document it is loaded in a single
+query and indexed by each of its codes and its case-folded name.
+"""
+
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from db_client.models.document.physical_document import Language
+
+
+class LanguageRecord(NamedTuple):
+    """A row of the language table, detached from any session."""
+
+    id: int
+    language_code: str
+    part1_code: Optional[str]
+    part2_code: Optional[str]
+    name: Optional[str]
+
+
+def _normalise(value: Optional[str]) -> Optional[str]:
+    # The codes are CHAR columns so may come back padded.
+    if value is None:
+        return None
+    value = value.strip().casefold()
+    return value or None
+
+
+class LanguageRegistry:
+    """Resolves language codes and names to languages without queries.
+
+    Lookups are case insensitive and try, in order, the ISO 639-3
+    language_code, the ISO 639-1 part1_code, the ISO 639-2 part2_code and
+    the name.
+    """
+
+    def __init__(self, languages: Iterable[LanguageRecord]):
+        self._languages = list(languages)
+        self._indexes: Dict[str, Dict[str, LanguageRecord]] = {
+            field: {} for field in ("language_code", "part1_code", "part2_code", "name")
+        }
+        for language in self._languages:
+            for field, index in self._indexes.items():
+                key = _normalise(getattr(language, field))
+                # The first language wins, as for a query ordered by id.
+                if key is not None and key not in index:
+                    index[key] = language
+
+    @classmethod
+    def load(cls, db: Session) -> "LanguageRegistry":
+        """Loads the language table with a single query.
+
+        :param Session db: The DB session to connect to.
+        :return LanguageRegistry: The registry of all the languages.
+        """
+        rows = db.query(
+            Language.id,
+            Language.language_code,
+            Language.part1_code,
+            Language.part2_code,
+            Language.name,
+        ).order_by(Language.id)
+        return cls(LanguageRecord(*row) for row in rows)
+
+    def get(self, value: str) -> Optional[LanguageRecord]:
+        """Finds a language by any of its codes or its name.
+
+        :param str value: The code or name to look up.
+        :return Optional[LanguageRecord]: The language or None if not
+            found.
+        """
+        key = _normalise(value)
+        if key is None:
+            return None
+        for index in self._indexes.values():
+            language = index.get(key)
+            if language is not None:
+                return language
+        return None
+
+    def get_by_code(self, language_code: str) -> Optional[LanguageRecord]:
+        """Finds a language by its ISO 639-3 code only.
+
+        :param str language_code: The language_code to look up.
+        :return Optional[LanguageRecord]: The language or None if not
+            found.
+        """
+        key = _normalise(language_code)
+        return self._indexes["language_code"].get(key) if key else None
+
+    def language_id(self, value: str) -> int:
+        """Get the id of a language by any of its codes or its name.
+
+        :param str value: The code or name to look up.
+        :raises ValueError: If the language is unknown.
+        :return int: The id of the language.
+        """
+        language = self.get(value)
+        if language is None:
+            raise ValueError(f"Unknown language '{value}'")
+        return language.id
+
+    def __contains__(self, value: object) -> bool:
+        """Whether a language has the code or name."""
+        return isinstance(value, str) and self.get(value) is not None
+
+    def __iter__(self) -> Iterator[LanguageRecord]:
+        """Iterates over the languages in id order."""
+        return iter(self._languages)
+
+    def __len__(self) -> int:
+        """Returns the number of languages."""
+        return len(self._languages)
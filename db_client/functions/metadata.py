@@ -1,23 +1,235 @@
 import logging
-from typing import Any, Mapping, Optional, Sequence, Union
+from enum import Enum
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from db_client.functions.corpus_helpers import (
     TaxonomyData,
     TaxonomyDataEntry,
     get_entity_specific_taxonomy,
-    get_taxonomy_from_corpus,
+    get_taxonomies_from_corpora,
+    get_taxonomy_and_hash_from_corpus,
+    get_taxonomy_and_hash_from_corpus_async,
+    get_taxonomy_hash_from_corpus,
+    get_taxonomy_hash_from_corpus_async,
 )
+from db_client.functions.taxonomy_cache import LRUCache, taxonomy_digest
 from db_client.models.dfce.taxonomy_entry import (
     EntitySpecificTaxonomyKeys,
     TaxonomyEntry,
 )
 
 MetadataValidationErrors = Sequence[str]
+MetadataValidationItem = Tuple[str, TaxonomyDataEntry, Optional[str]]
 _LOGGER = logging.getLogger(__name__)
 
 
+class MetadataErrorCode(str, Enum):
+    """The reasons metadata can fail validation."""
+
+    MISSING_KEYS = "missing_keys"
+    EXTRA_KEYS = "extra_keys"
+    NOT_A_LIST = "not_a_list"
+    NON_STRING_VALUES = "non_string_values"
+    INVALID_VALUES = "invalid_values"
+    BLANK_VALUE = "blank_value"
+
+
+class MetadataValidationError(NamedTuple):
+    """A single metadata validation failure.
+
+    The message is only rendered when the error is converted to a
+    string, so validating metadata does no formatting unless it fails.
+    """
+
+    code: MetadataErrorCode
+    # The metadata key, None when the error concerns the set of keys.
+    key: Optional[str]
+    # The offending keys or values.
+    values: Collection[Any]
+    # The metadata value as given, used when rendering the message.
+    value: Any = None
+
+    def __str__(self) -> str:
+        """Renders the error message."""
+        if self.code == MetadataErrorCode.MISSING_KEYS:
+            return f"Missing metadata keys: {set(self.values)}"
+        if self.code == MetadataErrorCode.EXTRA_KEYS:
+            return f"Extra metadata keys: {set(self.values)}"
+        if self.code == MetadataErrorCode.NOT_A_LIST:
+            return (
+                f"Invalid value '{self.value}' for metadata key '{self.key}' "
+                "expected list."
+            )
+        if self.code == MetadataErrorCode.NON_STRING_VALUES:
+            return (
+                f"Invalid value(s) in '{self.value}' for metadata key '{self.key}', "
+                "expected all items to be strings."
+            )
+        if self.code == MetadataErrorCode.INVALID_VALUES:
+            return f"Invalid value '{self.value}' for metadata key '{self.key}'"
+        return f"Blank value for metadata key '{self.key}'"
+
+
+class CompiledTaxonomy(Mapping[str, TaxonomyEntry]):
+    """The TaxonomyEntry objects of a taxonomy, compiled for validation.
+
+    Behaves as a read-only mapping of the taxonomy entries. The allowed
+    values are held as frozensets and the keys as a frozenset so that
+    validating metadata only does hash lookups.
+    """
+
+    def __init__(self, taxonomy_entries: Mapping[str, TaxonomyEntry]):
+        self._entries = dict(taxonomy_entries)
+        self.taxonomy_keys = frozenset(self._entries)
+        # For each key the allowed values (None if anything goes) and
+        # whether blank values are allowed.
+        self._rules: Dict[str, Tuple[Optional[FrozenSet[str]], bool]] = {
+            key: (
+                None if entry.allow_any else frozenset(entry.allowed_values),
+                entry.allow_blanks,
+            )
+            for key, entry in self._entries.items()
+        }
+
+    def __getitem__(self, key: str) -> TaxonomyEntry:
+        """Returns the TaxonomyEntry for the key."""
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the taxonomy keys."""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """Returns the number of taxonomy keys."""
+        return len(self._entries)
+
+    def validate(
+        self, metadata: Mapping, is_family_metadata: bool = False
+    ) -> List[MetadataValidationError]:
+        """Validates the metadata against the taxonomy.
+
+        :param Mapping metadata: The metadata to validate.
+        :param bool is_family_metadata: Whether to validate all metadata
+            values as string arrays.
+        :return List[MetadataValidationError]: The errors found, empty
+            if the metadata is valid.
+        """
+        errors: List[MetadataValidationError] = []
+        metadata_keys = set(metadata)
+        missing_keys = self.taxonomy_keys - metadata_keys
+        if missing_keys:
+            errors.append(
+                MetadataValidationError(
+                    MetadataErrorCode.MISSING_KEYS, None, missing_keys
+                )
+            )
+        extra_keys = metadata_keys - self.taxonomy_keys
+        if extra_keys:
+            errors.append(
+                MetadataValidationError(MetadataErrorCode.EXTRA_KEYS, None, extra_keys)
+            )
+
+        # Validate the metadata values
+        for key, value_list in metadata.items():
+            rule = self._rules.get(key)
+            if rule is None:
+                continue  # We've already checked for extra keys
+            allowed_values, allow_blanks = rule
+
+            if not isinstance(value_list, list):
+                errors.append(
+                    MetadataValidationError(
+                        MetadataErrorCode.NOT_A_LIST, key, [value_list], value_list
+                    )
+                )
+                continue
+
+            # Ensure all items in value_list are strings
+            if is_family_metadata and not all(
+                isinstance(item, str) for item in value_list
+            ):
+                errors.append(
+                    MetadataValidationError(
+                        MetadataErrorCode.NON_STRING_VALUES,
+                        key,
+                        [item for item in value_list if not isinstance(item, str)],
+                        value_list,
+                    )
+                )
+                continue
+
+            if allowed_values is not None and not _all_allowed(
+                allowed_values, value_list
+            ):
+                errors.append(
+                    MetadataValidationError(
+                        MetadataErrorCode.INVALID_VALUES,
+                        key,
+                        [
+                            item
+                            for item in value_list
+                            if not _all_allowed(allowed_values, [item])
+                        ],
+                        value_list,
+                    )
+                )
+                continue
+
+            if not allow_blanks and not value_list:
+                errors.append(
+                    MetadataValidationError(
+                        MetadataErrorCode.BLANK_VALUE, key, [], value_list
+                    )
+                )
+
+        return errors
+
+
+def _all_allowed(allowed_values: FrozenSet[str], values: List[Any]) -> bool:
+    """Checks every value is allowed, unhashable values never are."""
+    try:
+        return allowed_values.issuperset(values)
+    except TypeError:
+        return False
+
+
+# Compiled taxonomies keyed by (corpus import_id, taxonomy digest, entity key).
+_TAXONOMY_CACHE: LRUCache[Tuple[str, str, Optional[str]], CompiledTaxonomy] = LRUCache()
+
+
+def invalidate_taxonomy_cache(corpus_id: Optional[str] = None) -> int:
+    """Drops compiled taxonomies from the process-wide cache.
+
+    Entries are keyed by the taxonomy content so an edited taxonomy is
+    never served from the cache, this is for releasing memory or
+    forcing a rebuild.
+
+    :param Optional[str] corpus_id: The corpus import ID to drop the
+        taxonomies for, if None the whole cache is cleared.
+    :return int: The number of entries removed.
+    """
+    if corpus_id is None:
+        return _TAXONOMY_CACHE.invalidate()
+    return _TAXONOMY_CACHE.invalidate(lambda key: key[0] == corpus_id)
+
+
 def validate_metadata(
     db: Session,
     corpus_id: str,
@@ -30,6 +242,9 @@ def validate_metadata(
     Taxonomy is stored in the database and can be mutated independently
     of the metadata.
 
+    Only the hash of the taxonomy is fetched when it has already been
+    compiled, the taxonomy itself on a cache miss or if it has no hash.
+
     :param Session db: The Session to query.
     :param str corpus_id: The corpus import ID to retrieve the taxonomy
         for.
@@ -39,14 +254,189 @@ def validate_metadata(
     :return Optional[MetadataValidationResult]: A list of errors or None
         if the metadata is valid.
     """
-    taxonomy = get_taxonomy_from_corpus(db, corpus_id)
+    taxonomy_entries = _get_cached_taxonomy(
+        corpus_id, get_taxonomy_hash_from_corpus(db, corpus_id), entity_key
+    )
+    if taxonomy_entries is None:
+        taxonomy, taxonomy_hash = get_taxonomy_and_hash_from_corpus(db, corpus_id)
+        taxonomy_entries = _compile_corpus_taxonomy(
+            corpus_id, taxonomy, taxonomy_hash, entity_key
+        )
+    return _validate_corpus_metadata(taxonomy_entries, metadata, entity_key)
+
+
+async def validate_metadata_async(
+    db: AsyncSession,
+    corpus_id: str,
+    metadata: TaxonomyDataEntry,
+    entity_key: Optional[str] = None,
+) -> Optional[MetadataValidationErrors]:
+    """Validates the metadata against its Corpus' Taxonomy.
+
+    The same as validate_metadata, except the taxonomy is fetched with
+    an AsyncSession so the event loop is not blocked. Validation itself
+    does no I/O and runs inline.
+
+    :param AsyncSession db: The async Session to query.
+    :param str corpus_id: The corpus import ID to retrieve the taxonomy
+        for.
+    :param TaxonomyDataEntry metadata: The metadata to validate.
+    :param Optional[str] entity_key: The entity specific key to filter
+        taxonomy by.
+    :return Optional[MetadataValidationErrors]: A list of errors or None
+        if the metadata is valid.
+    """
+    taxonomy_entries = _get_cached_taxonomy(
+        corpus_id, await get_taxonomy_hash_from_corpus_async(db, corpus_id), entity_key
+    )
+    if taxonomy_entries is None:
+        taxonomy, taxonomy_hash = await get_taxonomy_and_hash_from_corpus_async(
+            db, corpus_id
+        )
+        taxonomy_entries = _compile_corpus_taxonomy(
+            corpus_id, taxonomy, taxonomy_hash, entity_key
+        )
+    return _validate_corpus_metadata(taxonomy_entries, metadata, entity_key)
+
+
+def _get_cached_taxonomy(
+    corpus_id: str, taxonomy_hash: Optional[str], entity_key: Optional[str]
+) -> Optional[CompiledTaxonomy]:
+    """The compiled taxonomy for a stored hash, if it has been cached.
+
+    The taxonomy itself only needs to be fetched on a miss, or when there
+    is no stored hash and its content must be hashed instead.
+    """
+    if taxonomy_hash is None:
+        return None
+    return _TAXONOMY_CACHE.get((corpus_id, taxonomy_hash, entity_key))
+
+
+def _compile_corpus_taxonomy(
+    corpus_id: str,
+    taxonomy: Optional[TaxonomyData],
+    taxonomy_hash: Optional[str],
+    entity_key: Optional[str],
+) -> CompiledTaxonomy:
     if taxonomy is None:
         raise TypeError("No taxonomy found for corpus")
+    return get_compiled_taxonomy(corpus_id, taxonomy, entity_key, taxonomy_hash)
+
+
+def _validate_corpus_metadata(
+    taxonomy_entries: CompiledTaxonomy,
+    metadata: TaxonomyDataEntry,
+    entity_key: Optional[str],
+) -> Optional[MetadataValidationErrors]:
+    errors = _validate_metadata(taxonomy_entries, metadata, bool(entity_key is None))
+    return errors if len(errors) > 0 else None
+
+
+def validate_metadata_many(
+    db: Session, items: Iterable[MetadataValidationItem]
+) -> List[Optional[MetadataValidationErrors]]:
+    """Validates many metadata values against their Corpus' Taxonomy.
+
+    All the taxonomies are fetched with a single query and each one is
+    only built once, regardless of the number of items.
+
+    :param Session db: The Session to query.
+    :param Iterable[MetadataValidationItem] items: Tuples of corpus
+        import ID, metadata and entity key, as passed to
+        validate_metadata.
+    :raises TypeError: If a corpus has no taxonomy or it is invalid.
+    :return List[Optional[MetadataValidationErrors]]: For each item in
+        order, a list of errors or None if the metadata is valid.
+    """
+    items = list(items)
+    taxonomies = get_taxonomies_from_corpora(
+        db, {corpus_id for corpus_id, _, _ in items}
+    )
+
+    compiled: Dict[Tuple[str, Optional[str]], CompiledTaxonomy] = {}
+    results = []
+    for corpus_id, metadata, entity_key in items:
+        taxonomy_entries = compiled.get((corpus_id, entity_key))
+        if taxonomy_entries is None:
+            taxonomy = taxonomies.get(corpus_id)
+            if taxonomy is None:
+                raise TypeError("No taxonomy found for corpus")
+            taxonomy_entries = get_compiled_taxonomy(corpus_id, taxonomy, entity_key)
+            compiled[(corpus_id, entity_key)] = taxonomy_entries
+
+        errors = _validate_metadata(
+            taxonomy_entries, metadata, bool(entity_key is None)
+        )
+        results.append(errors if len(errors) > 0 else None)
+    return results
+
+
+def get_compiled_taxonomy(
+    corpus_id: str,
+    taxonomy: TaxonomyData,
+    entity_key: Optional[str] = None,
+    taxonomy_hash: Optional[str] = None,
+) -> CompiledTaxonomy:
+    """Get the built taxonomy for an entity, using the cache if possible.
+
+    :param str corpus_id: The corpus import ID the taxonomy belongs to.
+    :param TaxonomyData taxonomy: The CorpusType.valid_metadata for the
+        corpus.
+    :param Optional[str] entity_key: The entity specific key to filter
+        the taxonomy by, None for family metadata.
+    :param Optional[str] taxonomy_hash: The CorpusType.valid_metadata_hash
+        if set. The taxonomy was then validated when it was saved, so the
+        hash is used as the cache key and the extra validation of the
+        taxonomy is skipped.
+    :raises TypeError: If the Taxonomy is invalid.
+    :return CompiledTaxonomy: The built taxonomy entries.
+    """
+    digest = taxonomy_hash or taxonomy_digest(taxonomy)
+    cache_key = (corpus_id, digest, entity_key)
+    taxonomy_entries = _TAXONOMY_CACHE.get(cache_key)
+    if taxonomy_entries is None:
+        taxonomy_entries = compile_entity_taxonomy(
+            taxonomy, entity_key, check_structure=taxonomy_hash is None
+        )
+        _TAXONOMY_CACHE.put(cache_key, taxonomy_entries)
+    return taxonomy_entries
+
+
+def compile_entity_taxonomy(
+    taxonomy: TaxonomyData,
+    entity_key: Optional[str] = None,
+    check_structure: bool = True,
+) -> CompiledTaxonomy:
+    """Build the taxonomy for an entity, bypassing the cache.
+
+    :param TaxonomyData taxonomy: The CorpusType.valid_metadata.
+    :param Optional[str] entity_key: The entity specific key to filter
+        the taxonomy by, None for family metadata.
+    :param bool check_structure: Whether to run the extra validation of
+        the taxonomy.
+    :raises TypeError: If the Taxonomy is invalid.
+    :return CompiledTaxonomy: The built taxonomy entries.
+    """
+    return _build_taxonomy_entries(
+        _filter_taxonomy_for_entity(taxonomy, entity_key),
+        check_structure=check_structure,
+    )
 
-    # Make sure we only get the entity specific taxonomy keys.
+
+def _filter_taxonomy_for_entity(
+    taxonomy: TaxonomyData, entity_key: Optional[str] = None
+) -> Union[TaxonomyData, TaxonomyDataEntry]:
+    """Make sure we only get the entity specific taxonomy keys.
+
+    :param TaxonomyData taxonomy: The CorpusType.valid_metadata.
+    :param Optional[str] entity_key: The entity specific key to filter
+        the taxonomy by, None for family metadata.
+    :return Union[TaxonomyData, TaxonomyDataEntry]: The taxonomy for
+        the entity.
+    """
     if entity_key is None:
         # Assume that we are validating family metadata.
-        taxonomy = {
+        return {
             k: v
             for (k, v) in taxonomy.items()
             if k
@@ -56,12 +446,7 @@ def validate_metadata(
                 EntitySpecificTaxonomyKeys.COLLECTION.value,
             ]
         }
-    else:
-        taxonomy = get_entity_specific_taxonomy(taxonomy, entity_key)
-
-    return validate_metadata_against_taxonomy(
-        taxonomy, metadata, bool(entity_key is None)
-    )
+    return get_entity_specific_taxonomy(taxonomy, entity_key)
 
 
 def validate_metadata_against_taxonomy(
@@ -79,16 +464,33 @@ def validate_metadata_against_taxonomy(
     :return Optional[MetadataValidationResult]: A list of errors or None
         if the metadata is valid.
     """
+    taxonomy_entries = _build_taxonomy_entries(taxonomy, metadata)
+    errors = _validate_metadata(taxonomy_entries, metadata, is_family_metadata)
+    return errors if len(errors) > 0 else None
+
+
+def _build_taxonomy_entries(
+    taxonomy: Union[TaxonomyData, TaxonomyDataEntry],
+    metadata: Optional[TaxonomyDataEntry] = None,
+    check_structure: bool = True,
+) -> CompiledTaxonomy:
+    """Build the taxonomy entries, wrapping any structural error.
+
+    :param TaxonomyDataEntry taxonomy: The Corpus taxonomy to build.
+    :param Optional[TaxonomyDataEntry] metadata: The metadata to
+        validate.
+    :param bool check_structure: Whether to run the extra validation of
+        the taxonomy.
+    :raises TypeError: If the Taxonomy is invalid.
+    :return CompiledTaxonomy: The built taxonomy entries.
+    """
     try:
-        taxonomy_entries = build_valid_taxonomy(taxonomy, metadata)
+        return build_valid_taxonomy(taxonomy, metadata, check_structure)
     except TypeError as e:
         _LOGGER.error(e)
         # Wrap any TypeError in a more general error
         raise TypeError("Bad Taxonomy data in database") from e
 
-    errors = _validate_metadata(taxonomy_entries, metadata, is_family_metadata)
-    return errors if len(errors) > 0 else None
-
 
 def _validate_metadata(
     taxonomy_entries: Mapping[str, TaxonomyEntry],
@@ -105,50 +507,20 @@ def _validate_metadata(
     :return MetadataValidationErrors: a list of errors if the metadata
         is invalid.
     """
-    errors = []
-    metadata_keys = set(metadata.keys())
-    taxonomy_keys = set(taxonomy_entries.keys())
-    missing_keys = taxonomy_keys - metadata_keys
-    if len(missing_keys) > 0:
-        errors.append(f"Missing metadata keys: {missing_keys}")
-    extra_keys = metadata_keys - taxonomy_keys
-    if len(extra_keys) > 0:
-        errors.append(f"Extra metadata keys: {extra_keys}")
-
-    # Validate the metadata values
-    for key, value_list in metadata.items():
-        if key not in taxonomy_entries:
-            continue  # We've already checked for missing keys
-
-        if not isinstance(value_list, list):
-            errors.append(
-                f"Invalid value '{value_list}' for metadata key '{key}' expected list."
-            )
-            continue
-
-        # Ensure all items in value_list are strings
-        if is_family_metadata and not all(isinstance(item, str) for item in value_list):
-            errors.append(
-                f"Invalid value(s) in '{value_list}' for metadata key '{key}', "
-                "expected all items to be strings."
-            )
-            continue
+    if not isinstance(taxonomy_entries, CompiledTaxonomy):
+        taxonomy_entries = CompiledTaxonomy(taxonomy_entries)
 
-        taxonomy_entry = taxonomy_entries[key]
-        if not taxonomy_entry.allow_any:
-            if not all(item in taxonomy_entry.allowed_values for item in value_list):
-                errors.append(f"Invalid value '{value_list}' for metadata key '{key}'")
-                continue
-
-        if not taxonomy_entry.allow_blanks and value_list == []:
-            errors.append(f"Blank value for metadata key '{key}'")
-
-    return errors
+    # Messages are only rendered when there is something to report.
+    return [
+        str(error) for error in taxonomy_entries.validate(metadata, is_family_metadata)
+    ]
 
 
 def build_valid_taxonomy(
-    taxonomy: Mapping, metadata: Optional[TaxonomyDataEntry] = None
-) -> Mapping[str, TaxonomyEntry]:
+    taxonomy: Mapping,
+    metadata: Optional[TaxonomyDataEntry] = None,
+    check_structure: bool = True,
+) -> CompiledTaxonomy:
     """Build valid taxonomy used to validate metadata against.
 
     Takes the taxonomy from the database and builds a dictionary of
@@ -158,26 +530,30 @@ def build_valid_taxonomy(
         CorpusType.valid_metadata and potentially filtered by entity key
     :param Optional[TaxonomyDataEntry] metadata: The metadata to
         validate.
+    :param bool check_structure: Whether to run the extra validation of
+        the taxonomy, which can be skipped if it was validated when it
+        was saved.
     :raises TypeError: If the taxonomy is not a list.
     :raises TypeError: If the taxonomy entry is not a dictionary.
     :raises TypeError: If the values within the taxonomy entry are not
         dictionaries.
-    :return Mapping[str, TaxonomyEntry]: a dictionary of TaxonomyEntry
-        objects (contains property constraints) keyed by the taxonomy
-        entry name (property).
+    :return CompiledTaxonomy: a mapping of TaxonomyEntry objects
+        (contains property constraints) keyed by the taxonomy entry name
+        (property), compiled for validation.
     """
     if not isinstance(taxonomy, dict):
         raise TypeError("Taxonomy is not a dictionary")
 
-    taxonomy_entries: Mapping[str, TaxonomyEntry] = {}
+    taxonomy_entries: Dict[str, TaxonomyEntry] = {}
 
     for key, values in taxonomy.items():
-        _validate_taxonomy(taxonomy, key, values)
+        if check_structure:
+            _validate_taxonomy(taxonomy, key, values)
 
         # We rely on pydantic to validate the values here
         taxonomy_entries[key] = TaxonomyEntry(**values)
 
-    return taxonomy_entries
+    return CompiledTaxonomy(taxonomy_entries)
 
 
 def _validate_taxonomy(taxonomy: Mapping, key: str, values: Any) -> None:
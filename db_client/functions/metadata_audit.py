@@ -0,0 +1,210 @@
+"""
+Corpus-wide metadata audits that run inside the database.
+
+Rather than loading every metadata row into Python and validating it with
+validate_metadata_against_taxonomy, the taxonomy checks are expressed with
+JSONB operators so that only the violations come back over the wire. The
+checks mirror CompiledTaxonomy.validate and report the same error codes.
+"""
+
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from db_client.functions.metadata import MetadataErrorCode
+from db_client.models.dfce.taxonomy_entry import EntitySpecificTaxonomyKeys
+
+AUDITED_ENTITY_KEYS: Tuple[Optional[str], ...] = (
+    None,
+    EntitySpecificTaxonomyKeys.DOCUMENT.value,
+    EntitySpecificTaxonomyKeys.EVENT.value,
+)
+
+# The metadata rows of each entity that belong to the corpus.
+_METADATA_ROWS = {
+    None: """
+        SELECT family_metadata.family_import_id AS import_id,
+               family_metadata.value AS value
+        FROM family_metadata
+        JOIN family_corpus
+          ON family_corpus.family_import_id = family_metadata.family_import_id
+        WHERE family_corpus.corpus_import_id = :corpus_import_id
+          AND jsonb_typeof(family_metadata.value) = 'object'
+    """,
+    EntitySpecificTaxonomyKeys.DOCUMENT.value: """
+        SELECT family_document.import_id AS import_id,
+               family_document.valid_metadata AS value
+        FROM family_document
+        JOIN family_corpus
+          ON family_corpus.family_import_id = family_document.family_import_id
+        WHERE family_corpus.corpus_import_id = :corpus_import_id
+          AND jsonb_typeof(family_document.valid_metadata) = 'object'
+    """,
+    EntitySpecificTaxonomyKeys.EVENT.value: """
+        SELECT family_event.import_id AS import_id,
+               family_event.valid_metadata AS value
+        FROM family_event
+        JOIN family_corpus
+          ON family_corpus.family_import_id = family_event.family_import_id
+        WHERE family_corpus.corpus_import_id = :corpus_import_id
+          AND jsonb_typeof(family_event.valid_metadata) = 'object'
+    """,
+}
+
+# The taxonomy entries that apply to each entity.
+_TAXONOMY_SECTION = {
+    None: """
+        CASE WHEN jsonb_typeof(corpus_type.valid_metadata) = 'object'
+             THEN corpus_type.valid_metadata
+             ELSE '{}'::jsonb END
+    """,
+    EntitySpecificTaxonomyKeys.DOCUMENT.value: """
+        CASE WHEN jsonb_typeof(corpus_type.valid_metadata -> '_document') = 'object'
+             THEN corpus_type.valid_metadata -> '_document'
+             ELSE '{}'::jsonb END
+    """,
+    EntitySpecificTaxonomyKeys.EVENT.value: """
+        CASE WHEN jsonb_typeof(corpus_type.valid_metadata -> '_event') = 'object'
+             THEN corpus_type.valid_metadata -> '_event'
+             ELSE '{}'::jsonb END
+    """,
+}
+
+# Only family metadata must hold lists of strings, for other entities a
+# non-string item is reported as an invalid value.
+_NON_STRING_VALUES = """
+    UNION ALL
+    SELECT metadata.import_id, taxonomy.key, 'non_string_values'
+    FROM metadata
+    JOIN taxonomy ON metadata.value ? taxonomy.key
+    WHERE jsonb_typeof(metadata.value -> taxonomy.key) = 'array'
+      AND EXISTS (
+          SELECT 1 FROM jsonb_array_elements(metadata.value -> taxonomy.key) AS item
+          WHERE jsonb_typeof(item.value) <> 'string'
+      )
+"""
+
+_SKIP_NON_STRING_VALUES = """
+      AND NOT EXISTS (
+          SELECT 1 FROM jsonb_array_elements(metadata.value -> taxonomy.key) AS item
+          WHERE jsonb_typeof(item.value) <> 'string'
+      )
+"""
+
+_AUDIT_QUERY = """
+WITH taxonomy AS (
+    SELECT entry.key AS key, entry.value AS rule
+    FROM corpus
+    JOIN corpus_type ON corpus_type.name = corpus.corpus_type_name
+    CROSS JOIN LATERAL jsonb_each({taxonomy_section}) AS entry
+    WHERE corpus.import_id = :corpus_import_id
+    {taxonomy_filter}
+),
+metadata AS (
+    {metadata_rows}
+)
+SELECT metadata.import_id, taxonomy.key, 'missing_keys'
+FROM metadata
+CROSS JOIN taxonomy
+WHERE NOT metadata.value ? taxonomy.key
+UNION ALL
+SELECT metadata.import_id, metadata_key.key, 'extra_keys'
+FROM metadata
+CROSS JOIN LATERAL jsonb_object_keys(metadata.value) AS metadata_key(key)
+WHERE NOT EXISTS (SELECT 1 FROM taxonomy WHERE taxonomy.key = metadata_key.key)
+UNION ALL
+SELECT metadata.import_id, taxonomy.key, 'not_a_list'
+FROM metadata
+JOIN taxonomy ON metadata.value ? taxonomy.key
+WHERE jsonb_typeof(metadata.value -> taxonomy.key) <> 'array'
+{non_string_values}
+UNION ALL
+SELECT metadata.import_id, taxonomy.key, 'invalid_values'
+FROM metadata
+JOIN taxonomy ON metadata.value ? taxonomy.key
+WHERE jsonb_typeof(metadata.value -> taxonomy.key) = 'array'
+  AND NOT COALESCE((taxonomy.rule ->> 'allow_any')::boolean, false)
+  AND EXISTS (
+      SELECT 1 FROM jsonb_array_elements(metadata.value -> taxonomy.key) AS item
+      WHERE jsonb_typeof(item.value) <> 'string'
+         OR NOT (taxonomy.rule -> 'allowed_values') ? (item.value #>> '{{}}')
+  )
+{skip_non_string_values}
+UNION ALL
+SELECT metadata.import_id, taxonomy.key, 'blank_value'
+FROM metadata
+JOIN taxonomy ON metadata.value ? taxonomy.key
+WHERE jsonb_typeof(metadata.value -> taxonomy.key) = 'array'
+  AND jsonb_array_length(metadata.value -> taxonomy.key) = 0
+  AND NOT (taxonomy.rule ->> 'allow_blanks')::boolean
+ORDER BY 1, 2, 3
+"""
+
+
+class MetadataViolation(NamedTuple):
+    """A metadata key of an entity that violates the taxonomy."""
+
+    # The entity specific taxonomy key, None for family metadata.
+    entity_key: Optional[str]
+    import_id: str
+    key: str
+    code: MetadataErrorCode
+
+
+def _build_audit_query(entity_key: Optional[str]):
+    is_family_metadata = entity_key is None
+    return text(
+        _AUDIT_QUERY.format(
+            taxonomy_section=_TAXONOMY_SECTION[entity_key],
+            taxonomy_filter=(
+                "AND entry.key NOT IN ('_document', '_event', '_collection')"
+                if is_family_metadata
+                else ""
+            ),
+            metadata_rows=_METADATA_ROWS[entity_key],
+            non_string_values=_NON_STRING_VALUES if is_family_metadata else "",
+            skip_non_string_values=(
+                _SKIP_NON_STRING_VALUES if is_family_metadata else ""
+            ),
+        )
+    )
+
+
+def audit_corpus_metadata(
+    db: Session,
+    corpus_import_id: str,
+    entity_keys: Iterable[Optional[str]] = AUDITED_ENTITY_KEYS,
+) -> List[MetadataViolation]:
+    """Audits the metadata of a corpus against its taxonomy in the DB.
+
+    The family metadata, document and event metadata of every family in
+    the corpus is checked against the CorpusType.valid_metadata, only
+    the violations are returned. An entity whose taxonomy section is
+    missing has all of its metadata keys reported as extra.
+
+    NOTE: The structure of the taxonomy is not validated here, use
+    validate_metadata for that.
+
+    :param Session db: The DB session to connect to.
+    :param str corpus_import_id: The import ID of the corpus to audit.
+    :param Iterable[Optional[str]] entity_keys: The entities to audit,
+        None for family metadata or an EntitySpecificTaxonomyKeys value.
+    :raises ValueError: If an entity key cannot be audited.
+    :return List[MetadataViolation]: The violations found, one per
+        entity, metadata key and error code.
+    """
+    violations = []
+    for entity_key in entity_keys:
+        if entity_key not in _METADATA_ROWS:
+            raise ValueError(f"Cannot audit metadata for '{entity_key}'")
+
+        rows = db.execute(
+            _build_audit_query(entity_key),
+            {"corpus_import_id": corpus_import_id},
+        )
+        violations.extend(
+            MetadataViolation(entity_key, import_id, key, MetadataErrorCode(code))
+            for import_id, key, code in rows
+        )
+    return violations
@@ -0,0 +1,99 @@
+"""
+Filtering of families, documents, events and collections by metadata.
+
+The metadata columns have jsonb_path_ops GIN indexes, which can only serve
+the containment operator (@>). Every predicate built here is therefore a
+containment check of a single key and value, e.g.
+
+    value @> '{"sector": ["Energy"]}'
+
+Values of the same key are combined with OR and different keys with AND,
+as expected of faceted search.
+"""
+
+from typing import Mapping, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Query, Session
+
+from db_client.models.dfce import (
+    Collection,
+    Family,
+    FamilyDocument,
+    FamilyEvent,
+    FamilyMetadata,
+)
+
+MetadataFilters = Mapping[str, Sequence[str]]
+
+
+def metadata_filter(metadata_column, filters: MetadataFilters):
+    """Builds an index friendly filter on a JSONB metadata column.
+
+    :param metadata_column: The JSONB column holding the metadata.
+    :param MetadataFilters filters: The values to filter by, keyed by
+        metadata key. A key with no values is ignored.
+    :return: The SQL filter expression.
+    """
+    return sa.and_(
+        sa.true(),
+        *[
+            sa.or_(*[metadata_column.contains({key: [value]}) for value in values])
+            for key, values in filters.items()
+            if values
+        ],
+    )
+
+
+def filter_families_by_metadata(db: Session, filters: MetadataFilters) -> Query:
+    """Query the families whose metadata matches the filters.
+
+    :param Session db: The DB session to connect to.
+    :param MetadataFilters filters: The values to filter by, keyed by
+        metadata key.
+    :return Query: A query of the matching Family objects.
+    """
+    return (
+        db.query(Family)
+        .join(FamilyMetadata, FamilyMetadata.family_import_id == Family.import_id)
+        .filter(metadata_filter(FamilyMetadata.value, filters))
+    )
+
+
+def filter_documents_by_metadata(db: Session, filters: MetadataFilters) -> Query:
+    """Query the documents whose metadata matches the filters.
+
+    :param Session db: The DB session to connect to.
+    :param MetadataFilters filters: The values to filter by, keyed by
+        metadata key.
+    :return Query: A query of the matching FamilyDocument objects.
+    """
+    return db.query(FamilyDocument).filter(
+        metadata_filter(FamilyDocument.valid_metadata, filters)
+    )
+
+
+def filter_events_by_metadata(db: Session, filters: MetadataFilters) -> Query:
+    """Query the events whose metadata matches the filters.
+
+    :param Session db: The DB session to connect to.
+    :param MetadataFilters filters: The values to filter by, keyed by
+        metadata key.
+    :return Query: A query of the matching FamilyEvent objects.
+    """
+    return db.query(FamilyEvent).filter(
+        metadata_filter(FamilyEvent.valid_metadata, filters)
+    )
+
+
+def filter_collections_by_metadata(db: Session, filters: MetadataFilters) -> Query:
+    """Query the collections whose metadata matches the filters.
+
+    :param Session db: The DB session to connect to.
+    :param MetadataFilters filters: The values to filter by, keyed by
+        metadata key.
+    :return Query: A query of the matching Collection objects.
+    """
+    return db.query(Collection).filter(
+        metadata_filter(Collection.valid_metadata, filters)
+    )
@@ -0,0 +1,214 @@
+"""
+Parallel ingest of families across a pool of processes.
+
+The input is split into partitions, either by corpus or by a hash of the
+family import_id, and each partition is streamed into the database by its
+own process with its own engine and connection, see stream_families.
+
+Slugs must be unique across all partitions, and two partitions writing the
+same slug would fail part way depending on which commits first. So the
+slugs of the whole input are checked before anything is written.
+"""
+
+import multiprocessing
+import os
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import sqlalchemy as sa
+from sqlalchemy.engine import URL
+from sqlalchemy.orm import Session
+
+from db_client.functions.streaming_ingest import (
+    DEFAULT_CHUNK_SIZE,
+    FileCheckpoint,
+    stream_families,
+)
+
+PARTITION_BY_CORPUS = "corpus"
+PARTITION_BY_HASH = "hash"
+
+
+class PartitionResult(NamedTuple):
+    """The outcome of ingesting a partition."""
+
+    partition: int
+    families: int
+    documents: int
+    # The error that stopped the partition, None if it completed.
+    error: Optional[str]
+
+
+class ParallelIngestReport(NamedTuple):
+    """The merged outcome of all the partitions."""
+
+    partitions: List[PartitionResult]
+    # The partitions of each slug used more than once, if any nothing
+    # was written.
+    slug_conflicts: Dict[str, List[int]]
+
+    @property
+    def families(self) -> int:
+        return sum(result.families for result in self.partitions)
+
+    @property
+    def documents(self) -> int:
+        return sum(result.documents for result in self.partitions)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every partition was written in full."""
+        return not self.slug_conflicts and all(
+            result.error is None for result in self.partitions
+        )
+
+
+def partition_families(
+    families: Iterable, partitions: int, partition_by: str = PARTITION_BY_CORPUS
+) -> List[List]:
+    """Splits families into partitions.
+
+    By corpus, all the families of a corpus are in the same partition and
+    the corpora are spread to balance the number of families. By hash, a
+    family is placed by a stable hash of its import_id.
+
+    :param Iterable families: The families, as for add_families.
+    :param int partitions: The number of partitions.
+    :param str partition_by: Either "corpus" or "hash".
+    :raises ValueError: If partition_by is unknown.
+    :return List[List]: The families of each partition, in input order.
+    """
+    result: List[List] = [[] for _ in range(partitions)]
+    if partition_by == PARTITION_BY_HASH:
+        for f in families:
+            index = zlib.crc32(f["import_id"].encode("utf-8")) % partitions
+            result[index].append(f)
+        return result
+
+    if partition_by != PARTITION_BY_CORPUS:
+        raise ValueError(f"Unknown partitioning '{partition_by}'")
+
+    by_corpus: Dict[Optional[str], List] = defaultdict(list)
+    for f in families:
+        by_corpus[f.get("corpus_import_id")].append(f)
+    # Largest first onto the smallest partition.
+    for corpus_families in sorted(by_corpus.values(), key=len, reverse=True):
+        min(result, key=len).extend(corpus_families)
+    return result
+
+
+def find_slug_conflicts(partitions: List[List]) -> Dict[str, List[int]]:
+    """Finds the family and document slugs used more than once.
+
+    :param List[List] partitions: The families of each partition.
+    :return Dict[str, List[int]]: The partition of each use of each slug
+        used more than once.
+    """
+    uses: Dict[str, List[int]] = defaultdict(list)
+    for index, families in enumerate(partitions):
+        for f in families:
+            uses[f["slug"]].append(index)
+            for d in f["documents"]:
+                uses[d["slug"]].append(index)
+    return {slug: indexes for slug, indexes in uses.items() if len(indexes) > 1}
+
+
+def _ingest_partition(
+    db_url: str,
+    partition: int,
+    families: List,
+    org_id: int,
+    chunk_size: int,
+    checkpoint_dir: Optional[str],
+    upsert: bool,
+) -> PartitionResult:
+    engine = sa.create_engine(db_url, pool_size=1, max_overflow=0)
+    checkpoint = (
+        FileCheckpoint(os.path.join(checkpoint_dir, f"partition-{partition}.json"))
+        if checkpoint_dir is not None
+        else None
+    )
+    families_done = documents_done = 0
+
+    def progress(state):
+        nonlocal families_done, documents_done
+        families_done, documents_done = state.families, state.documents
+
+    try:
+        with Session(engine) as db:
+            stream_families(
+                db,
+                families,
+                org_id,
+                chunk_size=chunk_size,
+                checkpoint=checkpoint,
+                progress=progress,
+                upsert=upsert,
+            )
+        return PartitionResult(partition, families_done, documents_done, None)
+    except Exception as e:
+        return PartitionResult(partition, families_done, documents_done, repr(e))
+    finally:
+        engine.dispose()
+
+
+def ingest_families_parallel(
+    db_url: Union[str, URL],
+    families: Iterable,
+    workers: int = 4,
+    partition_by: str = PARTITION_BY_CORPUS,
+    org_id=1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checkpoint_dir: Optional[str] = None,
+    upsert=False,
+) -> ParallelIngestReport:
+    """Adds families with a process per partition.
+
+    NOTE: The input is held in memory to be partitioned. A partition
+    that fails keeps the chunks it committed, with a checkpoint_dir a
+    rerun with the same input resumes each partition where it stopped.
+
+    :param Union[str, URL] db_url: The database each worker connects to.
+    :param Iterable families: The families to add, as for add_families.
+    :param int workers: The number of processes and partitions.
+    :param str partition_by: Either "corpus" or "hash", see
+        partition_families.
+    :param int chunk_size: The number of families each worker commits at
+        a time.
+    :param Optional[str] checkpoint_dir: Where to keep a checkpoint per
+        partition.
+    :param bool upsert: Whether to update the rows that already exist,
+        see add_families.
+    :raises ValueError: If partition_by is unknown.
+    :return ParallelIngestReport: The outcome of each partition and any
+        slug conflicts, in which case nothing is written.
+    """
+    partitions = partition_families(families, workers, partition_by)
+    slug_conflicts = find_slug_conflicts(partitions)
+    if slug_conflicts:
+        return ParallelIngestReport([], slug_conflicts)
+
+    if isinstance(db_url, URL):
+        db_url = db_url.render_as_string(hide_password=False)
+
+    # Spawn rather than fork, so no connection of the parent is shared.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(
+                _ingest_partition,
+                db_url,
+                index,
+                partition,
+                org_id,
+                chunk_size,
+                checkpoint_dir,
+                upsert,
+            )
+            for index, partition in enumerate(partitions)
+            if partition
+        ]
+        results = [future.result() for future in futures]
+    return ParallelIngestReport(results, {})
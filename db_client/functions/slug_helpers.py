@@ -0,0 +1,101 @@
+"""
+Generation of unique slugs in bulk.
+
+Slugs are unique across families, documents and collections. Rather than
+trying a candidate at a time, the slugs of a batch of titles are assigned
+with one query: every title is slugified, and the base slugs together with
+enough numbered variants of each, e.g. "title", "title-1", "title-2", are
+looked up against the slug table at once. Each title then takes its first
+free candidate.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+import sqlalchemy as sa
+from slugify import slugify
+from sqlalchemy.orm import Session
+
+from db_client.models.dfce import Slug
+
+# Extra numbered variants looked up per base slug, beyond one per title.
+DEFAULT_HEADROOM = 10
+# Used when a title has nothing that can be slugified.
+EMPTY_SLUG = "untitled"
+
+
+def _candidates(base: str, start: int, count: int) -> List[str]:
+    return [base if i == 0 else f"{base}-{i}" for i in range(start, start + count)]
+
+
+def _taken(db: Session, names: Iterable[str]) -> Set[str]:
+    return set(
+        db.execute(
+            sa.select(Slug.name).where(
+                Slug.name == sa.any_(sa.bindparam("names", list(names)))
+            )
+        ).scalars()
+    )
+
+
+def generate_slugs(
+    db: Session, titles: Iterable[str], headroom: int = DEFAULT_HEADROOM
+) -> List[str]:
+    """Generates a unique slug for each title.
+
+    Titles with the same slug get numbered variants of it, so the slugs
+    are unique within the batch as well as against the database.
+
+    NOTE: The slugs are not reserved, so a concurrent import may take one
+    before they are written, in which case the insert fails.
+
+    :param Session db: The DB session to connect to.
+    :param Iterable[str] titles: The titles to slugify.
+    :param int headroom: The extra numbered variants of each slug to look
+        up, another query is only made if they are all taken.
+    :return List[str]: The slug of each title, in order.
+    """
+    bases = [slugify(title) or EMPTY_SLUG for title in titles]
+    counts = Counter(bases)
+    assigned: Dict[str, List[str]] = {base: [] for base in counts}
+    # The index of the next variant of each base to look up, 0 being the
+    # base itself.
+    next_variant = {base: 0 for base in counts}
+    used: Set[str] = set()
+
+    while True:
+        remaining = {
+            base: count - len(assigned[base])
+            for base, count in counts.items()
+            if count > len(assigned[base])
+        }
+        if not remaining:
+            break
+
+        lookups = {
+            base: _candidates(base, next_variant[base], count + headroom)
+            for base, count in remaining.items()
+        }
+        taken = used | _taken(
+            db, (name for names in lookups.values() for name in names)
+        )
+
+        # Free base slugs are claimed first, so a title "Plan 2" keeps
+        # "plan-2" even if it is also a variant of "plan".
+        for base in lookups:
+            if next_variant[base] == 0 and base not in taken:
+                assigned[base].append(base)
+                taken.add(base)
+
+        for base, names in lookups.items():
+            for name in names:
+                if len(assigned[base]) == counts[base]:
+                    break
+                if name not in taken:
+                    assigned[base].append(name)
+                    taken.add(name)
+            next_variant[base] += len(names)
+        used = taken
+
+    in_order = {base: iter(names) for base, names in assigned.items()}
+    return [next(in_order[base]) for base in bases]
@@ -0,0 +1,148 @@
+"""
+Bounded memory ingest of families with chunked commits.
+
+The families are read from any iterator and committed every chunk, after
+which the session is emptied, so the memory used depends on the chunk size
+and not the size of the import. The import_id of the last committed family
+is saved to a checkpoint, so an import that stops part way is resumed from
+the following family when run again with the same input.
+"""
+
+import json
+import os
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Protocol
+
+from sqlalchemy.orm import Session
+
+from db_client.functions.dfce_helpers import _ensure_language_registry, add_families
+from db_client.functions.language_registry import LanguageRegistry
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class IngestProgress(NamedTuple):
+    """The progress of an import, as of the last committed chunk."""
+
+    families: int
+    documents: int
+    last_import_id: Optional[str]
+
+
+class Checkpoint(Protocol):
+    """Stores the import_id of the last committed family of an import."""
+
+    def load(self) -> Optional[str]:
+        """The import_id of the last committed family, None if not started."""
+        ...
+
+    def save(self, import_id: str) -> None:
+        """Records that the family and all before it are committed."""
+        ...
+
+    def clear(self) -> None:
+        """Forgets the import once it has completed."""
+        ...
+
+
+class FileCheckpoint:
+    """A checkpoint kept in a JSON file.
+
+    The file is replaced atomically, so a crash while saving leaves the
+    previous checkpoint.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[str]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)["last_import_id"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, import_id: str) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last_import_id": import_id}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _skip_committed(families: Iterator[Any], last_import_id: str) -> Iterator[Any]:
+    for f in families:
+        if f["import_id"] == last_import_id:
+            return families
+    raise ValueError(f"Checkpoint family '{last_import_id}' not found in the input")
+
+
+def stream_families(
+    db: Session,
+    families: Iterable,
+    org_id=1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checkpoint: Optional[Checkpoint] = None,
+    progress: Optional[Callable[[IngestProgress], None]] = None,
+    language_registry: Optional[LanguageRegistry] = None,
+    upsert=False,
+) -> IngestProgress:
+    """Adds families from an iterator, committing every chunk.
+
+    NOTE: Resuming relies on the input being in the same order each run.
+    A crash after a chunk is committed but before the checkpoint is saved
+    replays that chunk, so use upsert when that must not fail.
+
+    :param Session db: The DB session to connect to, which is emptied
+        after each commit.
+    :param Iterable families: The families to add, as for add_families.
+    :param int chunk_size: The number of families to commit at a time.
+    :param Optional[Checkpoint] checkpoint: Where to record the progress,
+        the import resumes after the family it holds and it is cleared
+        once the import completes.
+    :param Optional[Callable[[IngestProgress], None]] progress: Called
+        after each chunk is committed.
+    :param Optional[LanguageRegistry] language_registry: Resolves the
+        document languages, loaded once when first needed if not given.
+    :param bool upsert: Whether to update the rows that already exist,
+        see add_families.
+    :raises ValueError: If the checkpoint family is not in the input or a
+        document language code is unknown.
+    :return IngestProgress: The families and documents added by this run.
+    """
+    families = iter(families)
+    last_import_id = checkpoint.load() if checkpoint is not None else None
+    if last_import_id is not None:
+        families = _skip_committed(families, last_import_id)
+
+    state = IngestProgress(0, 0, last_import_id)
+    while True:
+        chunk = list(islice(families, chunk_size))
+        if not chunk:
+            break
+
+        documents = [d for f in chunk for d in f["documents"]]
+        language_registry = _ensure_language_registry(db, language_registry, documents)
+        add_families(db, chunk, org_id, language_registry, upsert=upsert)
+        db.expunge_all()
+
+        state = IngestProgress(
+            state.families + len(chunk),
+            state.documents + len(documents),
+            chunk[-1]["import_id"],
+        )
+        if checkpoint is not None:
+            checkpoint.save(chunk[-1]["import_id"])
+        if progress is not None:
+            progress(state)
+
+    if checkpoint is not None:
+        checkpoint.clear()
+    return state
@@ -0,0 +1,86 @@
+"""
+Process-wide caching of compiled taxonomies.
+
+Building a taxonomy means constructing a pydantic TaxonomyEntry for every key
+of CorpusType.valid_metadata, which is comparatively expensive. The taxonomy
+itself only changes when a CorpusType is edited, so the compiled form can be
+shared across calls as long as the cache key changes with the content.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def taxonomy_digest(taxonomy) -> str:
+    """Calculates a stable content hash for a taxonomy.
+
+    :param taxonomy: The taxonomy as stored in CorpusType.valid_metadata.
+    :return str: A hex digest that only changes when the content does.
+    """
+    serialised = json.dumps(taxonomy, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+
+class LRUCache(Generic[K, V]):
+    """A thread-safe, bounded, least recently used cache."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("An LRUCache must hold at least one entry")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Returns the cached value, marking it as recently used.
+
+        :param K key: The key to look up.
+        :return Optional[V]: The value or None if not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: K, value: V) -> None:
+        """Adds a value, evicting the least recently used if full.
+
+        :param K key: The key to store the value under.
+        :param V value: The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Optional[Callable[[K], bool]] = None) -> int:
+        """Removes entries from the cache.
+
+        :param Optional[Callable[[K], bool]] predicate: Only keys for
+            which this returns True are removed, if None everything is.
+        :return int: The number of entries removed.
+        """
+        with self._lock:
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def __len__(self) -> int:
+        """Returns the number of cached entries."""
+        return len(self._entries)
@@ -0,0 +1,120 @@
+"""
+Export of CorpusType taxonomies as versioned JSON documents.
+
+The taxonomy is split into its family, _document, _event and _collection
+sections and serialised once per version. The version is the content hash
+of the taxonomy, so it can be used as an ETag: a caller that already holds
+the current version is told so without the taxonomy being fetched,
+serialised or sent again.
+"""
+
+import json
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from db_client.functions.corpus_helpers import TaxonomyData
+from db_client.functions.taxonomy_cache import LRUCache, taxonomy_digest
+from db_client.models.dfce.taxonomy_entry import EntitySpecificTaxonomyKeys
+from db_client.models.organisation import CorpusType
+
+FAMILY_SECTION = "family"
+ENTITY_SECTIONS = tuple(entity_key.value for entity_key in EntitySpecificTaxonomyKeys)
+
+_VERSION_BY_NAME = sa.select(CorpusType.valid_metadata_hash).where(
+    CorpusType.name == sa.bindparam("corpus_type_name")
+)
+_TAXONOMY_BY_NAME = sa.select(CorpusType.valid_metadata).where(
+    CorpusType.name == sa.bindparam("corpus_type_name")
+)
+
+# Serialised documents keyed by (corpus type name, version).
+_EXPORT_CACHE: LRUCache[Tuple[str, str], bytes] = LRUCache()
+
+
+class TaxonomyExport(NamedTuple):
+    """A serialised taxonomy document and its version."""
+
+    corpus_type_name: str
+    # The content hash of the taxonomy, suitable for use as an ETag.
+    version: str
+    # The UTF-8 encoded JSON document, None if the caller's version is
+    # current.
+    body: Optional[bytes]
+
+    @property
+    def modified(self) -> bool:
+        """Whether the body was sent, i.e. the caller's version is stale."""
+        return self.body is not None
+
+
+def build_taxonomy_document(
+    corpus_type_name: str, version: str, taxonomy: TaxonomyData
+) -> Dict[str, Any]:
+    """Splits a taxonomy into its sections.
+
+    :param str corpus_type_name: The name of the CorpusType.
+    :param str version: The version of the taxonomy.
+    :param TaxonomyData taxonomy: The CorpusType.valid_metadata.
+    :return Dict[str, Any]: The document with a section per entity, an
+        entity without a taxonomy has an empty section.
+    """
+    document: Dict[str, Any] = {
+        "corpus_type": corpus_type_name,
+        "version": version,
+        FAMILY_SECTION: {
+            key: value for key, value in taxonomy.items() if key not in ENTITY_SECTIONS
+        },
+    }
+    for entity_key in ENTITY_SECTIONS:
+        document[entity_key] = taxonomy.get(entity_key, {})
+    return document
+
+
+def _serialise(document: Dict[str, Any]) -> bytes:
+    return json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def get_taxonomy_export(
+    db: Session, corpus_type_name: str, if_none_match: Optional[str] = None
+) -> Optional[TaxonomyExport]:
+    """Get the serialised taxonomy document of a corpus type.
+
+    When the taxonomy was saved with create_corpus_type or
+    update_corpus_type_taxonomy its stored hash is the version, so the
+    taxonomy itself is only fetched and serialised on a cache miss.
+
+    :param Session db: The DB session to connect to.
+    :param str corpus_type_name: The name of the CorpusType.
+    :param Optional[str] if_none_match: The version the caller holds, if
+        it is still current no body is returned.
+    :return Optional[TaxonomyExport]: The export or None if the corpus
+        type cannot be found.
+    """
+    params = {"corpus_type_name": corpus_type_name}
+    row = db.execute(_VERSION_BY_NAME, params).first()
+    if row is None:
+        return None
+
+    version = row[0]
+    if version is not None:
+        if version == if_none_match:
+            return TaxonomyExport(corpus_type_name, version, None)
+        body = _EXPORT_CACHE.get((corpus_type_name, version))
+        if body is not None:
+            return TaxonomyExport(corpus_type_name, version, body)
+
+    taxonomy = db.execute(_TAXONOMY_BY_NAME, params).scalar()
+    if version is None:
+        # Not validated when saved, so hash the content as it is.
+        version = taxonomy_digest(taxonomy)
+        if version == if_none_match:
+            return TaxonomyExport(corpus_type_name, version, None)
+
+    cache_key = (corpus_type_name, version)
+    body = _EXPORT_CACHE.get(cache_key)
+    if body is None:
+        body = _serialise(build_taxonomy_document(corpus_type_name, version, taxonomy))
+        _EXPORT_CACHE.put(cache_key, body)
+    return TaxonomyExport(corpus_type_name, version, body)
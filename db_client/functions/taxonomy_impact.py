@@ -0,0 +1,239 @@
+"""
+Impact analysis of edits to a CorpusType taxonomy.
+
+When CorpusType.valid_metadata is edited only the metadata keys touched by
+the edit can become invalid. The old and new taxonomies are compared per
+key and only the rows that reference a changed key are revalidated.
+"""
+
+from typing import (
+    Any,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from db_client.functions.corpus_helpers import TaxonomyData
+from db_client.functions.metadata import (
+    MetadataValidationError,
+    compile_entity_taxonomy,
+)
+from db_client.models.dfce import FamilyDocument, FamilyEvent, FamilyMetadata
+from db_client.models.dfce.family import FamilyCorpus
+from db_client.models.dfce.taxonomy_entry import EntitySpecificTaxonomyKeys
+from db_client.models.organisation import Corpus
+
+TAXONOMY_SECTIONS: Sequence[Optional[str]] = (
+    None,
+    EntitySpecificTaxonomyKeys.DOCUMENT.value,
+    EntitySpecificTaxonomyKeys.EVENT.value,
+    EntitySpecificTaxonomyKeys.COLLECTION.value,
+)
+
+# For each revalidated entity: its import_id, metadata and family columns.
+# NOTE: Collections are not linked to a corpus so cannot be revalidated.
+_ENTITY_METADATA = {
+    None: (
+        FamilyMetadata.family_import_id,
+        FamilyMetadata.value,
+        FamilyMetadata.family_import_id,
+    ),
+    EntitySpecificTaxonomyKeys.DOCUMENT.value: (
+        FamilyDocument.import_id,
+        FamilyDocument.valid_metadata,
+        FamilyDocument.family_import_id,
+    ),
+    EntitySpecificTaxonomyKeys.EVENT.value: (
+        FamilyEvent.import_id,
+        FamilyEvent.valid_metadata,
+        FamilyEvent.family_import_id,
+    ),
+}
+
+
+class TaxonomyKeyChange(NamedTuple):
+    """A change to a taxonomy key that can invalidate existing metadata."""
+
+    # The entity specific taxonomy key, None for family metadata.
+    entity_key: Optional[str]
+    key: str
+    # The key is new, so is now required.
+    added: bool = False
+    # The key was removed, so is now an extra key.
+    removed: bool = False
+    # Allowed values that are no longer allowed.
+    removed_values: FrozenSet[str] = frozenset()
+    # allow_blanks changed from True to False.
+    blanks_disallowed: bool = False
+    # allow_any changed from True to False.
+    any_disallowed: bool = False
+
+
+class InvalidatedMetadata(NamedTuple):
+    """An entity whose metadata is invalid against the new taxonomy."""
+
+    # The entity specific taxonomy key, None for family metadata.
+    entity_key: Optional[str]
+    import_id: str
+    errors: List[MetadataValidationError]
+
+
+def _section(taxonomy: Mapping, entity_key: Optional[str]) -> Mapping[str, Any]:
+    if entity_key is None:
+        return {
+            key: value
+            for key, value in taxonomy.items()
+            if key not in TAXONOMY_SECTIONS
+        }
+    section = taxonomy.get(entity_key, {})
+    return section if isinstance(section, Mapping) else {}
+
+
+def _allowed_values(entry: Mapping) -> FrozenSet[str]:
+    return frozenset(entry.get("allowed_values") or [])
+
+
+def diff_taxonomies(
+    old_taxonomy: TaxonomyData, new_taxonomy: TaxonomyData
+) -> List[TaxonomyKeyChange]:
+    """Lists the changes to a taxonomy that can invalidate metadata.
+
+    Changes that only relax the taxonomy, such as adding allowed values,
+    are not reported.
+
+    :param TaxonomyData old_taxonomy: The CorpusType.valid_metadata
+        before the edit.
+    :param TaxonomyData new_taxonomy: The CorpusType.valid_metadata
+        after the edit.
+    :return List[TaxonomyKeyChange]: The changes per entity and key.
+    """
+    changes = []
+    for entity_key in TAXONOMY_SECTIONS:
+        old_section = _section(old_taxonomy, entity_key)
+        new_section = _section(new_taxonomy, entity_key)
+
+        for key in old_section.keys() - new_section.keys():
+            changes.append(TaxonomyKeyChange(entity_key, key, removed=True))
+
+        for key, new_entry in new_section.items():
+            if key not in old_section:
+                changes.append(TaxonomyKeyChange(entity_key, key, added=True))
+                continue
+
+            old_entry = old_section[key]
+            if not isinstance(old_entry, Mapping) or not isinstance(new_entry, Mapping):
+                continue
+
+            change = TaxonomyKeyChange(
+                entity_key,
+                key,
+                removed_values=_allowed_values(old_entry) - _allowed_values(new_entry),
+                blanks_disallowed=bool(old_entry.get("allow_blanks"))
+                and not new_entry.get("allow_blanks"),
+                any_disallowed=bool(old_entry.get("allow_any"))
+                and not new_entry.get("allow_any"),
+            )
+            if (
+                change.removed_values
+                or change.blanks_disallowed
+                or change.any_disallowed
+            ):
+                changes.append(change)
+    return changes
+
+
+def _affected_rows_filter(metadata_column, changes: Sequence[TaxonomyKeyChange]):
+    """Builds a filter matching the rows that reference a changed key."""
+    conditions = []
+
+    added_keys = [change.key for change in changes if change.added]
+    if added_keys:
+        conditions.append(
+            sa.not_(
+                metadata_column.has_all(postgresql.array(added_keys, type_=sa.Text))
+            )
+        )
+
+    touched_keys = [
+        change.key for change in changes if change.removed or change.any_disallowed
+    ]
+    if touched_keys:
+        conditions.append(
+            metadata_column.has_any(postgresql.array(touched_keys, type_=sa.Text))
+        )
+
+    for change in changes:
+        if change.removed_values:
+            conditions.append(
+                metadata_column[change.key].has_any(
+                    postgresql.array(sorted(change.removed_values), type_=sa.Text)
+                )
+            )
+        if change.blanks_disallowed:
+            conditions.append(metadata_column[change.key] == sa.text("'[]'::jsonb"))
+
+    return sa.or_(*conditions)
+
+
+def find_invalidated_metadata(
+    db: Session,
+    corpus_type_name: str,
+    old_taxonomy: TaxonomyData,
+    new_taxonomy: TaxonomyData,
+    batch_size: int = 1000,
+) -> Iterator[InvalidatedMetadata]:
+    """Finds the metadata invalidated by an edit to a CorpusType taxonomy.
+
+    Only the family, document and event metadata that references a key
+    changed by the edit is fetched, in batches, and revalidated against
+    the new taxonomy. The results are yielded as they are found.
+
+    NOTE: All the errors of an affected entity are reported, including
+    any that were already present before the edit.
+
+    :param Session db: The DB session to connect to.
+    :param str corpus_type_name: The name of the edited CorpusType.
+    :param TaxonomyData old_taxonomy: The CorpusType.valid_metadata
+        before the edit.
+    :param TaxonomyData new_taxonomy: The CorpusType.valid_metadata
+        after the edit.
+    :param int batch_size: The number of rows to fetch at a time.
+    :raises TypeError: If the new Taxonomy is invalid.
+    :return Iterator[InvalidatedMetadata]: The entities whose metadata
+        is invalid against the new taxonomy.
+    """
+    changes = diff_taxonomies(old_taxonomy, new_taxonomy)
+
+    for entity_key, (
+        import_id_column,
+        metadata_column,
+        family_column,
+    ) in _ENTITY_METADATA.items():
+        entity_changes = [
+            change for change in changes if change.entity_key == entity_key
+        ]
+        if not entity_changes:
+            continue
+
+        taxonomy_entries = compile_entity_taxonomy(new_taxonomy, entity_key)
+        rows = (
+            db.query(import_id_column, metadata_column)
+            .join(FamilyCorpus, FamilyCorpus.family_import_id == family_column)
+            .join(Corpus, Corpus.import_id == FamilyCorpus.corpus_import_id)
+            .filter(Corpus.corpus_type_name == corpus_type_name)
+            .filter(_affected_rows_filter(metadata_column, entity_changes))
+            .order_by(import_id_column)
+            .yield_per(batch_size)
+        )
+        for import_id, metadata in rows:
+            errors = taxonomy_entries.validate(metadata or {}, entity_key is None)
+            if errors:
+                yield InvalidatedMetadata(entity_key, import_id, errors)
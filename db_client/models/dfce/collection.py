@@ -10,6 +10,14 @@ class Collection(Base):
     """A collection of document families."""
 
     __tablename__ = "collection"
+    __table_args__ = (
+        sa.Index(
+            "ix_collection_valid_metadata",
+            "valid_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"valid_metadata": "jsonb_path_ops"},
+        ),
+    )
 
     import_id = sa.Column(sa.Text, primary_key=True)
     title = sa.Column(sa.Text, nullable=False)
@@ -100,6 +100,18 @@ class Family(Base):
     """A representation of a group of documents that represent a single law/policy."""
 
     __tablename__ = "family"
+    __table_args__ = (
+        sa.Index(
+            "ix_family_family_status_published_date",
+            "family_status",
+            "published_date",
+        ),
+        sa.Index(
+            "ix_family_family_status_last_updated_date",
+            "family_status",
+            "last_updated_date",
+        ),
+    )
     __allow_unmapped__ = True
 
     title = sa.Column(sa.Text, nullable=False)
@@ -150,6 +162,26 @@ class Family(Base):
         nullable=False,
     )
 
+    # The family_status, published_date and last_updated_date of the family
+    # as last computed by the triggers on family_document and family_event,
+    # which the SQL expressions of the properties read. The triggers cannot
+    # tell when an event stops being in the future, so next_event_date is
+    # also stored, after which the last_updated_date expression computes the
+    # date until refresh_family_status_dates brings the column up to date.
+    stored_family_status = sa.Column(
+        "family_status",
+        sa.Enum(FamilyStatus),
+        server_default=FamilyStatus.CREATED.name,
+        nullable=False,
+    )
+    stored_published_date = sa.Column(
+        "published_date", sa.DateTime(timezone=True), nullable=True
+    )
+    stored_last_updated_date = sa.Column(
+        "last_updated_date", sa.DateTime(timezone=True), nullable=True
+    )
+    next_event_date = sa.Column(sa.DateTime(timezone=True), nullable=True)
+
     @hybrid_property
     def family_status(self) -> Literal[FamilyStatus]:  # type: ignore
         """Calculates the family status given its documents."""
@@ -166,44 +198,7 @@ class Family(Base):
 
     @family_status.expression
     def family_status(cls):
-        is_published = (
-            sa.select([sa.func.count(FamilyDocument.document_status)])
-            .where(
-                sa.and_(
-                    FamilyDocument.family_import_id == cls.import_id,
-                    FamilyDocument.document_status == DocumentStatus.PUBLISHED,
-                )
-            )
-            .as_scalar()
-        )
-
-        is_created = (
-            sa.select([sa.func.count(FamilyDocument.document_status)])
-            .where(
-                sa.and_(
-                    FamilyDocument.family_import_id == cls.import_id,
-                    FamilyDocument.document_status == DocumentStatus.CREATED,
-                )
-            )
-            .as_scalar()
-        )
-
-        # DO NOT USE 'is None'!
-        return sa.case(
-            [
-                (
-                    cls.family_documents == None,  # noqa: E711
-                    sa.literal_column(f"'{FamilyStatus.CREATED}'"),
-                )
-            ],
-            else_=sa.case(
-                [(is_published > 0, sa.literal_column(f"'{FamilyStatus.PUBLISHED}'"))],
-                else_=sa.case(
-                    [(is_created > 0, sa.literal_column(f"'{FamilyStatus.CREATED}'"))],
-                    else_=sa.literal_column(f"'{FamilyStatus.DELETED}'"),
-                ),
-            ),
-        ).label("family_status")
+        return cls.stored_family_status.label("family_status")
 
     @hybrid_property
     def published_date(self) -> Optional[datetime]:
@@ -233,6 +228,10 @@ class Family(Base):
                 date = min(cast(datetime, event.date), date)
         return date
 
+    @published_date.expression
+    def published_date(cls):
+        return cls.stored_published_date.label("published_date")
+
     @hybrid_property
     def last_updated_date(self) -> Optional[datetime]:
         """A "last updated" date to use during display of Family."""
@@ -247,6 +246,24 @@ class Family(Base):
                     date = max(cast(datetime, event.date), date)
         return date
 
+    @last_updated_date.expression
+    def last_updated_date(cls):
+        """The stored date, or the latest past event once it is stale."""
+        latest_past_event_date = (
+            sa.select([sa.func.max(FamilyEvent.date)])
+            .where(
+                sa.and_(
+                    FamilyEvent.family_import_id == cls.import_id,
+                    FamilyEvent.date <= sa.func.now(),
+                )
+            )
+            .scalar_subquery()
+        )
+        return sa.case(
+            [(cls.next_event_date <= sa.func.now(), latest_past_event_date)],
+            else_=cls.stored_last_updated_date,
+        ).label("last_updated_date")
+
 
 class DocumentStatus(BaseModelEnum):
     """FamilyDocument status to control visibility in the app."""
@@ -260,6 +277,14 @@ class FamilyDocument(Base):
     """A link between a Family and a PhysicalDocument."""
 
     __tablename__ = "family_document"
+    __table_args__ = (
+        sa.Index(
+            "ix_family_document_valid_metadata",
+            "valid_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"valid_metadata": "jsonb_path_ops"},
+        ),
+    )
     __allow_unmapped__ = True
 
     family_import_id = sa.Column(
@@ -346,6 +371,14 @@ class FamilyEvent(Base):
     """An event associated with a Family timeline with optional link to a document."""
 
     __tablename__ = "family_event"
+    __table_args__ = (
+        sa.Index(
+            "ix_family_event_valid_metadata",
+            "valid_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"valid_metadata": "jsonb_path_ops"},
+        ),
+    )
 
     import_id = sa.Column(sa.Text, primary_key=True)
     title = sa.Column(sa.Text, nullable=False)
@@ -9,6 +9,14 @@ class FamilyMetadata(Base):
     """A set of metadata values linked to a Family."""
 
     __tablename__ = "family_metadata"
+    __table_args__ = (
+        sa.Index(
+            "ix_family_metadata_value",
+            "value",
+            postgresql_using="gin",
+            postgresql_ops={"value": "jsonb_path_ops"},
+        ),
+    )
 
     family_import_id = sa.Column(sa.ForeignKey(Family.import_id))
 
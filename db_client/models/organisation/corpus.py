@@ -12,6 +12,10 @@ class CorpusType(Base):
     name = sa.Column(sa.Text, primary_key=True)
     description = sa.Column(sa.Text, nullable=False)
     valid_metadata = sa.Column(postgresql.JSONB, nullable=False)
+    # The content hash of valid_metadata, only set once it has been
+    # validated and normalised. Cleared by a trigger if valid_metadata is
+    # changed without it.
+    valid_metadata_hash = sa.Column(sa.Text, nullable=True)
 
 
 class Corpus(Base):
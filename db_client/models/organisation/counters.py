@@ -8,10 +8,12 @@ concept of "data source" is not yet implemented, see PDCT-431.
 
 import logging
 from enum import Enum
-from typing import Optional, cast
+from typing import List, Optional, cast
 
 import sqlalchemy as sa
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.session import object_session
 from sqlalchemy.sql import text
 
@@ -54,13 +56,19 @@ class EntityCounter(Base):
 
     __tablename__ = "entity_counter"
 
-    _get_and_increment = text(
+    _advance_by = text(
         """
-        WITH updated AS (
-        UPDATE entity_counter SET counter = COALESCE(counter, 0) + 1
-        WHERE id = :id RETURNING counter
-        )
-        SELECT counter FROM updated;
+        UPDATE entity_counter SET counter = COALESCE(counter, 0) + :n
+        WHERE id = :id RETURNING counter;
+        """
+    )
+
+    # Whether the transaction running it inserted, updated or locked the
+    # row, so an update from another connection would wait on it forever.
+    _is_held = text(
+        """
+        SELECT pg_current_xact_id_if_assigned()::xid IN (xmin, xmax)
+        FROM entity_counter WHERE id = :id;
         """
     )
 
@@ -69,27 +77,129 @@ class EntityCounter(Base):
     prefix = sa.Column(sa.ForeignKey(Organisation.name), nullable=False)
     counter = sa.Column(sa.Integer, nullable=False, server_default="0")
 
+    def _advance(self, n: int) -> int:
+        """
+        Advances the counter by n, in its own transaction where it can.
+
+        The update runs on a separate connection and is committed at once,
+        so the transaction of the session that loaded the counter is left
+        as it is and the row is only locked for the update, waiting for any
+        other allocator as it would in the session. Values are not returned
+        if that transaction rolls back, like a sequence.
+
+        The counter is instead advanced in the session's transaction if the
+        session is bound to a connection rather than an engine, is in a
+        nested transaction, or has itself inserted, changed or locked the
+        row, which the separate connection would wait on forever. Those
+        values are returned again if the transaction rolls back, and the
+        row stays locked until it ends, so commit a new counter before
+        using it.
+
+        :param int n: The number of values to advance by.
+        :raises RuntimeError: raised when the counter row does not exist.
+        :return int: The new counter value.
+        """
+        db: Optional[Session] = object_session(self)
+
+        if db is None:
+            _LOGGER.exception("When creating object session")
+            raise
+
+        if self.id is None:
+            db.flush()
+        params = {"id": self.id, "n": n}
+
+        bind = db.get_bind()
+        if isinstance(bind, Engine) and not self._is_held_by(db):
+            with bind.begin() as connection:
+                value = connection.execute(self._advance_by, params).scalar()
+        else:
+            value = db.execute(self._advance_by, params).scalar()
+        if value is None:
+            raise RuntimeError(f"No entity counter with id {self.id}")
+
+        # Keep the loaded row in step without marking it as changed.
+        set_committed_value(self, "counter", value)
+        return cast(int, value)
+
+    def _is_held_by(self, db: Session) -> bool:
+        """
+        Whether the counter row is held by the transaction of the session.
+
+        Rows written in a SAVEPOINT carry the id of the subtransaction,
+        which cannot be compared, so a nested transaction is assumed to
+        hold the row.
+
+        :param Session db: The session of the counter.
+        :return bool: True if an update outside the session would wait on
+            its transaction.
+        """
+        if not db.in_transaction():
+            return False
+        if db.in_nested_transaction():
+            return True
+        return bool(db.execute(self._is_held, {"id": self.id}).scalar())
+
     def get_next_count(self) -> str:
         """
         Gets the next counter value and updates the row.
 
+        NOTE: This does not commit the session of the counter, which
+        should have committed the counter row, see _advance.
+
         :return str: The next counter value.
         """
         try:
-            db: Optional[Session] = object_session(self)
+            return cast(str, self._advance(1))
+        except:
+            _LOGGER.exception(f"When generating counter for {self.prefix}")
+            raise
 
-            if db is None:
-                _LOGGER.exception("When creating object session")
-                raise
+    def reserve_block(self, n: int) -> range:
+        """
+        Reserves the next n counter values with a single update.
 
-            cmd = self._get_and_increment.bindparams(id=self.id)
-            value = cast(str, db.execute(cmd).scalar())
-            db.commit()
-            return value
+        NOTE: This does not commit the session of the counter, which
+        should have committed the counter row, see _advance.
+
+        :param int n: The number of values to reserve.
+        :raises ValueError: raised when n is not positive.
+        :return range: The reserved counter values.
+        """
+        if n < 1:
+            raise ValueError(f"Cannot reserve {n} counter values")
+
+        try:
+            last = self._advance(n)
+            return range(last - n + 1, last + 1)
         except:
-            _LOGGER.exception(f"When generating counter for {self.prefix}")
+            _LOGGER.exception(f"When reserving counters for {self.prefix}")
             raise
 
+    def format_import_id(self, entity: CountedEntity, count: int) -> str:
+        """
+        Formats a counter value as an import id.
+
+        :param CountedEntity entity: The entity being counted
+        :param int count: The counter value
+        :return str: The fully formatted import_id
+        """
+        n = 0  # The fourth quad is historical
+        i_value = str(count).zfill(8)
+        n_value = str(n).zfill(4)
+        return f"{self.prefix}.{entity.value}.i{i_value}.n{n_value}"
+
+    def create_import_ids(self, entity: CountedEntity, n: int) -> List[str]:
+        """
+        Creates n unique import ids with a single update of the counter.
+
+        :param CountedEntity entity: The entity you want counted
+        :param int n: The number of import ids
+        :raises ValueError: raised when n is not positive.
+        :return List[str]: The fully formatted import_ids, in order
+        """
+        return [self.format_import_id(entity, count) for count in self.reserve_block(n)]
+
     def create_import_id(self, entity: CountedEntity) -> str:
         """
         Creates a unique import id.
@@ -105,7 +215,4 @@ class EntityCounter(Base):
         # this has been removed as we expect many organisations. Should we query
         # for the organisation to continue validation?
 
-        n = 0  # The fourth quad is historical
-        i_value = str(self.get_next_count()).zfill(8)
-        n_value = str(n).zfill(4)
-        return f"{self.prefix}.{entity.value}.i{i_value}.n{n_value}"
+        return self.format_import_id(entity, int(self.get_next_count()))
@@ -0,0 +1,297 @@
+"""
+Benchmarks for the metadata validation hot path.
+
+Uses the bundled CCLW and UNFCCC taxonomies, plus synthetic taxonomies of
+varying width (number of keys), with synthetic metadata of varying
+cardinality (values per key) to measure build_valid_taxonomy,
+_validate_metadata and validate_metadata for families, documents and events.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.metadata_validation
+    python -m tests.benchmarks.metadata_validation --update-baseline
+
+The results are compared against the stored baseline and the run fails if
+any benchmark is slower than the baseline by more than the tolerance. The
+baseline is machine specific, so update it on the machine that runs it.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+from functools import partial
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional
+
+from db_client.functions.metadata import (
+    _validate_metadata,
+    build_valid_taxonomy,
+    compile_entity_taxonomy,
+    invalidate_taxonomy_cache,
+    validate_metadata,
+)
+from db_client.functions.taxonomy_cache import taxonomy_digest
+from db_client.utils import get_library_path
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "metadata_validation_baseline.json"
+)
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_REPEAT = 5
+
+# The number of keys of each synthetic taxonomy, per section.
+SYNTHETIC_WIDTHS = (10, 100)
+SYNTHETIC_ALLOWED_VALUES = 200
+
+# The number of values picked per metadata key.
+CARDINALITIES = {"single": 1, "many": 20}
+
+
+class BenchmarkResult(NamedTuple):
+    """The measurements of a single benchmark."""
+
+    name: str
+    ops_per_sec: float
+    # The peak memory allocated by a single operation, in bytes.
+    peak_bytes: int
+
+
+def _load_taxonomy(name: str) -> dict:
+    path = f"{get_library_path()}/data_migrations/data/source/{name}_taxonomy.json"
+    with open(path) as taxonomy_file:
+        return json.load(taxonomy_file)
+
+
+def _synthetic_taxonomy(width: int) -> dict:
+    section = {
+        f"key-{i}": {
+            "allow_blanks": False,
+            "allowed_values": [
+                f"value-{i}-{j}" for j in range(SYNTHETIC_ALLOWED_VALUES)
+            ],
+        }
+        for i in range(width)
+    }
+    return {**section, "_document": section, "_event": section}
+
+
+def _taxonomies() -> Dict[str, dict]:
+    taxonomies = {name: _load_taxonomy(name) for name in ("cclw", "unfccc")}
+    for width in SYNTHETIC_WIDTHS:
+        taxonomies[f"synthetic-{width}"] = _synthetic_taxonomy(width)
+    return taxonomies
+
+
+def _synthetic_metadata(taxonomy: Mapping, cardinality: int, seed: int = 0) -> dict:
+    """Picks up to `cardinality` allowed values for every key of the taxonomy."""
+    rng = random.Random(seed)
+    metadata = {}
+    for key, entry in taxonomy.items():
+        if key.startswith("_"):
+            continue
+        allowed_values = entry["allowed_values"] or [f"{key}-{i}" for i in range(50)]
+        metadata[key] = rng.sample(
+            allowed_values, min(cardinality, len(allowed_values))
+        )
+    return metadata
+
+
+class _StaticTaxonomySession:
+    """Stands in for a Session, always returning the same taxonomy.
+
+    This keeps the database out of the validate_metadata benchmarks. The
+    taxonomy is returned with its hash, as if it was saved with
+    create_corpus_type.
+    """
+
+    def __init__(self, taxonomy: Mapping):
+        self._row = (taxonomy, taxonomy_digest(taxonomy))
+
+    def execute(self, *_):
+        return self
+
+    def scalar(self):
+        return self._row[1]
+
+    def first(self):
+        return self._row
+
+
+def _benchmarks() -> Dict[str, Callable[[], object]]:
+    benchmarks: Dict[str, Callable[[], object]] = {}
+
+    for corpus_name, taxonomy in _taxonomies().items():
+        family_taxonomy = {k: v for k, v in taxonomy.items() if not k.startswith("_")}
+        session = _StaticTaxonomySession(taxonomy)
+
+        benchmarks[f"{corpus_name}/build_valid_taxonomy/family"] = partial(
+            build_valid_taxonomy, family_taxonomy
+        )
+
+        for entity_key, entity in (
+            (None, "family"),
+            ("_document", "document"),
+            ("_event", "event"),
+        ):
+            compiled = compile_entity_taxonomy(taxonomy, entity_key)
+            entity_taxonomy = (
+                family_taxonomy if entity_key is None else taxonomy[entity_key]
+            )
+            is_family_metadata = entity_key is None
+
+            for cardinality_name, cardinality in CARDINALITIES.items():
+                metadata = _synthetic_metadata(entity_taxonomy, cardinality)
+
+                benchmarks[
+                    f"{corpus_name}/_validate_metadata/{entity}/{cardinality_name}"
+                ] = partial(_validate_metadata, compiled, metadata, is_family_metadata)
+                benchmarks[
+                    f"{corpus_name}/validate_metadata/{entity}/{cardinality_name}"
+                ] = partial(
+                    validate_metadata, session, corpus_name, metadata, entity_key
+                )
+
+    return benchmarks
+
+
+def _measure(
+    name: str, operation: Callable[[], object], min_time: float, repeat: int
+) -> BenchmarkResult:
+    # Warm up, this also fills the taxonomy cache.
+    operation()
+
+    # Like timeit, calibrate the iterations to the minimum time and keep
+    # the best of the repeats, as the others are slowed by noise.
+    timer = timeit.Timer(operation)
+    iterations = 1
+    while timer.timeit(iterations) < min_time:
+        iterations *= 2
+    best = min(timer.repeat(repeat=repeat, number=iterations))
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, iterations / best, peak - baseline)
+
+
+def run_benchmarks(
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+    names: Optional[List[str]] = None,
+) -> List[BenchmarkResult]:
+    """Runs the benchmarks.
+
+    :param float min_time: The minimum time to run each benchmark for,
+        in seconds, per repeat.
+    :param int repeat: The number of times to repeat each benchmark, the
+        fastest repeat is kept.
+    :param Optional[List[str]] names: Only run the benchmarks whose
+        name starts with one of these, all of them if None.
+    :return List[BenchmarkResult]: The measurements of each benchmark.
+    """
+    invalidate_taxonomy_cache()
+    return [
+        _measure(name, operation, min_time, repeat)
+        for name, operation in _benchmarks().items()
+        if names is None or any(name.startswith(prefix) for prefix in names)
+    ]
+
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: Mapping[str, Mapping[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Compares the results to the baseline.
+
+    :param List[BenchmarkResult] results: The measurements.
+    :param Mapping baseline: The stored measurements, keyed by name.
+    :param float tolerance: The fraction of the baseline ops/sec that a
+        benchmark may lose, or of the peak bytes it may gain, before it
+        counts as a regression.
+    :return List[str]: A description of each regression.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected is None:
+            continue
+        minimum = expected["ops_per_sec"] * (1 - tolerance)
+        if result.ops_per_sec < minimum:
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:,.0f} ops/sec is below "
+                f"{minimum:,.0f} (baseline {expected['ops_per_sec']:,.0f})"
+            )
+        maximum = expected["peak_bytes"] * (1 + tolerance)
+        if result.peak_bytes > maximum:
+            regressions.append(
+                f"{result.name}: {result.peak_bytes:,} peak bytes is above "
+                f"{maximum:,.0f} (baseline {expected['peak_bytes']:,})"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("names", nargs="*", help="Only run benchmarks with prefix")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the new baseline",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.min_time, args.repeat, args.names or None)
+    width = max(len(result.name) for result in results)
+    print(f"{'benchmark':<{width}}  {'ops/sec':>12}  {'peak bytes':>10}")
+    for result in results:
+        print(
+            f"{result.name:<{width}}  {result.ops_per_sec:>12,.0f}  "
+            f"{result.peak_bytes:>10,}"
+        )
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(
+                {
+                    result.name: {
+                        "ops_per_sec": result.ops_per_sec,
+                        "peak_bytes": result.peak_bytes,
+                    }
+                    for result in results
+                },
+                baseline_file,
+                indent=2,
+                sort_keys=True,
+            )
+            baseline_file.write("\n")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from tests.benchmarks.metadata_validation import (
+    BenchmarkResult,
+    find_regressions,
+    run_benchmarks,
+)
+
+
+def test_benchmarks_run():
+    results = run_benchmarks(min_time=0, repeat=1, names=["unfccc/"])
+
+    assert results
+    assert all(result.name.startswith("unfccc/") for result in results)
+    assert all(result.ops_per_sec > 0 for result in results)
+
+
+def test_find_regressions():
+    baseline = {
+        "fast": {"ops_per_sec": 100.0, "peak_bytes": 1000},
+        "slow": {"ops_per_sec": 100.0, "peak_bytes": 1000},
+        "big": {"ops_per_sec": 100.0, "peak_bytes": 1000},
+    }
+    results = [
+        BenchmarkResult("fast", 80.0, 1000),
+        BenchmarkResult("slow", 50.0, 1000),
+        BenchmarkResult("big", 100.0, 2000),
+        BenchmarkResult("new", 1.0, 1),
+    ]
+
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow:")
+    assert regressions[1].startswith("big:")
@@ -0,0 +1,83 @@
+import pytest
+
+from db_client.functions.dfce_helpers import add_families_bulk
+from db_client.models.dfce import (
+    Family,
+    FamilyDocument,
+    FamilyEvent,
+    FamilyGeography,
+    FamilyMetadata,
+    Slug,
+)
+from db_client.models.dfce.family import FamilyCorpus
+from db_client.models.document.physical_document import (
+    PhysicalDocument,
+    PhysicalDocumentLanguage,
+)
+from tests.functions.helpers import document_dict, family_dict
+
+
+def _family(n, languages=("eng",)):
+    return family_dict(
+        n,
+        documents=[document_dict(n, d, languages=list(languages)) for d in range(2)],
+        geography_id=[2, 5],
+        metadata={"size": "small"},
+    )
+
+
+def test_add_families_bulk(test_db):
+    add_families_bulk(
+        test_db,
+        (_family(n, languages=("eng", "fra")) for n in range(3)),
+        batch_size=2,
+    )
+
+    assert test_db.query(Family).count() == 3
+    assert test_db.query(FamilyGeography).count() == 6
+    assert test_db.query(FamilyMetadata).count() == 3
+    assert test_db.query(FamilyCorpus).count() == 3
+    assert test_db.query(PhysicalDocument).count() == 6
+    assert test_db.query(FamilyDocument).count() == 6
+    assert test_db.query(PhysicalDocumentLanguage).count() == 12
+    assert test_db.query(Slug).count() == 9
+    assert test_db.query(FamilyEvent).count() == 6
+
+    document = test_db.query(FamilyDocument).get("CCLW.executive.1.1")
+    assert document.family_import_id == "CCLW.family.1.0"
+    assert document.physical_document.title == "Doc1.1"
+    assert sorted(
+        lang.language_code for lang in document.physical_document.languages
+    ) == [
+        "eng",
+        "fra",
+    ]
+    assert document.slugs[0].name == "DocSlug1.1"
+
+    event = test_db.query(FamilyEvent).get("CCLW.event.1.1.0")
+    assert event.family_document_import_id == "CCLW.executive.1.1"
+    assert event.valid_metadata == {
+        "event_type": ["Passed/Approved"],
+        "datetime_event_name": ["Passed/Approved"],
+    }
+
+    family = test_db.query(Family).get("CCLW.family.1.0")
+    assert family.published_date is not None
+
+
+def test_add_families_bulk_ids_follow_the_sequence(test_db):
+    add_families_bulk(test_db, [_family(1)])
+    physical_document = PhysicalDocument(title="After")
+    test_db.add(physical_document)
+    test_db.flush()
+
+    ids = [
+        pd.id for pd in test_db.query(PhysicalDocument).order_by(PhysicalDocument.id)
+    ]
+    assert ids[-1] == physical_document.id
+    assert len(set(ids)) == 3
+
+
+def test_add_families_bulk_unknown_language(test_db):
+    with pytest.raises(ValueError):
+        add_families_bulk(test_db, [_family(1, languages=("xx1",))])
@@ -0,0 +1,96 @@
+import pytest
+
+from db_client.functions.parallel_ingest import (
+    find_slug_conflicts,
+    ingest_families_parallel,
+    partition_families,
+)
+from db_client.models.dfce import Family, FamilyDocument
+from tests.functions.helpers import document_dict, family_dict
+
+
+def _family(n, corpus_import_id="CCLW.corpus.i00000001.n0000", slug=None):
+    return family_dict(
+        n,
+        documents=[document_dict(n, events=0)],
+        corpus_import_id=corpus_import_id,
+        slug=slug or f"FamSlug{n}",
+    )
+
+
+def test_partition_families_by_corpus():
+    families = [_family(n, "A") for n in range(3)] + [
+        _family(n, "B") for n in range(3, 5)
+    ]
+
+    partitions = partition_families(families, 2, "corpus")
+
+    assert [[f["corpus_import_id"] for f in p] for p in partitions] == [
+        ["A", "A", "A"],
+        ["B", "B"],
+    ]
+
+
+def test_partition_families_by_hash_is_stable():
+    families = [_family(n) for n in range(20)]
+
+    partitions = partition_families(families, 3, "hash")
+
+    assert partitions == partition_families(families, 3, "hash")
+    assert sorted(f["import_id"] for p in partitions for f in p) == sorted(
+        f["import_id"] for f in families
+    )
+
+
+def test_partition_families_unknown():
+    with pytest.raises(ValueError):
+        partition_families([], 2, "size")
+
+
+def test_find_slug_conflicts():
+    partitions = [[_family(1, slug="Same")], [_family(2, slug="Same"), _family(3)]]
+
+    assert find_slug_conflicts(partitions) == {"Same": [0, 1]}
+
+
+def test_ingest_families_parallel_slug_conflicts(test_db):
+    report = ingest_families_parallel(
+        test_db.bind.url,
+        [_family(1, slug="Same"), _family(2, slug="Same")],
+        workers=2,
+        partition_by="hash",
+    )
+
+    assert not report.ok
+    assert list(report.slug_conflicts) == ["Same"]
+    assert test_db.query(Family).count() == 0
+
+
+def test_ingest_families_parallel(test_db):
+    report = ingest_families_parallel(
+        test_db.bind.url,
+        [_family(n) for n in range(10)],
+        workers=2,
+        partition_by="hash",
+        chunk_size=3,
+    )
+
+    assert report.ok
+    assert report.families == 10
+    assert report.documents == 10
+    assert test_db.query(Family).count() == 10
+    assert test_db.query(FamilyDocument).count() == 10
+
+
+def test_ingest_families_parallel_reports_partition_errors(test_db):
+    bad = _family(1, corpus_import_id="B")
+    bad["documents"][0]["languages"] = ["xx1"]
+
+    report = ingest_families_parallel(
+        test_db.bind.url, [_family(0), bad], workers=2, partition_by="corpus"
+    )
+
+    assert not report.ok
+    assert [result.error is None for result in report.partitions] == [True, False]
+    assert "xx1" in report.partitions[1].error
+    assert test_db.query(Family).count() == 1
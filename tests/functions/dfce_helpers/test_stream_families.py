@@ -0,0 +1,66 @@
+import pytest
+
+from db_client.functions.streaming_ingest import FileCheckpoint, stream_families
+from db_client.models.dfce import Family, FamilyDocument
+from tests.functions.helpers import document_dict, family_dict
+
+
+def _family(n):
+    return family_dict(n, documents=[document_dict(n, events=0)])
+
+
+def test_stream_families_commits_in_chunks(test_db, tmp_path):
+    checkpoint = FileCheckpoint(str(tmp_path / "checkpoint.json"))
+    reported = []
+
+    def progress(state):
+        reported.append(state)
+        # Each chunk is committed and the session emptied.
+        assert len(test_db.identity_map) == 0
+        assert checkpoint.load() == state.last_import_id
+
+    result = stream_families(
+        test_db,
+        (_family(n) for n in range(5)),
+        chunk_size=2,
+        checkpoint=checkpoint,
+        progress=progress,
+    )
+
+    assert [state.families for state in reported] == [2, 4, 5]
+    assert result == (5, 5, "CCLW.family.4.0")
+    assert checkpoint.load() is None
+    assert test_db.query(Family).count() == 5
+    assert test_db.query(FamilyDocument).count() == 5
+
+
+def test_stream_families_resumes_from_checkpoint(test_db, tmp_path):
+    checkpoint = FileCheckpoint(str(tmp_path / "checkpoint.json"))
+
+    def fail_after_first_chunk(state):
+        raise RuntimeError("crashed")
+
+    with pytest.raises(RuntimeError):
+        stream_families(
+            test_db,
+            (_family(n) for n in range(5)),
+            chunk_size=2,
+            checkpoint=checkpoint,
+            progress=fail_after_first_chunk,
+        )
+    assert checkpoint.load() == "CCLW.family.1.0"
+
+    result = stream_families(
+        test_db, (_family(n) for n in range(5)), chunk_size=2, checkpoint=checkpoint
+    )
+
+    assert result.families == 3
+    assert test_db.query(Family).count() == 5
+
+
+def test_stream_families_checkpoint_not_in_input(test_db, tmp_path):
+    checkpoint = FileCheckpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.save("CCLW.family.99.0")
+
+    with pytest.raises(ValueError):
+        stream_families(test_db, [_family(1)], checkpoint=checkpoint)
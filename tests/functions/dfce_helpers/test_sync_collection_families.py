@@ -0,0 +1,92 @@
+from db_client.functions.dfce_helpers import (
+    add_collections,
+    add_families_bulk,
+    sync_collection_families,
+)
+from db_client.models.dfce.collection import Collection, CollectionFamily
+from tests.functions.helpers import family_dict
+
+COLLECTION_ID = "CPR.Collection.1.0"
+
+
+def _setup(test_db):
+    add_collections(
+        test_db,
+        [
+            {
+                "import_id": COLLECTION_ID,
+                "title": "Collection1",
+                "description": "CollectionSummary1",
+                "metadata": {},
+            }
+        ],
+    )
+    add_families_bulk(test_db, [family_dict(n, documents=0) for n in range(4)])
+
+
+def _members(test_db):
+    return sorted(
+        link.family_import_id
+        for link in test_db.query(CollectionFamily).filter(
+            CollectionFamily.collection_import_id == COLLECTION_ID
+        )
+    )
+
+
+def _last_modified(test_db):
+    test_db.expire_all()
+    return test_db.query(Collection).get(COLLECTION_ID).last_modified
+
+
+def test_sync_collection_families(test_db):
+    _setup(test_db)
+
+    result = sync_collection_families(
+        test_db, COLLECTION_ID, ["CCLW.family.0.0", "CCLW.family.1.0"]
+    )
+    assert result == (2, 0)
+    assert _members(test_db) == ["CCLW.family.0.0", "CCLW.family.1.0"]
+
+    result = sync_collection_families(
+        test_db, COLLECTION_ID, ["CCLW.family.1.0", "CCLW.family.2.0"]
+    )
+    assert result == (1, 1)
+    assert _members(test_db) == ["CCLW.family.1.0", "CCLW.family.2.0"]
+
+    assert sync_collection_families(test_db, COLLECTION_ID, []) == (0, 2)
+    assert _members(test_db) == []
+
+
+def test_sync_collection_families_touches_the_collection(test_db):
+    _setup(test_db)
+    created = _last_modified(test_db)
+
+    sync_collection_families(test_db, COLLECTION_ID, ["CCLW.family.0.0"])
+    test_db.commit()
+    synced = _last_modified(test_db)
+    assert synced > created
+
+    # A sync that changes nothing leaves the collection as it was.
+    assert sync_collection_families(test_db, COLLECTION_ID, ["CCLW.family.0.0"]) == (
+        0,
+        0,
+    )
+    test_db.commit()
+    assert _last_modified(test_db) == synced
+
+
+def test_sync_collection_families_removing_touches_the_collection(test_db):
+    _setup(test_db)
+    sync_collection_families(
+        test_db, COLLECTION_ID, ["CCLW.family.0.0", "CCLW.family.1.0"]
+    )
+    test_db.commit()
+    synced = _last_modified(test_db)
+
+    assert sync_collection_families(test_db, COLLECTION_ID, ["CCLW.family.1.0"]) == (
+        0,
+        1,
+    )
+    test_db.commit()
+    assert _members(test_db) == ["CCLW.family.1.0"]
+    assert _last_modified(test_db) > synced
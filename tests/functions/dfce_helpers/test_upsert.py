@@ -0,0 +1,133 @@
+import pytest
+
+from db_client.functions.dfce_helpers import add_collections, add_document, add_families
+from db_client.models.dfce import Family, FamilyDocument, FamilyEvent, Slug
+from db_client.models.dfce.collection import Collection
+from db_client.models.document.physical_document import PhysicalDocument
+from tests.functions.helpers import family_dict
+
+COLLECTION = {
+    "import_id": "CPR.Collection.1.0",
+    "title": "Collection1",
+    "description": "CollectionSummary1",
+    "metadata": {"key": "value"},
+}
+
+
+def _family(n, documents=2):
+    return family_dict(
+        n, documents=documents, geography_id=[2, 5], metadata={"size": "small"}
+    )
+
+
+def test_add_families_upsert_inserts(test_db):
+    report = add_families(test_db, [_family(1), _family(2)], upsert=True)
+
+    assert report.updated == 0
+    assert report.unchanged == 0
+    assert report.tables["family"].inserted == 2
+    assert report.tables["family_document"].inserted == 4
+    assert report.tables["physical_document_language"].inserted == 4
+    assert report.tables["slug"].inserted == 6
+    assert test_db.query(FamilyDocument).count() == 4
+
+
+def test_add_families_upsert_unchanged(test_db):
+    families = [_family(1), _family(2)]
+    first = add_families(test_db, families, upsert=True)
+    last_modified = test_db.query(Family).get("CCLW.family.1.0").last_modified
+    test_db.expire_all()
+
+    report = add_families(test_db, families, upsert=True)
+
+    assert report.inserted == 0
+    assert report.updated == 0
+    assert report.unchanged == first.inserted
+    assert test_db.query(Family).get("CCLW.family.1.0").last_modified == last_modified
+    assert test_db.query(PhysicalDocument).count() == 4
+
+
+def test_add_families_upsert_updates_changed_rows(test_db):
+    add_families(test_db, [_family(1), _family(2)], upsert=True)
+
+    changed = _family(1)
+    changed["title"] = "Renamed"
+    changed["documents"][0]["title"] = "Retitled"
+    changed["documents"][0]["events"][0]["title"] = "Amended"
+    report = add_families(test_db, [changed, _family(2), _family(3)], upsert=True)
+
+    assert report.tables["family"].inserted == 1
+    assert report.tables["family"].updated == 1
+    assert report.tables["family"].unchanged == 1
+    assert report.tables["physical_document"].updated == 1
+    assert report.tables["family_document"].updated == 0
+    assert report.tables["family_event"].updated == 1
+
+    test_db.expire_all()
+    assert test_db.query(Family).get("CCLW.family.1.0").title == "Renamed"
+    document = test_db.query(FamilyDocument).get("CCLW.executive.1.0")
+    assert document.physical_document.title == "Retitled"
+    assert test_db.query(FamilyEvent).get("CCLW.event.1.0.0").title == "Amended"
+    assert test_db.query(PhysicalDocument).count() == 6
+
+
+def test_add_document_upsert(test_db):
+    family = _family(1, documents=1)
+    add_families(test_db, [family], upsert=True)
+
+    document = family["documents"][0]
+    document["status"] = "Deleted"
+    report = add_document(test_db, family["import_id"], document, upsert=True)
+
+    assert report.tables["family_document"].updated == 1
+    assert report.tables["physical_document"].unchanged == 1
+    test_db.expire_all()
+    assert (
+        test_db.query(FamilyDocument).get(document["import_id"]).document_status.value
+        == "Deleted"
+    )
+
+
+def test_add_collections_upsert(test_db):
+    report = add_collections(test_db, [COLLECTION], upsert=True)
+    assert report.inserted == 2
+
+    report = add_collections(test_db, [COLLECTION], upsert=True)
+    assert report.unchanged == 2
+
+    report = add_collections(
+        test_db, [{**COLLECTION, "metadata": {"key": "other"}}], upsert=True
+    )
+    assert report.tables["collection"].updated == 1
+    assert report.tables["collection_organisation"].unchanged == 1
+    test_db.expire_all()
+    assert test_db.query(Collection).get("CPR.Collection.1.0").valid_metadata == {
+        "key": "other"
+    }
+
+
+def test_add_families_upsert_keeps_slugs_of_the_same_family(test_db):
+    add_families(test_db, [_family(1)], upsert=True)
+
+    report = add_families(test_db, [_family(1)], upsert=True)
+
+    assert report.tables["slug"].unchanged == 3
+    assert [
+        slug.name for slug in test_db.query(Family).get("CCLW.family.1.0").slugs
+    ] == ["FamSlug1"]
+
+
+def test_add_families_upsert_slug_of_another_family(test_db):
+    add_families(test_db, [_family(1)], upsert=True)
+    family = _family(2, documents=0)
+    family["slug"] = "FamSlug1"
+
+    with pytest.raises(
+        ValueError, match="'FamSlug1' already belongs to CCLW.family.1.0"
+    ):
+        add_families(test_db, [family], upsert=True)
+    test_db.rollback()
+
+    slug = test_db.query(Slug).get("FamSlug1")
+    assert slug.family_import_id == "CCLW.family.1.0"
+    assert test_db.query(Family).get("CCLW.family.2.0") is None
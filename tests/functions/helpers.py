@@ -65,3 +65,71 @@ def family_build(db, org, corpus, metadata) -> Family:
     }
     add_families(db, families=[family], org_id=org.id)
     return db.query(Family).filter(Family.import_id == family["import_id"]).one()
+
+
+def event_dict(n: int, d: int = 0, e: int = 0, **changes) -> dict:
+    """Builds an event, as taken by add_event, numbered after its document.
+
+    :param int n: The number of the family.
+    :param int d: The number of the document in the family.
+    :param int e: The number of the event in the document.
+    :return dict: The event, with the fields given in changes replaced.
+    """
+    return {
+        "import_id": f"CCLW.event.{n}.{d}.{e}",
+        "title": "Published",
+        "date": "2019-12-25",
+        "type": "Passed/Approved",
+        "status": "OK",
+        "valid_metadata": {"datetime_event_name": "Passed/Approved"},
+        **changes,
+    }
+
+
+def document_dict(n: int, d: int = 0, events=1, **changes) -> dict:
+    """Builds a document, as taken by add_document, numbered after its family.
+
+    :param int n: The number of the family.
+    :param int d: The number of the document in the family.
+    :param events: The number of events to build, or the events.
+    :return dict: The document, with the fields given in changes replaced.
+    """
+    if isinstance(events, int):
+        events = [event_dict(n, d, e) for e in range(events)]
+    return {
+        "title": f"Doc{n}.{d}",
+        "slug": f"DocSlug{n}.{d}",
+        "md5_sum": None,
+        "url": f"http://example.com/{n}/{d}",
+        "content_type": "application/pdf",
+        "import_id": f"CCLW.executive.{n}.{d}",
+        "language_variant": "Original Language",
+        "status": "Published",
+        "metadata": {"role": ["MAIN"]},
+        "languages": ["eng"],
+        "events": events,
+        **changes,
+    }
+
+
+def family_dict(n: int, documents=1, **changes) -> dict:
+    """Builds a family, as taken by add_families, numbered n.
+
+    :param int n: The number of the family.
+    :param documents: The number of documents to build, or the documents.
+    :return dict: The family, with the fields given in changes replaced.
+    """
+    if isinstance(documents, int):
+        documents = [document_dict(n, d) for d in range(documents)]
+    return {
+        "import_id": f"CCLW.family.{n}.0",
+        "corpus_import_id": "CCLW.corpus.i00000001.n0000",
+        "title": f"Fam{n}",
+        "slug": f"FamSlug{n}",
+        "description": f"Summary{n}",
+        "geography_id": 1,
+        "category": "UNFCCC",
+        "metadata": {},
+        "documents": documents,
+        **changes,
+    }
@@ -0,0 +1,67 @@
+from db_client.functions.metadata import (
+    CompiledTaxonomy,
+    MetadataErrorCode,
+    MetadataValidationError,
+    build_valid_taxonomy,
+)
+
+TAXONOMY = {
+    "animals": {
+        "allow_blanks": False,
+        "allowed_values": ["sheep", "goat"],
+    },
+    "colour": {
+        "allow_blanks": True,
+        "allowed_values": [],
+        "allow_any": True,
+    },
+}
+
+
+def test_build_valid_taxonomy_returns_compiled_taxonomy():
+    compiled = build_valid_taxonomy(TAXONOMY)
+
+    assert isinstance(compiled, CompiledTaxonomy)
+    assert compiled.taxonomy_keys == frozenset({"animals", "colour"})
+    assert list(compiled) == ["animals", "colour"]
+    assert compiled["animals"].allowed_values == ["sheep", "goat"]
+
+
+def test_compiled_taxonomy_returns_no_errors_when_valid():
+    compiled = build_valid_taxonomy(TAXONOMY)
+
+    assert compiled.validate({"animals": ["goat"], "colour": ["red"]}) == []
+
+
+def test_compiled_taxonomy_returns_structured_errors():
+    compiled = build_valid_taxonomy(TAXONOMY)
+
+    errors = compiled.validate({"animals": ["sheep", "cat", "dog"], "size": ["big"]})
+
+    assert [error.code for error in errors] == [
+        MetadataErrorCode.MISSING_KEYS,
+        MetadataErrorCode.EXTRA_KEYS,
+        MetadataErrorCode.INVALID_VALUES,
+    ]
+    assert set(errors[0].values) == {"colour"}
+    assert set(errors[1].values) == {"size"}
+    assert errors[2].key == "animals"
+    assert errors[2].values == ["cat", "dog"]
+
+
+def test_compiled_taxonomy_rejects_unhashable_values():
+    compiled = build_valid_taxonomy(TAXONOMY)
+
+    errors = compiled.validate({"animals": [["sheep"]], "colour": []})
+
+    assert len(errors) == 1
+    assert errors[0].code == MetadataErrorCode.INVALID_VALUES
+    assert errors[0].values == [["sheep"]]
+
+
+def test_validation_error_renders_message():
+    error = MetadataValidationError(
+        MetadataErrorCode.BLANK_VALUE, "animals", [], value=[]
+    )
+
+    assert str(error) == "Blank value for metadata key 'animals'"
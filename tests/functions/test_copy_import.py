@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from db_client.functions.copy_import import import_families_ndjson
+from db_client.models.dfce import (
+    Family,
+    FamilyDocument,
+    FamilyEvent,
+    FamilyGeography,
+    FamilyMetadata,
+    Slug,
+)
+from db_client.models.dfce.family import (
+    DocumentStatus,
+    EventStatus,
+    FamilyCategory,
+    FamilyCorpus,
+)
+from db_client.models.document.physical_document import PhysicalDocument
+from tests.functions.helpers import document_dict, family_dict
+
+
+def _family(n, languages=("eng",)):
+    # Tabs and new lines must survive the COPY format.
+    return family_dict(
+        n,
+        documents=[
+            document_dict(n, url=None, language_variant=None, languages=list(languages))
+        ],
+        title=f"Fam\t{n}",
+        description=f"Summary\\n {n}\nwith a new line",
+        geography_id=[2, 5],
+        category="Executive",
+        metadata={"size": ["small"]},
+    )
+
+
+def test_import_families_ndjson(test_db):
+    lines = [json.dumps(_family(n, languages=("eng", "fr"))) + "\n" for n in range(3)]
+
+    counts = import_families_ndjson(test_db, lines + ["\n"], chunk_size=2)
+
+    assert counts == {
+        "family": 3,
+        "family_metadata": 3,
+        "family_corpus": 3,
+        "family_geography": 6,
+        "physical_document": 3,
+        "family_document": 3,
+        "physical_document_language": 6,
+        "slug": 6,
+        "family_event": 3,
+    }
+    family = test_db.query(Family).get("CCLW.family.1.0")
+    assert family.title == "Fam\t1"
+    assert family.description == "Summary\\n 1\nwith a new line"
+    assert family.family_category == FamilyCategory.EXECUTIVE
+    assert test_db.query(FamilyMetadata).get("CCLW.family.1.0").value == {
+        "size": ["small"]
+    }
+    assert test_db.query(FamilyCorpus).count() == 3
+    assert test_db.query(FamilyGeography).count() == 6
+    assert test_db.query(Slug).count() == 6
+
+    document = test_db.query(FamilyDocument).get("CCLW.executive.1.0")
+    assert document.document_status == DocumentStatus.PUBLISHED
+    assert document.physical_document.source_url is None
+    assert sorted(
+        lang.language_code for lang in document.physical_document.languages
+    ) == ["eng", "fra"]
+
+    event = test_db.query(FamilyEvent).get("CCLW.event.1.0.0")
+    assert event.status == EventStatus.OK
+    assert event.valid_metadata == {
+        "event_type": ["Passed/Approved"],
+        "datetime_event_name": ["Passed/Approved"],
+    }
+
+
+def test_import_families_ndjson_allocates_from_the_sequence(test_db):
+    import_families_ndjson(test_db, [json.dumps(_family(1))])
+    physical_document = PhysicalDocument(title="After")
+    test_db.add(physical_document)
+    test_db.commit()
+
+    assert test_db.query(PhysicalDocument).count() == 2
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "{not json",
+        json.dumps(_family(1, languages=("xx1",))),
+        json.dumps({**_family(1), "category": "Unknown"}),
+    ],
+)
+def test_import_families_ndjson_rejects_bad_records(test_db, line):
+    with pytest.raises(ValueError):
+        import_families_ndjson(test_db, [line])
+    test_db.rollback()
+
+    assert test_db.query(Family).count() == 0
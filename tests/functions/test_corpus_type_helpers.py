@@ -0,0 +1,209 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from db_client.functions import metadata as metadata_module
+from db_client.functions.corpus_type_helpers import (
+    create_corpus_type,
+    normalise_taxonomy,
+    update_corpus_type_taxonomy,
+)
+from db_client.functions.metadata import invalidate_taxonomy_cache, validate_metadata
+from db_client.functions.taxonomy_cache import taxonomy_digest
+from db_client.models.organisation import CorpusType
+
+CCLW_CORPUS = "CCLW.corpus.i00000001.n0000"
+
+TAXONOMY = {
+    "animals": {
+        "allow_blanks": False,
+        "allowed_values": ["sheep", "goat"],
+    },
+    "_event": {
+        "event_type": {
+            "allow_blanks": False,
+            "allowed_values": ["Passed/Approved", "Other"],
+        },
+        "datetime_event_name": {
+            "allow_blanks": False,
+            "allowed_values": ["Passed/Approved"],
+        },
+    },
+}
+
+
+def _hash(test_db, name):
+    return test_db.execute(
+        text("SELECT valid_metadata_hash FROM corpus_type WHERE name = :name"),
+        {"name": name},
+    ).scalar()
+
+
+def _cclw_corpus_type_name(test_db):
+    return test_db.execute(
+        text("SELECT corpus_type_name FROM corpus WHERE import_id = :id"),
+        {"id": CCLW_CORPUS},
+    ).scalar()
+
+
+def test_normalise_taxonomy_fills_in_defaults():
+    normalised = normalise_taxonomy(TAXONOMY)
+
+    assert normalised == {
+        "animals": {
+            "allow_any": False,
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat"],
+        },
+        "_event": {
+            "event_type": {
+                "allow_any": False,
+                "allow_blanks": False,
+                "allowed_values": ["Passed/Approved", "Other"],
+            },
+            "datetime_event_name": {
+                "allow_any": False,
+                "allow_blanks": False,
+                "allowed_values": ["Passed/Approved"],
+            },
+        },
+    }
+    assert normalise_taxonomy(normalised) == normalised
+
+
+@pytest.mark.parametrize(
+    "taxonomy",
+    [
+        [],
+        {"animals": ["sheep"]},
+        {"animals": {"allow_blanks": False}},
+        {"animals": {"allow_blanks": False, "allowed_values": [], "extra": 1}},
+        {"_document": "role"},
+        {
+            "_event": {
+                "event_type": {"allow_blanks": False, "allowed_values": ["Other"]},
+                "datetime_event_name": {
+                    "allow_blanks": False,
+                    "allowed_values": ["Passed/Approved"],
+                },
+            }
+        },
+        {
+            "_event": {
+                "datetime_event_name": {
+                    "allow_blanks": False,
+                    "allowed_values": ["Passed/Approved"],
+                },
+            }
+        },
+    ],
+)
+def test_normalise_taxonomy_rejects_bad_taxonomy(taxonomy):
+    with pytest.raises((TypeError, ValueError)):
+        normalise_taxonomy(taxonomy)
+
+
+def test_create_corpus_type_stores_hash(test_db):
+    corpus_type = create_corpus_type(test_db, "Animals", "Animals", TAXONOMY)
+    test_db.commit()
+
+    assert corpus_type.valid_metadata == normalise_taxonomy(TAXONOMY)
+    assert _hash(test_db, "Animals") == taxonomy_digest(corpus_type.valid_metadata)
+
+
+def test_create_corpus_type_rejects_bad_taxonomy(test_db):
+    with pytest.raises(TypeError):
+        create_corpus_type(test_db, "Animals", "Animals", {"animals": ["sheep"]})
+
+    assert test_db.query(CorpusType).filter_by(name="Animals").count() == 0
+
+
+def test_update_corpus_type_taxonomy(test_db):
+    create_corpus_type(test_db, "Animals", "Animals", TAXONOMY)
+    test_db.commit()
+
+    new_taxonomy = {**TAXONOMY, "colour": {"allow_blanks": True, "allowed_values": []}}
+    corpus_type = update_corpus_type_taxonomy(test_db, "Animals", new_taxonomy)
+    test_db.commit()
+
+    assert "colour" in corpus_type.valid_metadata
+    assert _hash(test_db, "Animals") == taxonomy_digest(
+        normalise_taxonomy(new_taxonomy)
+    )
+
+
+def test_update_corpus_type_taxonomy_when_missing(test_db):
+    with pytest.raises(ValueError):
+        update_corpus_type_taxonomy(test_db, "Animals", TAXONOMY)
+
+
+def test_migration_backfills_hash(test_db):
+    name = _cclw_corpus_type_name(test_db)
+    corpus_type = test_db.query(CorpusType).filter_by(name=name).one()
+
+    assert corpus_type.valid_metadata_hash == taxonomy_digest(
+        corpus_type.valid_metadata
+    )
+
+
+def test_hash_is_cleared_when_taxonomy_changed_directly(test_db):
+    create_corpus_type(test_db, "Animals", "Animals", TAXONOMY)
+    test_db.commit()
+
+    test_db.execute(
+        text(
+            "UPDATE corpus_type SET valid_metadata = '{}'::jsonb "
+            "WHERE name = 'Animals'"
+        )
+    )
+    test_db.commit()
+
+    assert _hash(test_db, "Animals") is None
+
+
+def test_validate_metadata_skips_taxonomy_checks_when_hashed(test_db, mocker):
+    invalidate_taxonomy_cache()
+    spy = mocker.spy(metadata_module, "_validate_taxonomy")
+
+    validate_metadata(test_db, CCLW_CORPUS, {}, "_event")
+    assert spy.call_count == 0
+
+    # Changing the taxonomy directly clears the hash, so it is checked.
+    test_db.execute(
+        text(
+            "UPDATE corpus_type "
+            "SET valid_metadata = jsonb_set(valid_metadata, '{x}', '{}'::jsonb) "
+            "WHERE name = :name"
+        ),
+        {"name": _cclw_corpus_type_name(test_db)},
+    )
+    test_db.commit()
+    invalidate_taxonomy_cache()
+
+    validate_metadata(test_db, CCLW_CORPUS, {}, "_event")
+    assert spy.call_count > 0
+    invalidate_taxonomy_cache()
+
+
+def test_validate_metadata_only_fetches_the_hash_when_cached(test_db):
+    invalidate_taxonomy_cache()
+    validate_metadata(test_db, CCLW_CORPUS, {}, "_event")
+
+    engine = test_db.get_bind()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        validate_metadata(test_db, CCLW_CORPUS, {}, "_event")
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", record)
+        invalidate_taxonomy_cache()
+
+    assert len(statements) == 1
+    assert statements[0].split("FROM")[0].split() == [
+        "SELECT",
+        "corpus_type.valid_metadata_hash",
+    ]
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from db_client.models.dfce.family import (
+    EventStatus,
+    Family,
+    FamilyCategory,
+    FamilyEvent,
+)
+
+NOW = datetime.now(tz=timezone.utc).replace(microsecond=0)
+
+
+def _event(n, days, event_type, datetime_event_name="Passed/Approved"):
+    valid_metadata = (
+        None
+        if datetime_event_name is None
+        else {"event_type": [event_type], "datetime_event_name": datetime_event_name}
+    )
+    return {
+        "import_id": f"event_{n}",
+        "date": NOW + timedelta(days=days),
+        "event_type_name": event_type,
+        "valid_metadata": valid_metadata,
+    }
+
+
+# Each family's events as (days from now, event type, datetime_event_name).
+FAMILIES = {
+    "no_events": [],
+    "matching": [
+        (-300, "Amended", ["Passed/Approved"]),
+        (-200, "Passed/Approved", ["Passed/Approved"]),
+    ],
+    "no_match": [
+        (-100, "Amended", ["Passed/Approved"]),
+        (-300, "Updated", ["Passed/Approved"]),
+    ],
+    "malformed_first": [
+        (-300, "Amended", "Passed/Approved"),
+        (-200, "Passed/Approved", ["Passed/Approved"]),
+    ],
+    "match_before_malformed": [
+        (-300, "Passed/Approved", ["Passed/Approved"]),
+        (-200, "Amended", None),
+    ],
+    "future": [
+        (-300, "Amended", ["Passed/Approved"]),
+        (100, "Passed/Approved", ["Passed/Approved"]),
+    ],
+    "only_future": [(100, "Amended", ["Passed/Approved"])],
+}
+
+
+@pytest.fixture
+def families(test_db):
+    n = 0
+    for import_id, events in FAMILIES.items():
+        test_db.add(
+            Family(
+                import_id=import_id,
+                title=import_id,
+                description="",
+                family_category=FamilyCategory.EXECUTIVE,
+            )
+        )
+        test_db.flush()
+        for days, event_type, datetime_event_name in events:
+            n += 1
+            test_db.add(
+                FamilyEvent(
+                    title="Event",
+                    family_import_id=import_id,
+                    status=EventStatus.OK,
+                    **_event(n, days, event_type, datetime_event_name),
+                )
+            )
+    test_db.commit()
+    test_db.expunge_all()
+    return test_db
+
+
+def test_date_expressions_match_the_python_properties(families):
+    rows = families.query(
+        Family.import_id, Family.published_date, Family.last_updated_date
+    ).all()
+
+    assert len(rows) == len(FAMILIES)
+    for import_id, published_date, last_updated_date in rows:
+        family = families.query(Family).get(import_id)
+        assert (import_id, published_date) == (import_id, family.published_date)
+        assert (import_id, last_updated_date) == (import_id, family.last_updated_date)
+
+
+def test_order_by_published_date(families):
+    import_ids = [
+        import_id
+        for (import_id,) in families.query(Family.import_id)
+        .filter(Family.published_date.isnot(None))
+        .order_by(Family.published_date.desc(), Family.import_id)
+        .limit(3)
+    ]
+
+    assert import_ids == ["future", "only_future", "matching"]
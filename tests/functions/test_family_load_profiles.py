@@ -0,0 +1,115 @@
+import pytest
+import sqlalchemy as sa
+
+from db_client.functions.dfce_helpers import add_families_bulk
+from db_client.functions.family_load_profiles import (
+    FamilyLoadProfile,
+    family_load_options,
+)
+from db_client.models.dfce import Family
+from tests.functions.helpers import document_dict, event_dict, family_dict
+
+
+def _family(n):
+    documents = [
+        document_dict(
+            n,
+            d,
+            events=[event_dict(n, d, e, date=f"2019-12-{e + 1:02}") for e in range(3)],
+            languages=["eng", "fra"],
+        )
+        for d in range(2)
+    ]
+    return family_dict(n, documents=documents, geography_id=[1, 2])
+
+
+@pytest.fixture
+def families(test_db):
+    add_families_bulk(test_db, [_family(n) for n in range(5)])
+    test_db.expunge_all()
+    return test_db
+
+
+def _load(db, profile):
+    """Loads the families, returning them and the number of queries."""
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa.event.listen(engine, "before_cursor_execute", count)
+    try:
+        families = (
+            db.query(Family)
+            .options(*family_load_options(profile))
+            .order_by(Family.import_id)
+            .all()
+        )
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", count)
+    return families, len(statements)
+
+
+def test_summary_profile(families):
+    loaded, queries = _load(families, FamilyLoadProfile.SUMMARY)
+
+    # Family, slugs, geographies and documents.
+    assert queries == 4
+    assert len(loaded) == 5
+    family = loaded[0]
+    assert family.slugs[0].name == "FamSlug0"
+    assert [g.id for g in family.geographies]
+    assert family.family_status == "Published"
+    with pytest.raises(sa.exc.InvalidRequestError):
+        _ = family.events
+    with pytest.raises(sa.exc.InvalidRequestError):
+        _ = family.family_documents[0].physical_document
+
+
+@pytest.mark.parametrize(
+    "profile", [FamilyLoadProfile.DETAIL, FamilyLoadProfile.EXPORT, "export"]
+)
+def test_full_profiles(families, profile):
+    loaded, queries = _load(families, profile)
+
+    # A fixed number of queries however many families there are.
+    assert queries == 7
+    family = loaded[0]
+    assert len(family.events) == 6
+    document = family.family_documents[0]
+    assert document.slugs[0].name.startswith("DocSlug0")
+    assert sorted(
+        lang.language_code for lang in document.physical_document.languages
+    ) == [
+        "eng",
+        "fra",
+    ]
+    assert family.published_date is not None
+
+
+def test_export_profile_needs_no_further_queries(families):
+    loaded, _ = _load(families, FamilyLoadProfile.EXPORT)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = families.get_bind()
+    sa.event.listen(engine, "before_cursor_execute", count)
+    try:
+        for family in loaded:
+            for document in family.family_documents:
+                _ = [slug.name for slug in document.slugs]
+                _ = [lang.name for lang in document.physical_document.languages]
+            _ = [event.title for event in family.events]
+            _ = [geography.slug for geography in family.geographies]
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", count)
+
+    assert statements == []
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        family_load_options("everything")
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+
+from db_client.functions.dfce_helpers import add_families_bulk
+from db_client.functions.family_status_dates import refresh_family_status_dates
+from db_client.models.dfce import Family, FamilyDocument, FamilyEvent
+from db_client.models.dfce.family import DocumentStatus, FamilyStatus
+from tests.functions.helpers import document_dict, event_dict, family_dict
+
+FAMILY_ID = "CCLW.family.1.0"
+
+
+def _family(n, documents):
+    return family_dict(
+        n,
+        documents=[
+            document_dict(
+                n,
+                d,
+                events=[event_dict(n, d, date=f"2019-12-{d + 1:02}")],
+                status="Created",
+            )
+            for d in range(documents)
+        ],
+    )
+
+
+@pytest.fixture
+def families(test_db):
+    add_families_bulk(test_db, [_family(1, 2), _family(2, 0)])
+    test_db.expunge_all()
+    return test_db
+
+
+def _stored(db, import_id=FAMILY_ID):
+    """The stored status and dates, and the last_modified, of a family."""
+    return db.execute(
+        sa.select(
+            Family.stored_family_status,
+            Family.stored_published_date,
+            Family.stored_last_updated_date,
+            Family.last_modified,
+        ).where(Family.import_id == import_id)
+    ).one()
+
+
+def _next_event_date(db, import_id=FAMILY_ID):
+    return db.execute(
+        sa.select(Family.next_event_date).where(Family.import_id == import_id)
+    ).scalar_one()
+
+
+def _overwrite(db, values, import_id=None):
+    """Writes stored values directly, as the ORM would set last_modified."""
+    where = "" if import_id is None else "WHERE import_id = :import_id"
+    db.execute(
+        sa.text(
+            "UPDATE family SET "
+            + ", ".join(f"{column} = :{column}" for column in values)
+            + f" {where}"
+        ),
+        {**values, "import_id": import_id},
+    )
+
+
+def _set_document_status(db, import_id, status):
+    db.query(FamilyDocument).filter(FamilyDocument.import_id == import_id).update(
+        {FamilyDocument.document_status: status}
+    )
+
+
+def test_inserts_store_the_status_and_dates(families):
+    status, published_date, last_updated_date, _ = _stored(families)
+
+    assert status == FamilyStatus.CREATED
+    assert published_date == datetime(2019, 12, 1, tzinfo=timezone.utc)
+    assert last_updated_date == datetime(2019, 12, 2, tzinfo=timezone.utc)
+    assert _stored(families, "CCLW.family.2.0")[:3] == (
+        FamilyStatus.CREATED,
+        None,
+        None,
+    )
+
+
+@pytest.mark.parametrize(
+    "statuses, expected",
+    [
+        ((DocumentStatus.PUBLISHED, DocumentStatus.DELETED), FamilyStatus.PUBLISHED),
+        ((DocumentStatus.CREATED, DocumentStatus.DELETED), FamilyStatus.CREATED),
+        ((DocumentStatus.DELETED, DocumentStatus.DELETED), FamilyStatus.DELETED),
+    ],
+)
+def test_document_changes_update_the_status(families, statuses, expected):
+    for d, status in enumerate(statuses):
+        _set_document_status(families, f"CCLW.executive.1.{d}", status)
+    families.flush()
+
+    assert _stored(families)[0] == expected
+    assert families.query(Family).get(FAMILY_ID).family_status == expected
+    assert (FAMILY_ID,) in families.query(Family.import_id).filter(
+        Family.family_status == expected
+    )
+
+
+def test_event_changes_update_the_dates(families):
+    future = datetime.now(tz=timezone.utc).replace(microsecond=0) + timedelta(days=100)
+    families.query(FamilyEvent).filter(
+        FamilyEvent.import_id == "CCLW.event.1.1.0"
+    ).update({FamilyEvent.date: future})
+    families.flush()
+
+    _, published_date, last_updated_date, _ = _stored(families)
+    assert published_date == datetime(2019, 12, 1, tzinfo=timezone.utc)
+    assert last_updated_date == datetime(2019, 12, 1, tzinfo=timezone.utc)
+    assert _next_event_date(families) == future
+
+    families.query(FamilyEvent).filter(
+        FamilyEvent.import_id == "CCLW.event.1.0.0"
+    ).update({FamilyEvent.date: future + timedelta(days=1)})
+    families.flush()
+
+    assert _stored(families)[1:3] == (future, None)
+
+
+def test_refresh_recomputes_the_stored_values(families):
+    before = _stored(families)
+    _overwrite(
+        families,
+        {"family_status": "DELETED", "published_date": None, "last_updated_date": None},
+    )
+
+    # Neither the stale values nor their refresh are modifications.
+    assert _stored(families)[3] == before[3]
+    assert refresh_family_status_dates(families) == 2
+    assert _stored(families) == before
+    assert refresh_family_status_dates(families) == 0
+
+
+def test_refresh_given_families(families):
+    _overwrite(families, {"family_status": "DELETED"})
+
+    assert refresh_family_status_dates(families, ["CCLW.family.2.0"]) == 1
+    assert _stored(families)[0] == FamilyStatus.DELETED
+    assert _stored(families, "CCLW.family.2.0")[0] == (FamilyStatus.CREATED)
+
+
+def test_refresh_stale_only(families):
+    _overwrite(
+        families,
+        {
+            "family_status": "DELETED",
+            "last_updated_date": datetime(2019, 12, 1, tzinfo=timezone.utc),
+        },
+    )
+    # As stored when the latest event was still in the future.
+    _overwrite(
+        families,
+        {"next_event_date": datetime(2019, 12, 2, tzinfo=timezone.utc)},
+        FAMILY_ID,
+    )
+
+    # The family without events has nothing that can become stale.
+    assert refresh_family_status_dates(families, stale_only=True) == 1
+    assert _stored(families)[::2] == (
+        FamilyStatus.CREATED,
+        datetime(2019, 12, 2, tzinfo=timezone.utc),
+    )
+    assert _stored(families, "CCLW.family.2.0")[0] == (FamilyStatus.DELETED)
+    assert refresh_family_status_dates(families, [FAMILY_ID], stale_only=True) == 0
+
+
+def test_last_updated_date_once_the_next_event_has_passed(families):
+    passed = datetime(2019, 12, 2, tzinfo=timezone.utc)
+    # As stored when the latest event was still in the future.
+    _overwrite(
+        families,
+        {
+            "last_updated_date": datetime(2019, 12, 1, tzinfo=timezone.utc),
+            "next_event_date": passed,
+        },
+        FAMILY_ID,
+    )
+
+    assert _stored(families)[2] != passed
+    assert families.query(Family).get(FAMILY_ID).last_updated_date == passed
+    assert (
+        families.query(Family.last_updated_date)
+        .filter(Family.import_id == FAMILY_ID)
+        .scalar()
+        == passed
+    )
+    assert (FAMILY_ID,) in families.query(Family.import_id).filter(
+        Family.last_updated_date == passed
+    )
+
+    assert refresh_family_status_dates(families, stale_only=True) == 1
+    assert _stored(families)[2] == passed
+    assert _next_event_date(families) is None
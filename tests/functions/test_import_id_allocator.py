@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from db_client.functions.import_id_allocator import ImportIdAllocator
+from db_client.models.organisation.counters import CountedEntity, EntityCounter
+
+
+def _counter(test_db) -> int:
+    test_db.expire_all()
+    return (
+        test_db.query(EntityCounter.counter)
+        .filter(EntityCounter.prefix == "CCLW")
+        .scalar()
+    )
+
+
+def test_allocator_reserves_ahead(test_db):
+    with ImportIdAllocator(
+        test_db.get_bind(), block_size=10, low_water_mark=2
+    ) as allocator:
+        assert allocator.acquire("CCLW", CountedEntity.Family) == (
+            "CCLW.family.i00000001.n0000"
+        )
+        assert _counter(test_db) == 10
+
+        import_ids = allocator.acquire_many("CCLW", CountedEntity.Document, 8)
+        assert import_ids[-1] == "CCLW.document.i00000009.n0000"
+
+    # Below the low-water mark the next block was reserved in the background.
+    assert _counter(test_db) == 20
+
+
+def test_allocator_acquire_many_larger_than_a_block(test_db):
+    with ImportIdAllocator(test_db.get_bind(), block_size=5) as allocator:
+        import_ids = allocator.acquire_many("CCLW", CountedEntity.Event, 12)
+
+    assert len(set(import_ids)) == 12
+    assert import_ids[0] == "CCLW.event.i00000001.n0000"
+
+
+def test_allocator_is_thread_safe(test_db):
+    with ImportIdAllocator(
+        test_db.get_bind(), block_size=16, low_water_mark=4
+    ) as allocator:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            import_ids = list(
+                executor.map(
+                    lambda _: allocator.acquire("CCLW", CountedEntity.Family),
+                    range(200),
+                )
+            )
+
+    assert len(set(import_ids)) == 200
+    assert _counter(test_db) >= 200
+
+
+def test_allocator_acquire_async(test_db):
+    async def acquire_all(allocator):
+        return await asyncio.gather(
+            *(allocator.acquire_async("CCLW", CountedEntity.Family) for _ in range(30))
+        )
+
+    with ImportIdAllocator(test_db.get_bind(), block_size=8) as allocator:
+        import_ids = asyncio.run(acquire_all(allocator))
+
+    assert len(set(import_ids)) == 30
+
+
+def test_allocator_unknown_prefix(test_db):
+    with ImportIdAllocator(test_db.get_bind()) as allocator:
+        with pytest.raises(ValueError):
+            allocator.acquire("NOPE", CountedEntity.Family)
@@ -0,0 +1,162 @@
+from copy import deepcopy
+
+import pytest
+
+from db_client.functions.dfce_helpers import add_families
+from db_client.functions.import_validation import validate_import
+from db_client.models.dfce import Family
+from db_client.models.organisation import Corpus, CorpusType
+from tests.functions.helpers import document_dict, event_dict, family_dict
+
+UNFCCC_CORPUS = "UNFCCC.corpus.i00000001.n0000"
+
+
+def _family(n, **changes):
+    document = document_dict(
+        n,
+        events=[event_dict(n, import_id=f"UNFCCC.event.{n}.0")],
+        import_id=f"UNFCCC.document.{n}.0",
+        metadata={"role": ["MAIN"], "type": ["Law"]},
+    )
+    return family_dict(
+        n,
+        documents=[document],
+        **{
+            "import_id": f"UNFCCC.family.{n}.0",
+            "corpus_import_id": UNFCCC_CORPUS,
+            "geography_id": [1, 2],
+            "metadata": {"author": ["Someone"], "author_type": ["Party"]},
+            **changes,
+        },
+    )
+
+
+def _errors(report):
+    return sorted((e.entity, e.import_id, e.field) for e in report.errors)
+
+
+def test_validate_import_valid(test_db):
+    report = validate_import(test_db, [_family(1), _family(2)])
+
+    assert report.valid
+    assert (report.families, report.documents, report.events) == (2, 2, 2)
+    assert test_db.query(Family).count() == 0
+
+
+def test_validate_import_reports_all_errors(test_db):
+    bad_family = _family(
+        1,
+        geography_id=[1, 999999],
+        category="Novel",
+        metadata={"author": ["Someone"], "author_type": ["Alien"]},
+    )
+    document = bad_family["documents"][0]
+    document.update(
+        language_variant="Remix", languages=["eng", "xx1"], metadata={"role": ["X"]}
+    )
+    document["events"][0].update(type="Invented", status="Unknown")
+    bad_corpus = _family(2, corpus_import_id="NOPE.corpus.i00000001.n0000")
+    missing = _family(3)
+    del missing["title"]
+
+    report = validate_import(test_db, [bad_family, bad_corpus, missing])
+
+    assert not report.valid
+    assert _errors(report) == [
+        ("document", "UNFCCC.document.1.0", "language_variant"),
+        ("document", "UNFCCC.document.1.0", "languages"),
+        ("document", "UNFCCC.document.1.0", "metadata"),
+        ("document", "UNFCCC.document.1.0", "metadata"),
+        ("event", "UNFCCC.event.1.0", "status"),
+        ("event", "UNFCCC.event.1.0", "valid_metadata"),
+        ("family", "UNFCCC.family.1.0", "category"),
+        ("family", "UNFCCC.family.1.0", "geography_id"),
+        ("family", "UNFCCC.family.1.0", "metadata"),
+        ("family", "UNFCCC.family.2.0", "corpus_import_id"),
+        ("family", "UNFCCC.family.3.0", "title"),
+    ]
+
+
+def test_validate_import_duplicates(test_db):
+    add_families(test_db, [_family(1)])
+
+    duplicate = _family(2, slug="FamSlug1")
+    twice = _family(3)
+
+    report = validate_import(test_db, [_family(1), duplicate, twice, twice])
+
+    assert ("family", "UNFCCC.family.1.0", "import_id") in _errors(report)
+    assert ("family", "UNFCCC.family.2.0", "slug") in _errors(report)
+    assert ("family", "UNFCCC.family.3.0", "import_id") in _errors(report)
+    assert ("slug", "FamSlug3", "slug") in _errors(report)
+
+
+def test_validate_import_upsert_allows_existing(test_db):
+    add_families(test_db, [_family(1)])
+
+    assert validate_import(test_db, [_family(1)], upsert=True).valid
+
+    # But not taking the slug of another family.
+    report = validate_import(test_db, [_family(2, slug="FamSlug1")], upsert=True)
+    assert _errors(report) == [("family", "UNFCCC.family.2.0", "slug")]
+
+
+def _too_many_values(taxonomy):
+    taxonomy["datetime_event_name"]["allowed_values"].append("Amended")
+
+
+def _no_values(taxonomy):
+    taxonomy["datetime_event_name"]["allowed_values"] = []
+
+
+def _no_event_type(taxonomy):
+    del taxonomy["event_type"]
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (_too_many_values, "Too many values"),
+        (_no_values, "Incomplete, missing"),
+        (_no_event_type, "Incomplete, missing 'event_type'"),
+    ],
+)
+def test_validate_import_reports_a_bad_event_taxonomy(test_db, change, message):
+    corpus = test_db.query(Corpus).get(UNFCCC_CORPUS)
+    corpus_type = test_db.query(CorpusType).get(corpus.corpus_type_name)
+    taxonomy = deepcopy(corpus_type.valid_metadata)
+    change(taxonomy["_event"])
+    corpus_type.valid_metadata = taxonomy
+    test_db.flush()
+
+    report = validate_import(test_db, [_family(1)])
+
+    assert _errors(report) == [("event", "UNFCCC.event.1.0", "valid_metadata")]
+    assert message in report.errors[0].message
+
+
+def test_validate_import_reports_missing_fields_that_import_needs(test_db):
+    no_geography = _family(1)
+    del no_geography["geography_id"]
+    no_documents = _family(2)
+    del no_documents["documents"]
+    no_md5_sum = _family(3)
+    del no_md5_sum["documents"][0]["md5_sum"]
+
+    report = validate_import(test_db, [no_geography, no_documents, no_md5_sum])
+
+    assert _errors(report) == [
+        ("document", "UNFCCC.document.3.0", "md5_sum"),
+        ("family", "UNFCCC.family.1.0", "geography_id"),
+        ("family", "UNFCCC.family.2.0", "documents"),
+    ]
+
+
+def test_validate_import_reports_event_metadata_that_is_not_a_dict(test_db):
+    family = _family(1)
+    family["documents"][0]["events"][0]["valid_metadata"] = ["Passed/Approved"]
+
+    report = validate_import(test_db, [family])
+
+    assert _errors(report) == [("event", "UNFCCC.event.1.0", "valid_metadata")]
+    assert report.errors[0].message == "expected a dictionary"
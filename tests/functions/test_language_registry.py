@@ -0,0 +1,54 @@
+import pytest
+
+from db_client.functions.language_registry import LanguageRecord, LanguageRegistry
+from db_client.models.document.physical_document import Language
+
+LANGUAGES = [
+    LanguageRecord(1, "eng", "en", "eng", "English"),
+    LanguageRecord(2, "fra", "fr", "fre", "French"),
+    LanguageRecord(3, "zxx", None, None, None),
+]
+
+
+@pytest.fixture
+def registry():
+    return LanguageRegistry(LANGUAGES)
+
+
+@pytest.mark.parametrize(
+    "value, expected_id",
+    [
+        ("eng", 1),
+        ("en", 1),
+        ("English", 1),
+        ("ENGLISH ", 1),
+        ("fre", 2),
+        ("FR", 2),
+        ("zxx", 3),
+    ],
+)
+def test_registry_resolves_codes_and_names(registry, value, expected_id):
+    assert registry.language_id(value) == expected_id
+    assert value in registry
+
+
+@pytest.mark.parametrize("value", ["xx", "", "  ", "German"])
+def test_registry_unknown_language(registry, value):
+    assert registry.get(value) is None
+    assert value not in registry
+    with pytest.raises(ValueError):
+        registry.language_id(value)
+
+
+def test_registry_get_by_code_only_uses_language_code(registry):
+    assert registry.get_by_code("eng") == LANGUAGES[0]
+    assert registry.get_by_code("en") is None
+
+
+def test_registry_load(test_db):
+    registry = LanguageRegistry.load(test_db)
+
+    assert len(registry) == test_db.query(Language).count()
+    english = test_db.query(Language).filter(Language.language_code == "eng").one()
+    assert registry.language_id("en") == english.id
+    assert registry.language_id("english") == english.id
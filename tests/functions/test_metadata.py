@@ -2,9 +2,12 @@ import pytest
 from pydantic import ValidationError
 from pytest_mock_resources import create_postgres_fixture
 
+from db_client.functions import metadata as metadata_module
 from db_client.functions.metadata import (
+    invalidate_taxonomy_cache,
     validate_metadata,
     validate_metadata_against_taxonomy,
+    validate_metadata_many,
 )
 from db_client.models.base import Base
 from tests.functions.helpers import family_build, metadata_build
@@ -289,3 +292,99 @@ def test_validation_succeeds_when_metadata_matches_taxonomy(db):
     setup_test(db, taxonomy, metadata)
 
     validate_metadata(db, "Org1.Corpus.1.1", metadata)
+
+
+def test_validation_reuses_compiled_taxonomy(db, mocker):
+    taxonomy = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat"],
+        },
+    }
+    metadata = {"animals": ["sheep"]}
+    setup_test(db, taxonomy, metadata)
+    invalidate_taxonomy_cache()
+    spy = mocker.spy(metadata_module, "build_valid_taxonomy")
+
+    assert validate_metadata(db, "Org1.Corpus.1.1", metadata) is None
+    assert validate_metadata(db, "Org1.Corpus.1.1", {"animals": ["cat"]}) == [
+        "Invalid value '['cat']' for metadata key 'animals'"
+    ]
+    assert spy.call_count == 1
+
+    assert invalidate_taxonomy_cache("Org1.Corpus.1.1") == 1
+    assert validate_metadata(db, "Org1.Corpus.1.1", metadata) is None
+    assert spy.call_count == 2
+
+
+def test_validation_rebuilds_when_taxonomy_changes(db):
+    taxonomy = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat"],
+        },
+    }
+    metadata = {"animals": ["cat"]}
+    _, _, corpus_type = metadata_build(db, taxonomy)
+
+    assert validate_metadata(db, "Org1.Corpus.1.1", metadata) is not None
+
+    corpus_type.valid_metadata = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat", "cat"],
+        },
+    }
+    db.commit()
+
+    assert validate_metadata(db, "Org1.Corpus.1.1", metadata) is None
+
+
+def test_validate_metadata_many_returns_errors_per_item(db):
+    taxonomy = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat"],
+        },
+        "_document": {
+            "role": {
+                "allow_blanks": False,
+                "allowed_values": ["MAIN"],
+            },
+        },
+    }
+    metadata = {"animals": ["sheep"]}
+    setup_test(db, taxonomy, metadata)
+
+    results = validate_metadata_many(
+        db,
+        [
+            ("Org1.Corpus.1.1", {"animals": ["sheep"]}, None),
+            ("Org1.Corpus.1.1", {"animals": ["cat"]}, None),
+            ("Org1.Corpus.1.1", {"role": ["MAIN"]}, "_document"),
+            ("Org1.Corpus.1.1", {"role": []}, "_document"),
+        ],
+    )
+
+    assert results == [
+        None,
+        ["Invalid value '['cat']' for metadata key 'animals'"],
+        None,
+        ["Blank value for metadata key 'role'"],
+    ]
+
+
+def test_validate_metadata_many_raises_when_corpus_missing(db):
+    taxonomy = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat"],
+        },
+    }
+    metadata = {"animals": ["sheep"]}
+    setup_test(db, taxonomy, metadata)
+
+    with pytest.raises(TypeError) as e:
+        validate_metadata_many(db, [("Org1.Corpus.9.9", metadata, None)])
+
+    assert str(e.value) == "No taxonomy found for corpus"
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from db_client.functions.corpus_helpers import (
+    _TAXONOMY_AND_HASH_FROM_CORPUS,
+    _TAXONOMY_BY_CORPUS_TYPE_NAME,
+    _TAXONOMY_FROM_CORPUS,
+    _TAXONOMY_HASH_FROM_CORPUS,
+    get_taxonomy_by_corpus_type_name_async,
+    get_taxonomy_from_corpus_async,
+)
+from db_client.functions.metadata import (
+    invalidate_taxonomy_cache,
+    validate_metadata_async,
+)
+
+TAXONOMY = {
+    "animals": {
+        "allow_blanks": False,
+        "allowed_values": ["sheep", "goat"],
+    },
+    "_document": {
+        "role": {
+            "allow_blanks": False,
+            "allowed_values": ["MAIN"],
+        },
+    },
+}
+
+
+@pytest.fixture
+def results(mocker):
+    """The result of each statement, which tests can change."""
+    results = {
+        statement: mocker.Mock()
+        for statement in (
+            _TAXONOMY_FROM_CORPUS,
+            _TAXONOMY_AND_HASH_FROM_CORPUS,
+            _TAXONOMY_HASH_FROM_CORPUS,
+            _TAXONOMY_BY_CORPUS_TYPE_NAME,
+        )
+    }
+    results[_TAXONOMY_FROM_CORPUS].scalar.return_value = TAXONOMY
+    results[_TAXONOMY_AND_HASH_FROM_CORPUS].first.return_value = (TAXONOMY, None)
+    results[_TAXONOMY_HASH_FROM_CORPUS].scalar.return_value = None
+    results[_TAXONOMY_BY_CORPUS_TYPE_NAME].scalar.return_value = TAXONOMY
+    return results
+
+
+@pytest.fixture
+def async_db(mocker, results):
+    invalidate_taxonomy_cache()
+    db = mocker.AsyncMock(spec=AsyncSession)
+    db.execute.side_effect = lambda statement, params: results[statement]
+    yield db
+    invalidate_taxonomy_cache()
+
+
+def _executed_sql(db) -> str:
+    statement, params = db.execute.await_args.args
+    return str(statement.params(params).compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_get_taxonomy_from_corpus_async(async_db):
+    taxonomy = asyncio.run(get_taxonomy_from_corpus_async(async_db, "C.1"))
+
+    assert taxonomy == TAXONOMY
+    sql = _executed_sql(async_db)
+    assert "corpus_type.valid_metadata" in sql
+    assert "corpus.import_id = 'C.1'" in sql
+
+
+def test_get_taxonomy_by_corpus_type_name_async(async_db):
+    taxonomy = asyncio.run(get_taxonomy_by_corpus_type_name_async(async_db, "Laws"))
+
+    assert taxonomy == TAXONOMY
+    assert "corpus_type.name = 'Laws'" in _executed_sql(async_db)
+
+
+def test_validate_metadata_async_when_ok(async_db):
+    result = asyncio.run(
+        validate_metadata_async(async_db, "C.1", {"animals": ["goat"]})
+    )
+
+    assert result is None
+
+
+def test_validate_metadata_async_when_invalid(async_db):
+    result = asyncio.run(
+        validate_metadata_async(async_db, "C.1", {"role": ["ANNEX"]}, "_document")
+    )
+
+    assert result == ["Invalid value '['ANNEX']' for metadata key 'role'"]
+
+
+def test_validate_metadata_async_when_hash_is_cached(async_db, results):
+    results[_TAXONOMY_HASH_FROM_CORPUS].scalar.return_value = "hash"
+    results[_TAXONOMY_AND_HASH_FROM_CORPUS].first.return_value = (TAXONOMY, "hash")
+    asyncio.run(validate_metadata_async(async_db, "C.1", {"animals": ["goat"]}))
+    async_db.execute.reset_mock()
+
+    result = asyncio.run(validate_metadata_async(async_db, "C.1", {"animals": ["cow"]}))
+
+    assert result == ["Invalid value '['cow']' for metadata key 'animals'"]
+    # Only the hash is fetched, the taxonomy is already compiled.
+    assert [call.args[0] for call in async_db.execute.await_args_list] == [
+        _TAXONOMY_HASH_FROM_CORPUS
+    ]
+
+
+def test_validate_metadata_async_when_no_taxonomy(async_db, results):
+    results[_TAXONOMY_AND_HASH_FROM_CORPUS].first.return_value = None
+
+    with pytest.raises(TypeError) as e:
+        asyncio.run(validate_metadata_async(async_db, "C.1", {}))
+
+    assert str(e.value) == "No taxonomy found for corpus"
+
+
+async def _validate_with_asyncpg(url, corpus_id, metadata):
+    engine = create_async_engine(url.set(drivername="postgresql+asyncpg"))
+    try:
+        async with AsyncSession(engine) as db:
+            taxonomy = await get_taxonomy_from_corpus_async(db, corpus_id)
+            return taxonomy, await validate_metadata_async(db, corpus_id, metadata)
+    finally:
+        await engine.dispose()
+
+
+def test_validate_metadata_async_with_asyncpg(test_db):
+    invalidate_taxonomy_cache()
+
+    taxonomy, result = asyncio.run(
+        _validate_with_asyncpg(
+            test_db.get_bind().url,
+            "UNFCCC.corpus.i00000001.n0000",
+            {"author": ["Someone"], "author_type": ["Nobody"]},
+        )
+    )
+
+    assert taxonomy["author_type"]["allowed_values"] == ["Party", "Non-Party"]
+    assert result == ["Invalid value '['Nobody']' for metadata key 'author_type'"]
@@ -0,0 +1,167 @@
+import pytest
+from pytest_mock_resources import create_postgres_fixture
+
+from db_client.functions.dfce_helpers import add_families
+from db_client.functions.metadata import MetadataErrorCode
+from db_client.functions.metadata_audit import (
+    MetadataViolation,
+    audit_corpus_metadata,
+)
+from db_client.models.base import Base
+from db_client.models.dfce.geography import Geography
+from tests.functions.helpers import (
+    document_dict,
+    event_dict,
+    family_dict,
+    metadata_build,
+)
+
+db = create_postgres_fixture(Base, session=True)
+
+TAXONOMY = {
+    "animals": {
+        "allow_blanks": False,
+        "allowed_values": ["sheep", "goat"],
+    },
+    "colour": {
+        "allow_blanks": True,
+        "allowed_values": [],
+        "allow_any": True,
+    },
+    "_document": {
+        "role": {
+            "allow_blanks": False,
+            "allowed_values": ["MAIN"],
+        },
+    },
+    "_event": {
+        "event_type": {
+            "allow_blanks": False,
+            "allowed_values": ["Passed/Approved"],
+        },
+        "datetime_event_name": {
+            "allow_blanks": False,
+            "allowed_values": ["Passed/Approved"],
+        },
+    },
+}
+
+
+def _document(import_id, metadata, event_type):
+    return document_dict(
+        0,
+        events=[event_dict(0, import_id=f"event-{import_id}", type=event_type)],
+        import_id=import_id,
+        title=import_id,
+        slug=f"slug-{import_id}",
+        metadata=metadata,
+        language_variant=None,
+        languages=[],
+    )
+
+
+def _family(import_id, corpus_import_id, metadata, documents):
+    return family_dict(
+        0,
+        documents=documents,
+        import_id=import_id,
+        corpus_import_id=corpus_import_id,
+        title=import_id,
+        slug=f"slug-{import_id}",
+        category="Executive",
+        metadata=metadata,
+    )
+
+
+@pytest.fixture
+def corpus(db):
+    _, corpus, _ = metadata_build(db, TAXONOMY)
+    db.add(Geography(id=1, display_value="nowhere", slug="s"))
+    db.commit()
+    return corpus
+
+
+def test_audit_returns_nothing_when_valid(db, corpus):
+    add_families(
+        db,
+        [
+            _family(
+                "family.1",
+                corpus.import_id,
+                {"animals": ["sheep"], "colour": []},
+                [_document("document.1", {"role": ["MAIN"]}, "Passed/Approved")],
+            )
+        ],
+    )
+
+    assert audit_corpus_metadata(db, corpus.import_id) == []
+
+
+def test_audit_reports_family_violations(db, corpus):
+    add_families(
+        db,
+        [
+            _family("family.1", corpus.import_id, {"animals": ["cat"]}, []),
+            _family(
+                "family.2",
+                corpus.import_id,
+                {"animals": [], "colour": "red", "size": ["big"]},
+                [],
+            ),
+            _family(
+                "family.3",
+                corpus.import_id,
+                {"animals": ["sheep", 1], "colour": []},
+                [],
+            ),
+        ],
+    )
+
+    assert audit_corpus_metadata(db, corpus.import_id, [None]) == [
+        MetadataViolation(
+            None, "family.1", "animals", MetadataErrorCode.INVALID_VALUES
+        ),
+        MetadataViolation(None, "family.1", "colour", MetadataErrorCode.MISSING_KEYS),
+        MetadataViolation(None, "family.2", "animals", MetadataErrorCode.BLANK_VALUE),
+        MetadataViolation(None, "family.2", "colour", MetadataErrorCode.NOT_A_LIST),
+        MetadataViolation(None, "family.2", "size", MetadataErrorCode.EXTRA_KEYS),
+        MetadataViolation(
+            None, "family.3", "animals", MetadataErrorCode.NON_STRING_VALUES
+        ),
+    ]
+
+
+def test_audit_reports_document_and_event_violations(db, corpus):
+    add_families(
+        db,
+        [
+            _family(
+                "family.1",
+                corpus.import_id,
+                {"animals": ["sheep"], "colour": []},
+                [_document("document.1", {"role": ["ANNEX"]}, "Other")],
+            )
+        ],
+    )
+
+    assert audit_corpus_metadata(db, corpus.import_id) == [
+        MetadataViolation(
+            "_document", "document.1", "role", MetadataErrorCode.INVALID_VALUES
+        ),
+        MetadataViolation(
+            "_event", "event-document.1", "event_type", MetadataErrorCode.INVALID_VALUES
+        ),
+    ]
+
+
+def test_audit_ignores_other_corpora(db, corpus):
+    family = _family("family.1", corpus.import_id, {"animals": ["cat"]}, [])
+    del family["corpus_import_id"]
+    add_families(db, [family])
+
+    assert audit_corpus_metadata(db, corpus.import_id) == []
+
+
+def test_audit_rejects_unknown_entity(db, corpus):
+    with pytest.raises(ValueError):
+        audit_corpus_metadata(db, corpus.import_id, ["_collection"])
@@ -0,0 +1,104 @@
+from sqlalchemy import text
+
+from db_client.functions.dfce_helpers import add_families
+from db_client.functions.metadata_filters import (
+    filter_documents_by_metadata,
+    filter_families_by_metadata,
+)
+from tests.functions.helpers import document_dict, family_dict
+
+
+def _family(import_id, metadata, document_metadata):
+    document = document_dict(
+        0,
+        events=0,
+        import_id=f"document-{import_id}",
+        slug=f"slug-document-{import_id}",
+        metadata=document_metadata,
+        language_variant=None,
+        languages=[],
+    )
+    return family_dict(
+        0,
+        documents=[document],
+        import_id=import_id,
+        title=import_id,
+        slug=f"slug-{import_id}",
+        category="Executive",
+        metadata=metadata,
+    )
+
+
+def _setup(test_db):
+    add_families(
+        test_db,
+        [
+            _family(
+                "family.1",
+                {"sector": ["Energy", "Water"], "topic": ["Mitigation"]},
+                {"role": ["MAIN"]},
+            ),
+            _family(
+                "family.2",
+                {"sector": ["Transport"], "topic": ["Adaptation"]},
+                {"role": ["ANNEX"]},
+            ),
+            _family(
+                "family.3",
+                {"sector": ["Energy"], "topic": ["Adaptation"]},
+                {"role": ["MAIN"]},
+            ),
+        ],
+    )
+
+
+def _import_ids(query, column):
+    return sorted(getattr(row, column) for row in query.all())
+
+
+def test_filter_families_by_single_value(test_db):
+    _setup(test_db)
+
+    query = filter_families_by_metadata(test_db, {"sector": ["Energy"]})
+
+    assert _import_ids(query, "import_id") == ["family.1", "family.3"]
+
+
+def test_filter_families_ors_values_and_ands_keys(test_db):
+    _setup(test_db)
+
+    query = filter_families_by_metadata(
+        test_db, {"sector": ["Water", "Transport"], "topic": ["Adaptation"]}
+    )
+
+    assert _import_ids(query, "import_id") == ["family.2"]
+
+
+def test_filter_families_ignores_keys_without_values(test_db):
+    _setup(test_db)
+
+    query = filter_families_by_metadata(test_db, {"sector": []})
+
+    assert _import_ids(query, "import_id") == ["family.1", "family.2", "family.3"]
+
+
+def test_filter_documents_by_metadata(test_db):
+    _setup(test_db)
+
+    query = filter_documents_by_metadata(test_db, {"role": ["ANNEX"]})
+
+    assert _import_ids(query, "import_id") == ["document-family.2"]
+
+
+def test_filter_families_can_use_gin_index(test_db):
+    _setup(test_db)
+    test_db.execute(text("SET enable_seqscan = off"))
+
+    plan = test_db.execute(
+        text(
+            "EXPLAIN SELECT family_import_id FROM family_metadata "
+            """WHERE value @> '{"sector": ["Energy"]}'"""
+        )
+    ).all()
+
+    assert "ix_family_metadata_value" in " ".join(row[0] for row in plan)
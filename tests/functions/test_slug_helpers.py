@@ -0,0 +1,46 @@
+from db_client.functions.dfce_helpers import add_families_bulk
+from db_client.functions.slug_helpers import generate_slugs
+from tests.functions.helpers import family_dict
+
+
+def test_generate_slugs(test_db):
+    assert generate_slugs(test_db, ["National Plan", "Another Plan"]) == [
+        "national-plan",
+        "another-plan",
+    ]
+
+
+def test_generate_slugs_unique_within_the_batch(test_db):
+    slugs = generate_slugs(test_db, ["Plan", "Plan 2", "plan", "PLAN", "", "?"])
+
+    assert slugs == ["plan", "plan-2", "plan-1", "plan-3", "untitled", "untitled-1"]
+
+
+def test_generate_slugs_avoids_existing(test_db):
+    add_families_bulk(
+        test_db,
+        [
+            family_dict(0, documents=0, slug="plan"),
+            family_dict(1, documents=0, slug="plan-1"),
+            family_dict(2, documents=0, slug="plan-3"),
+        ],
+    )
+
+    assert generate_slugs(test_db, ["Plan", "Plan", "Plan"]) == [
+        "plan-2",
+        "plan-4",
+        "plan-5",
+    ]
+
+
+def test_generate_slugs_beyond_the_headroom(test_db):
+    add_families_bulk(
+        test_db,
+        [family_dict(0, documents=0, slug="plan")]
+        + [family_dict(n, documents=0, slug=f"plan-{n}") for n in range(1, 6)],
+    )
+
+    assert generate_slugs(test_db, ["Plan", "Plan"], headroom=1) == [
+        "plan-6",
+        "plan-7",
+    ]
@@ -0,0 +1,47 @@
+import pytest
+
+from db_client.functions.taxonomy_cache import LRUCache, taxonomy_digest
+
+
+def test_digest_ignores_key_order():
+    first = {"a": {"allow_blanks": True}, "b": {"allowed_values": ["x"]}}
+    second = {"b": {"allowed_values": ["x"]}, "a": {"allow_blanks": True}}
+    assert taxonomy_digest(first) == taxonomy_digest(second)
+
+
+def test_digest_changes_with_content():
+    first = {"a": {"allowed_values": ["x"]}}
+    second = {"a": {"allowed_values": ["x", "y"]}}
+    assert taxonomy_digest(first) != taxonomy_digest(second)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_invalidates_by_predicate():
+    cache = LRUCache()
+    cache.put(("corpus1", "x"), 1)
+    cache.put(("corpus1", "y"), 2)
+    cache.put(("corpus2", "x"), 3)
+
+    assert cache.invalidate(lambda key: key[0] == "corpus1") == 2
+    assert cache.get(("corpus2", "x")) == 3
+
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+
+def test_cache_must_hold_an_entry():
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
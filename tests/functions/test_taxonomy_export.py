@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from db_client.functions import taxonomy_export as taxonomy_export_module
+from db_client.functions.corpus_helpers import get_taxonomy_by_corpus_type_name
+from db_client.functions.taxonomy_export import get_taxonomy_export
+
+CORPUS_TYPE = "Intl. agreements"
+
+
+@pytest.fixture
+def serialise_spy(mocker):
+    taxonomy_export_module._EXPORT_CACHE.invalidate()
+    yield mocker.spy(taxonomy_export_module, "_serialise")
+    taxonomy_export_module._EXPORT_CACHE.invalidate()
+
+
+def _hash(test_db):
+    return test_db.execute(
+        text("SELECT valid_metadata_hash FROM corpus_type WHERE name = :name"),
+        {"name": CORPUS_TYPE},
+    ).scalar()
+
+
+def test_export_splits_taxonomy_by_entity(test_db, serialise_spy):
+    export = get_taxonomy_export(test_db, CORPUS_TYPE)
+    taxonomy = get_taxonomy_by_corpus_type_name(test_db, CORPUS_TYPE)
+
+    assert export is not None
+    assert export.modified
+    assert export.version == _hash(test_db)
+    assert json.loads(export.body) == {
+        "corpus_type": CORPUS_TYPE,
+        "version": export.version,
+        "family": {
+            "author": taxonomy["author"],
+            "author_type": taxonomy["author_type"],
+        },
+        "_document": taxonomy["_document"],
+        "_event": taxonomy["_event"],
+        "_collection": {},
+    }
+
+
+def test_export_is_only_serialised_once(test_db, serialise_spy):
+    first = get_taxonomy_export(test_db, CORPUS_TYPE)
+    second = get_taxonomy_export(test_db, CORPUS_TYPE)
+
+    assert first == second
+    assert serialise_spy.call_count == 1
+
+
+def test_export_not_modified(test_db, serialise_spy):
+    version = _hash(test_db)
+
+    export = get_taxonomy_export(test_db, CORPUS_TYPE, if_none_match=version)
+
+    assert export is not None
+    assert export.version == version
+    assert export.body is None
+    assert not export.modified
+    assert serialise_spy.call_count == 0
+
+
+def test_export_version_changes_with_taxonomy(test_db, serialise_spy):
+    before = get_taxonomy_export(test_db, CORPUS_TYPE)
+    assert before is not None
+
+    # Edited directly, so the stored hash is cleared.
+    test_db.execute(
+        text(
+            "UPDATE corpus_type SET valid_metadata = valid_metadata - 'author' "
+            "WHERE name = :name"
+        ),
+        {"name": CORPUS_TYPE},
+    )
+    test_db.commit()
+
+    after = get_taxonomy_export(test_db, CORPUS_TYPE, if_none_match=before.version)
+    assert after is not None
+    assert after.modified
+    assert after.version != before.version
+    assert "author" not in json.loads(after.body)["family"]
+
+    unchanged = get_taxonomy_export(test_db, CORPUS_TYPE, if_none_match=after.version)
+    assert unchanged is not None
+    assert not unchanged.modified
+
+
+def test_export_when_missing(test_db):
+    assert get_taxonomy_export(test_db, "Missing") is None
@@ -0,0 +1,173 @@
+import pytest
+from pytest_mock_resources import create_postgres_fixture
+
+from db_client.functions.dfce_helpers import add_families
+from db_client.functions.metadata import MetadataErrorCode
+from db_client.functions.taxonomy_impact import (
+    TaxonomyKeyChange,
+    diff_taxonomies,
+    find_invalidated_metadata,
+)
+from db_client.models.base import Base
+from db_client.models.dfce.geography import Geography
+from tests.functions.helpers import document_dict, family_dict, metadata_build
+
+db = create_postgres_fixture(Base, session=True)
+
+OLD_TAXONOMY = {
+    "animals": {
+        "allow_blanks": True,
+        "allowed_values": ["sheep", "goat", "cow"],
+    },
+    "colour": {
+        "allow_blanks": True,
+        "allowed_values": [],
+        "allow_any": True,
+    },
+    "_document": {
+        "role": {
+            "allow_blanks": False,
+            "allowed_values": ["MAIN", "ANNEX"],
+        },
+    },
+}
+
+
+def _family(import_id, corpus_import_id, metadata, document_metadata=None):
+    documents = []
+    if document_metadata is not None:
+        documents.append(
+            document_dict(
+                0,
+                events=0,
+                import_id=f"document-{import_id}",
+                slug=f"slug-document-{import_id}",
+                metadata=document_metadata,
+                language_variant=None,
+                languages=[],
+            )
+        )
+    return family_dict(
+        0,
+        documents=documents,
+        import_id=import_id,
+        corpus_import_id=corpus_import_id,
+        title=import_id,
+        slug=f"slug-{import_id}",
+        category="Executive",
+        metadata=metadata,
+    )
+
+
+@pytest.fixture
+def corpus(db):
+    _, corpus, _ = metadata_build(db, OLD_TAXONOMY)
+    db.add(Geography(id=1, display_value="nowhere", slug="s"))
+    db.commit()
+    return corpus
+
+
+def test_diff_reports_only_restrictive_changes():
+    new_taxonomy = {
+        "animals": {
+            "allow_blanks": False,
+            "allowed_values": ["sheep", "goat", "pig"],
+        },
+        "size": {
+            "allow_blanks": True,
+            "allowed_values": [],
+            "allow_any": True,
+        },
+        "_document": {
+            "role": {
+                "allow_blanks": True,
+                "allowed_values": ["MAIN", "ANNEX", "SUMMARY"],
+            },
+        },
+    }
+
+    assert diff_taxonomies(OLD_TAXONOMY, new_taxonomy) == [
+        TaxonomyKeyChange(None, "colour", removed=True),
+        TaxonomyKeyChange(
+            None,
+            "animals",
+            removed_values=frozenset({"cow"}),
+            blanks_disallowed=True,
+        ),
+        TaxonomyKeyChange(None, "size", added=True),
+    ]
+
+
+def test_diff_is_empty_when_unchanged():
+    assert diff_taxonomies(OLD_TAXONOMY, OLD_TAXONOMY) == []
+
+
+def test_find_invalidated_metadata_only_reports_affected_rows(db, corpus):
+    add_families(
+        db,
+        [
+            _family("family.1", corpus.import_id, {"animals": ["cow"], "colour": []}),
+            _family("family.2", corpus.import_id, {"animals": [], "colour": []}),
+            _family(
+                "family.3",
+                corpus.import_id,
+                {"animals": ["sheep"], "colour": []},
+                {"role": ["ANNEX"]},
+            ),
+        ],
+    )
+    new_taxonomy = {
+        "animals": {
+            "allow_blanks": True,
+            "allowed_values": ["sheep", "goat"],
+        },
+        "colour": OLD_TAXONOMY["colour"],
+        "_document": {
+            "role": {
+                "allow_blanks": False,
+                "allowed_values": ["MAIN"],
+            },
+        },
+    }
+
+    results = list(
+        find_invalidated_metadata(
+            db, "Dummy CorpusType", OLD_TAXONOMY, new_taxonomy, batch_size=1
+        )
+    )
+
+    assert [(r.entity_key, r.import_id) for r in results] == [
+        (None, "family.1"),
+        ("_document", "document-family.3"),
+    ]
+    assert results[0].errors[0].code == MetadataErrorCode.INVALID_VALUES
+    assert results[0].errors[0].values == ["cow"]
+
+
+def test_find_invalidated_metadata_reports_new_required_keys(db, corpus):
+    add_families(
+        db,
+        [
+            _family("family.1", corpus.import_id, {"animals": [], "colour": []}),
+            _family(
+                "family.2",
+                corpus.import_id,
+                {"animals": [], "colour": [], "size": ["big"]},
+            ),
+        ],
+    )
+    new_taxonomy = {
+        **OLD_TAXONOMY,
+        "size": {
+            "allow_blanks": True,
+            "allowed_values": [],
+            "allow_any": True,
+        },
+    }
+
+    results = list(
+        find_invalidated_metadata(db, "Dummy CorpusType", OLD_TAXONOMY, new_taxonomy)
+    )
+
+    assert [(r.entity_key, r.import_id) for r in results] == [(None, "family.1")]
+    assert results[0].errors[0].code == MetadataErrorCode.MISSING_KEYS
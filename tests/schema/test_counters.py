@@ -1,3 +1,7 @@
+import threading
+
+import pytest
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from db_client.models.organisation.counters import CountedEntity, EntityCounter
@@ -23,3 +27,129 @@ def test_import_id_generation(test_db: Session):
         test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
     )
     assert row.counter == 1
+
+
+def test_import_id_block_generation(test_db: Session):
+    row: EntityCounter = (
+        test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    )
+
+    import_ids = row.create_import_ids(CountedEntity.Document, 3)
+    assert import_ids == [
+        "CCLW.document.i00000001.n0000",
+        "CCLW.document.i00000002.n0000",
+        "CCLW.document.i00000003.n0000",
+    ]
+    assert row.reserve_block(2) == range(4, 6)
+    assert row.create_import_id(CountedEntity.Event) == "CCLW.event.i00000006.n0000"
+
+    row = test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    assert row.counter == 6
+
+
+def test_import_id_block_must_be_positive(test_db: Session):
+    row: EntityCounter = (
+        test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    )
+
+    with pytest.raises(ValueError):
+        row.reserve_block(0)
+
+
+def test_import_id_generation_keeps_the_callers_transaction(test_db: Session):
+    row: EntityCounter = (
+        test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    )
+    row.description = "Uncommitted"
+
+    assert row.create_import_id(CountedEntity.Family) == "CCLW.family.i00000001.n0000"
+    assert row.counter == 1
+    test_db.rollback()
+
+    # The edit is rolled back but the counter is not, so ids are never reused.
+    row = test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    assert row.description != "Uncommitted"
+    assert row.counter == 1
+    assert row.create_import_id(CountedEntity.Family) == "CCLW.family.i00000002.n0000"
+
+
+def test_import_id_generation_for_an_uncommitted_counter(test_db: Session):
+    row = EntityCounter(prefix="CCLW", description="New")
+    test_db.add(row)
+    test_db.flush()
+
+    assert row.create_import_id(CountedEntity.Family) == "CCLW.family.i00000001.n0000"
+    assert row.create_import_ids(CountedEntity.Event, 2) == [
+        "CCLW.event.i00000002.n0000",
+        "CCLW.event.i00000003.n0000",
+    ]
+    assert (
+        test_db.query(EntityCounter.counter).filter(EntityCounter.id == row.id).scalar()
+        == 3
+    )
+
+
+def test_import_id_generation_for_a_counter_locked_by_the_session(test_db: Session):
+    row: EntityCounter = (
+        test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    )
+    row.description = "Flushed"
+    test_db.flush()
+
+    assert row.create_import_id(CountedEntity.Family) == "CCLW.family.i00000001.n0000"
+
+
+def test_import_id_generation_in_a_connection_bound_session(test_db: Session):
+    engine = test_db.get_bind()
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection)
+        row = db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+
+        assert row.create_import_id(CountedEntity.Family) == (
+            "CCLW.family.i00000001.n0000"
+        )
+        db.close()
+        transaction.rollback()
+
+    row = test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    assert row.counter == 0
+
+
+def test_import_id_generation_for_a_counter_selected_for_update(test_db: Session):
+    row: EntityCounter = (
+        test_db.query(EntityCounter)
+        .filter(EntityCounter.prefix == "CCLW")
+        .with_for_update()
+        .one()
+    )
+
+    assert row.create_import_id(CountedEntity.Family) == "CCLW.family.i00000001.n0000"
+
+
+def test_import_id_generation_waits_for_other_allocators(test_db: Session):
+    engine = test_db.get_bind()
+    row: EntityCounter = (
+        test_db.query(EntityCounter).filter(EntityCounter.prefix == "CCLW").one()
+    )
+
+    # Another allocator holds the row for a moment.
+    other = engine.connect()
+    other_transaction = other.begin()
+    other.execute(row._advance_by, {"id": row.id, "n": 1})
+    release = threading.Timer(0.5, other_transaction.commit)
+    release.start()
+    try:
+        assert row.create_import_id(CountedEntity.Family) == (
+            "CCLW.family.i00000002.n0000"
+        )
+    finally:
+        release.join()
+        other.close()
+
+    # The session's transaction is still open but does not hold the row.
+    with engine.begin() as third:
+        third.execute(text("SET LOCAL lock_timeout = '1s'"))
+        assert third.execute(row._advance_by, {"id": row.id, "n": 1}).scalar() == 3
+    test_db.rollback()
+    assert test_db.query(EntityCounter).get(row.id).counter == 3